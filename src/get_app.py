@@ -4,7 +4,7 @@ from src import __APP_NAME__
 from flask import Flask
 from flask_migrate import Migrate
 from src.storage.database_provider import db_provider
-from src.shared.constants import Directories
+from src.server.request_profiler import request_profiler
 
 __the_app__: Flask = None
 
@@ -18,9 +18,12 @@ def __create_app(testing: bool = False) -> Flask:
     """
     flask_app: Flask = Flask(__APP_NAME__, template_folder=None, static_folder=None)
     flask_app.secret_key = "TEST SECRET KEY"
-    flask_app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///" + Directories.database_root() + "/local_db.sqlite"
+    db_provider.apply_engine_config(app=flask_app)
+    db_provider.apply_connection_profile(app=flask_app)
     db_provider.db.init_app(flask_app)
-    Migrate(flask_app, db_provider.db)
+    db_provider.instrument_queries(app=flask_app)
+    request_profiler.install(app=flask_app)
+    Migrate(flask_app, db_provider.db, render_as_batch=True)
     return flask_app
 
 __the_app__: Flask = None
@@ -0,0 +1,126 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import ItemDatabaseClient
+from src.storage.auction_close_index import AuctionCloseIndex, auction_close_index
+from src.storage.database_provider import db_provider
+from src.shared.constants import GeneralConstants
+from flask import Flask
+from typing import List, Tuple
+import threading
+import datetime
+import logging
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class AuctionCloseScheduler:
+    """
+    Finalizes auctions as they close, on a background thread.
+
+    Upcoming closes are kept in an ``AuctionCloseIndex`` heap, loaded from the database one window
+    of ``GeneralConstants.AUCTION_CLOSE_INDEX_WINDOW_SIZE`` items at a time through the close
+    timestamp index, and fed by ``ItemDatabaseClient.create_and_save_new_item``. Due items are
+    finalized ``GeneralConstants.AUCTION_CLOSE_BATCH_SIZE`` at a time with one update per batch.
+    The window is also reloaded every ``GeneralConstants.AUCTION_CLOSE_POLL_INTERVAL_IN_SECONDS``
+    to pick up items created by other processes.
+    """
+
+    def __init__(self, app: Flask, item_database_client: ItemDatabaseClient = None,
+                 close_index: AuctionCloseIndex = None,
+                 batch_size: int = GeneralConstants.AUCTION_CLOSE_BATCH_SIZE,
+                 window_size: int = GeneralConstants.AUCTION_CLOSE_INDEX_WINDOW_SIZE,
+                 poll_interval_in_seconds: float = GeneralConstants.AUCTION_CLOSE_POLL_INTERVAL_IN_SECONDS):
+        """
+        Inputs:
+            - app: Flask app, the database is accessed inside its app context.
+            - item_database_client: Client used to load and finalize items.
+            - close_index: Heap of upcoming closes, shared with the database clients of this process by default.
+            - batch_size: Number of items finalized per database update.
+            - window_size: Number of upcoming closes loaded at once.
+            - poll_interval_in_seconds: Maximum time between two reloads of upcoming closes.
+        """
+        self.app: Flask = app
+        self.close_index: AuctionCloseIndex = close_index if close_index is not None else auction_close_index
+        self.item_database_client: ItemDatabaseClient = \
+            item_database_client or ItemDatabaseClient(close_index=self.close_index)
+        self.batch_size: int = batch_size
+        self.window_size: int = window_size
+        self.poll_interval_in_seconds: float = poll_interval_in_seconds
+        self.running: bool = False
+        self.thread: threading.Thread = None
+
+    def load_upcoming_closes(self):
+        """
+        Loads the earliest closes of the items whose auction is not finalized yet.
+        """
+        items_closes: List[Tuple[datetime.datetime, str]] = \
+            self.item_database_client.retrieve_upcoming_auctions_closes(limit=self.window_size)
+        self.close_index.load_items_closes(
+            items_closes=items_closes, complete=len(items_closes) < self.window_size)
+
+    def close_due_auctions(self, now: datetime.datetime = None) -> int:
+        """
+        Finalizes every tracked item closed by ``now``.
+        Inputs:
+            - now: Current timestamp, defaults to the current UTC time.
+        Returns:
+            - Number of finalized items.
+        """
+        now = now or datetime.datetime.utcnow()
+        finalized_items_count: int = 0
+        while True:
+            due_items_uuids: List[str] = self.close_index.pop_due_items_uuids(now=now, limit=self.batch_size)
+            if not due_items_uuids:
+                return finalized_items_count
+            finalized_items_count += self.item_database_client.finalize_auctions(
+                items_uuids=due_items_uuids, closed_timestamp=now)
+
+    def run(self):
+        """
+        Closes auctions until ``stop`` is called.
+        """
+        with self.app.app_context():
+            last_load_timestamp: datetime.datetime = datetime.datetime.min
+            while self.running:
+                try:
+                    now: datetime.datetime = datetime.datetime.utcnow()
+                    if (now - last_load_timestamp).total_seconds() >= self.poll_interval_in_seconds or \
+                            (not len(self.close_index) and self.close_index.tracked_until < datetime.datetime.max):
+                        self.load_upcoming_closes()
+                        last_load_timestamp = now
+
+                    finalized_items_count: int = self.close_due_auctions(now=now)
+                    if finalized_items_count:
+                        logger.info(f'Finalized {finalized_items_count} auctions.')
+                except Exception:
+                    # Items popped from the index are loaded again on the next reload.
+                    logger.exception('Failed to close due auctions.')
+                    db_provider.db.session.rollback()
+                    self.close_index.wait(timeout=self.poll_interval_in_seconds)
+                    continue
+
+                next_close_timestamp: datetime.datetime = self.close_index.next_close_timestamp()
+                wait_in_seconds: float = self.poll_interval_in_seconds
+                if next_close_timestamp is not None:
+                    wait_in_seconds = min(
+                        wait_in_seconds, (next_close_timestamp - datetime.datetime.utcnow()).total_seconds())
+                if wait_in_seconds > 0 and self.running:
+                    self.close_index.wait(timeout=wait_in_seconds)
+            db_provider.db.session.remove()
+
+    def start(self):
+        """
+        Starts closing auctions on a daemon thread.
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='auction-close-scheduler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        self.running = False
+        self.close_index.notify()
+        if self.thread:
+            self.thread.join()
@@ -0,0 +1,117 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import BidDatabaseClient, AutoBidDatabaseClient
+from src.server.request_metrics import request_metrics
+from src.storage.database_tables import Bid
+from src.shared.constants import GeneralConstants
+from typing import Dict, List, Tuple
+
+
+class AutoBidResolver:
+    """
+    Resolves auto bidding wars in closed form (proxy bidding).
+
+    Auto bidders outbid each other by ``GeneralConstants.BID_INCREMENT_IN_USD`` until only one of them
+    can still afford to bid. Instead of replaying every increment, the resolver computes the final state
+    directly: the bidder with the highest ceiling wins at the runner up ceiling plus one increment.
+    """
+
+    def __init__(self, bid_database_client: BidDatabaseClient = None,
+                 auto_bid_database_client: AutoBidDatabaseClient = None):
+        self.bid_database_client: BidDatabaseClient = bid_database_client or BidDatabaseClient()
+        self.auto_bid_database_client: AutoBidDatabaseClient = \
+            auto_bid_database_client or AutoBidDatabaseClient()
+
+    @staticmethod
+    def compute_bid_ceiling(max_bid_amount_in_usd: int, registrations_count: int,
+                            bid_increment_in_usd: int = GeneralConstants.BID_INCREMENT_IN_USD) -> int:
+        """
+        Computes the highest price an auto bidder is able to bid on a single item.
+        An auto bidder may bid as long as its budget per item is higher than the current bid,
+        so the ceiling is the largest price ``x`` such that ``x - increment < max / registrations``.
+        Inputs:
+            - max_bid_amount_in_usd: Auto bidder total budget.
+            - registrations_count: Number of items the auto bidder is registered on.
+            - bid_increment_in_usd: Amount added to the current bid by each auto bid.
+        Returns:
+            - Auto bidder bid ceiling.
+        """
+        return (max_bid_amount_in_usd + bid_increment_in_usd * registrations_count - 1) // registrations_count
+
+    @staticmethod
+    def compute_auto_bids(
+            highest_bidder_uuid: str, current_highest_bid: int, auto_bidders_ceilings: List[Tuple[str, int]],
+            bid_increment_in_usd: int = GeneralConstants.BID_INCREMENT_IN_USD) -> List[Tuple[str, int]]:
+        """
+        Computes the bids placed by auto bidders in reaction to the current highest bid.
+        Inputs:
+            - highest_bidder_uuid: Current highest bidder uuid.
+            - current_highest_bid: Current highest bid on the item.
+            - auto_bidders_ceilings: List of (bidder_uuid, bid_ceiling) pairs ordered by registration.
+            - bid_increment_in_usd: Amount added to the current bid by each auto bid.
+        Returns:
+            - Ordered list of (bidder_uuid, bid_price_in_usd) bids to record. The last one is the winning bid.
+        """
+        # Ties are won by the current highest bidder, then by the earliest auto bid registration.
+        highest_bidder_ceiling: int = current_highest_bid
+        contenders: List[Tuple[int, int, str]] = []
+        for registration_order, (auto_bidder_uuid, bid_ceiling) in enumerate(auto_bidders_ceilings, start=1):
+            if auto_bidder_uuid == highest_bidder_uuid:
+                highest_bidder_ceiling = max(highest_bidder_ceiling, bid_ceiling)
+            elif bid_ceiling > current_highest_bid:
+                contenders.append((bid_ceiling, registration_order, auto_bidder_uuid))
+
+        if not contenders:
+            return []
+
+        contenders.append((highest_bidder_ceiling, 0, highest_bidder_uuid))
+        contenders.sort(key=lambda contender: (-contender[0], contender[1]))
+        (winner_ceiling, _, winner_uuid), (runner_up_ceiling, _, runner_up_uuid) = contenders[:2]
+
+        winning_bid: int = min(winner_ceiling, runner_up_ceiling + bid_increment_in_usd)
+        runner_up_last_bid: int = min(runner_up_ceiling, winning_bid - bid_increment_in_usd)
+
+        auto_bids: List[Tuple[str, int]] = []
+        if runner_up_last_bid > current_highest_bid:
+            auto_bids.append((runner_up_uuid, runner_up_last_bid))
+        auto_bids.append((winner_uuid, winning_bid))
+        return auto_bids
+
+    def retrieve_items_auto_bidders_ceilings(self, items_uuids: List[str]) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Retrieves the bid ceiling of every auto bidder registered on the given items.
+        Inputs:
+            - items_uuids: UUIDs representing the target items.
+        Returns:
+            - Dictionary mapping items uuids to lists of (bidder_uuid, bid_ceiling) pairs ordered by registration.
+        """
+        return {
+            bid_item_uuid: [
+                (auto_bidder_uuid, self.compute_bid_ceiling(max_bid_amount_in_usd, registrations_count))
+                for auto_bidder_uuid, max_bid_amount_in_usd, registrations_count in item_auto_bidders_budgets]
+            for bid_item_uuid, item_auto_bidders_budgets in
+            self.auto_bid_database_client.retrieve_items_auto_bidders_budgets(items_uuids=items_uuids).items()}
+
+    def place_bid(self, bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int) -> List[Bid]:
+        """
+        Places a bid and resolves the auto bids it triggers. All bids are saved in one transaction,
+        only if the submitted bid is still higher than the item current bid.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bidder_uuid: UUID representing the bidder.
+            - bid_price_in_usd: Submitted bid price.
+        Returns:
+            - Created bid records. The first one is the submitted bid, the last one is the winning bid.
+              Empty if the bid was outbid or the auction closed in the meantime.
+        """
+        auto_bidders_ceilings: List[Tuple[str, int]] = \
+            self.retrieve_items_auto_bidders_ceilings(items_uuids=[bid_item_uuid]).get(bid_item_uuid, [])
+        request_metrics.record_auto_bid_cascade(depth=len(auto_bidders_ceilings))
+        auto_bids: List[Tuple[str, int]] = self.compute_auto_bids(
+            highest_bidder_uuid=bidder_uuid, current_highest_bid=bid_price_in_usd,
+            auto_bidders_ceilings=auto_bidders_ceilings)
+
+        new_bids: List[Bid] = self.bid_database_client.create_item_bids_if_higher(
+            bid_item_uuid=bid_item_uuid, bids=[(bidder_uuid, bid_price_in_usd)] + auto_bids)
+        request_metrics.record_bids_written(bids_count=len(new_bids))
+        return new_bids
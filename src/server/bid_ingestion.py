@@ -0,0 +1,129 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict, deque
+from flask import Flask
+from typing import Any, Callable, Deque, Dict, Tuple
+import threading
+import uuid
+
+# Processes one bid: (bid_item_uuid, bidder_uuid, bid_price_in_usd) -> (response json dict, http status).
+BidProcessor = Callable[[str, str, int], Tuple[Dict[str, Any], int]]
+
+
+class BidIngestionPipeline:
+    """
+    Queues submitted bids per item and processes them on a pool of worker threads.
+
+    Bids on the same item are processed one at a time in submission order, so the
+    "higher than the current bid" check cannot interleave with another bid placement
+    on that item. Bids on different items are processed in parallel.
+
+    Queues and tickets are local to the process: bids on an item are only ordered among the bids
+    of one process, and a ticket can only be looked up in the process which issued it. The server
+    runner therefore only enables the pipeline with a single worker process.
+    """
+
+    def __init__(self, app: Flask, process_bid: BidProcessor, workers: int,
+                 max_tracked_tickets: int = GeneralConstants.BID_INGESTION_MAX_TRACKED_TICKETS):
+        """
+        Inputs:
+            - app: Flask app, bids are processed inside its app context.
+            - process_bid: Function validating and placing a single bid.
+            - workers: Number of worker threads.
+            - max_tracked_tickets: Number of most recent bid tickets kept for status lookups.
+        """
+        self.app: Flask = app
+        self.process_bid: BidProcessor = process_bid
+        self.max_tracked_tickets: int = max_tracked_tickets
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='bid-ingestion')
+        self.__items_queues: Dict[str, Deque[Tuple[str, int, Future]]] = {}
+        self.__tickets: OrderedDict = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def submit(self, bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int) -> Tuple[str, Future]:
+        """
+        Queues a bid for processing.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bidder_uuid: UUID representing the bidder.
+            - bid_price_in_usd: Submitted bid price.
+        Returns:
+            - Bid ticket uuid and the future resolved with the (response json dict, http status) result.
+        Raises:
+            - RuntimeError: When the pipeline is shut down.
+        """
+        bid_ticket_uuid: str = str(uuid.uuid4())
+        bid_future: Future = Future()
+        with self.__lock:
+            item_queue: Deque[Tuple[str, int, Future]] = self.__items_queues.get(bid_item_uuid)
+            # An item queue exists as long as a worker is draining it.
+            start_draining: bool = item_queue is None
+            if start_draining:
+                item_queue = self.__items_queues[bid_item_uuid] = deque()
+            item_queue.append((bidder_uuid, bid_price_in_usd, bid_future))
+
+            self.__tickets[bid_ticket_uuid] = bid_future
+            while len(self.__tickets) > self.max_tracked_tickets:
+                self.__tickets.popitem(last=False)
+
+        if start_draining:
+            try:
+                self.executor.submit(self.drain_item_queue, bid_item_uuid)
+            except RuntimeError as exception:
+                # The executor is shut down: no worker drains the queue, drop it with the bids queued meanwhile.
+                with self.__lock:
+                    item_queue = self.__items_queues.pop(bid_item_uuid)
+                for _, _, queued_bid_future in item_queue:
+                    if queued_bid_future.set_running_or_notify_cancel():
+                        queued_bid_future.set_exception(exception)
+                raise
+        return bid_ticket_uuid, bid_future
+
+    def drain_item_queue(self, bid_item_uuid: str):
+        """
+        Processes queued bids of an item in order. After ``GeneralConstants.BID_INGESTION_DRAIN_BATCH_SIZE``
+        bids the drain is re-scheduled so that a hot item does not hold a worker forever.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+        """
+        for _ in range(GeneralConstants.BID_INGESTION_DRAIN_BATCH_SIZE):
+            with self.__lock:
+                item_queue: Deque[Tuple[str, int, Future]] = self.__items_queues[bid_item_uuid]
+                if not item_queue:
+                    del self.__items_queues[bid_item_uuid]
+                    return
+                bidder_uuid, bid_price_in_usd, bid_future = item_queue.popleft()
+
+            if not bid_future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self.app.app_context():
+                    bid_future.set_result(self.process_bid(bid_item_uuid, bidder_uuid, bid_price_in_usd))
+            except BaseException as exception:
+                bid_future.set_exception(exception)
+
+        try:
+            self.executor.submit(self.drain_item_queue, bid_item_uuid)
+        except RuntimeError:
+            # The executor is shutting down, finish the queue on this worker.
+            self.drain_item_queue(bid_item_uuid)
+
+    def retrieve_bid_future(self, bid_ticket_uuid: str) -> Future:
+        """
+        Retrieves the future of a submitted bid.
+        Inputs:
+            - bid_ticket_uuid: Ticket uuid returned by ``submit``.
+        Returns:
+            - Bid future, None if the ticket is unknown or no longer tracked.
+        """
+        with self.__lock:
+            return self.__tickets.get(bid_ticket_uuid)
+
+    def shutdown(self):
+        """
+        Waits for queued bids to be processed and stops the worker threads.
+        """
+        self.executor.shutdown(wait=True)
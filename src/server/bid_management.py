@@ -1,26 +1,49 @@
 __author__ = "Frank Kwizera"
 
 from src.server.server_helper import ServerHelper
+from src.server.auto_bid_resolver import AutoBidResolver
+from src.server.bid_ingestion import BidIngestionPipeline
+from src.server.request_metrics import request_metrics
+from src.server.item_events_hub import ItemEventsHub, item_events_hub
+from src.shared.constants import GeneralConstants, BidStatus
 from src.shared.server_routes import BidManagementServerRoutes  
 from src.storage.database_client import BidDatabaseClient, UserDatabaseClient
 from src.storage.database_client import ItemDatabaseClient, AutoBidDatabaseClient
 from src.storage.database_tables import Bid, AutoBid, UserAutoBid
+from src.storage.auction_state_cache import ItemAuctionState
 from flask import jsonify, Flask, request, wrappers
 from src.get_app import get_app
 from flask_api import status
+from concurrent import futures
+from typing import Any, Dict, List, Set, Tuple
 import datetime
+import logging
+
+logger: logging.Logger = logging.getLogger(__name__)
 
 
 class BidManagementServer:
-    def __init__(self):
+    def __init__(self, bid_ingestion_workers: int = 0, events_hub: ItemEventsHub = None):
+        """
+        Inputs:
+            - bid_ingestion_workers: Number of bid ingestion worker threads, bids are processed
+              on the request thread when 0.
+            - events_hub: Hub accepted bids are published to, defaults to ``item_events_hub``.
+        """
         self.app: Flask = get_app()
+        self.events_hub: ItemEventsHub = events_hub or item_events_hub
         self.map_endpoints(app=self.app)
 
         # Initiate database clients.
-        self.bid_database_client: BidDatabaseClient = BidDatabaseClient()
+        self.bid_database_client: BidDatabaseClient = BidDatabaseClient(committed_bids_listener=self.publish_bids)
         self.user_database_client: UserDatabaseClient = UserDatabaseClient()
         self.item_database_client: ItemDatabaseClient = ItemDatabaseClient()
         self.auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
+        self.auto_bid_resolver: AutoBidResolver = AutoBidResolver(
+            bid_database_client=self.bid_database_client, auto_bid_database_client=self.auto_bid_database_client)
+        self.bid_ingestion_pipeline: BidIngestionPipeline = BidIngestionPipeline(
+            app=self.app, process_bid=self.process_bid, workers=bid_ingestion_workers) \
+            if bid_ingestion_workers > 0 else None
 
     def map_endpoints(self, app: Flask):
         """
@@ -29,6 +52,10 @@ class BidManagementServer:
         app.add_url_rule(
             BidManagementServerRoutes.CREATE_BID, endpoint="submit_a_bid",
             view_func=self.submit_a_bid, methods=['POST'])
+
+        app.add_url_rule(
+            BidManagementServerRoutes.CREATE_BIDS, endpoint="submit_bids",
+            view_func=self.submit_bids, methods=['POST'])
         
         app.add_url_rule(
             BidManagementServerRoutes.REGISTER_AUTO_BID, endpoint="register_auto_bid",
@@ -37,6 +64,10 @@ class BidManagementServer:
         app.add_url_rule(
             BidManagementServerRoutes.REGISTER_USER_AUTO_CONFI_BID, endpoint="register_user_auto_bid_configuration",
             view_func=self.register_user_auto_bid_configuration, methods=['POST'])
+
+        app.add_url_rule(
+            BidManagementServerRoutes.RETRIEVE_BID_STATUS + '/<string:bid_ticket_uuid>',
+            endpoint="retrieve_bid_status", view_func=self.retrieve_bid_status, methods=['GET'])
     
     def register_user_auto_bid_configuration(self) -> wrappers.Response:
         """
@@ -91,7 +122,9 @@ class BidManagementServer:
 
     def submit_a_bid(self) -> wrappers.Response:
         """
-        Submits the item bid.
+        Submits the item bid. When the bid ingestion pipeline is enabled the bid is queued behind the
+        other bids on the same item; the response waits for the bid result unless ``wait=false`` is
+        requested or the wait times out, in which case a bid ticket to poll is returned.
         Returns:
             - Http response indicating the success or failure of item bid.
         """
@@ -100,47 +133,230 @@ class BidManagementServer:
         bid_item_uuid: str = request_data.get('bid_item_uuid')
         bidder_uuid: str = request_data.get('bidder_uuid')
 
+        if not self.bid_ingestion_pipeline:
+            bid_result, bid_status = self.process_bid(
+                bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid, bid_price_in_usd=bid_price_in_usd)
+            return jsonify(bid_result), bid_status
+
+        try:
+            bid_ticket_uuid, bid_future = self.bid_ingestion_pipeline.submit(
+                bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid, bid_price_in_usd=bid_price_in_usd)
+        except RuntimeError:
+            return ServerHelper.create_http_response(
+                message='Bids are not accepted anymore, the server is shutting down.',
+                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        if request.args.get('wait', 'true').lower() != 'false':
+            futures.wait([bid_future], timeout=GeneralConstants.BID_INGESTION_WAIT_TIMEOUT_IN_SECONDS)
+        return self.create_bid_ticket_response(bid_ticket_uuid=bid_ticket_uuid, bid_future=bid_future)
+
+    def submit_bids(self) -> wrappers.Response:
+        """
+        Submits a batch of bids, possibly on different items. Bids on the same item are processed in
+        submission order and every accepted bid is saved in a single transaction.
+        Returns:
+            - Http response with one result per submitted bid, in submission order.
+        """
+        request_data: Dict[str, List[Dict[str, str]]] = request.get_json()
+        bids_data: List[Dict[str, str]] = request_data.get('bids') or []
+        if len(bids_data) > GeneralConstants.BIDS_BATCH_MAX_SIZE:
+            return ServerHelper.create_http_response(
+                message=f'At most {GeneralConstants.BIDS_BATCH_MAX_SIZE} bids can be submitted at once.',
+                status=status.HTTP_400_BAD_REQUEST)
+
+        bids: List[Tuple[str, str, int]] = [
+            (bid_data.get('bid_item_uuid'), bid_data.get('bidder_uuid'), int(bid_data.get('bid_price_in_usd')))
+            for bid_data in bids_data]
+        bids_results: List[Dict[str, Any]] = [
+            {
+                'status': BidStatus.ACCEPTED if bid_status == status.HTTP_200_OK else BidStatus.REJECTED,
+                'status_code': bid_status,
+                'result': bid_result
+            } for bid_result, bid_status in self.process_bids(bids=bids)]
+        return jsonify({'results': bids_results})
+
+    def process_bids(self, bids: List[Tuple[str, str, int]]) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        Validates and places a batch of bids. Users and items are validated with one query each,
+        triggered auto bids are resolved per item in submission order and accepted bids are saved together.
+        Inputs:
+            - bids: List of (bid_item_uuid, bidder_uuid, bid_price_in_usd) tuples.
+        Returns:
+            - (response json dictionary, http status) pair of every bid, in submission order.
+        """
+        existing_users_uuids: Set[str] = self.user_database_client.retrieve_existing_users_uuids(
+            users_uuids={bidder_uuid for _, bidder_uuid, _ in bids})
+        items_auction_states: Dict[str, ItemAuctionState] = self.item_database_client.retrieve_items_auction_states(
+            items_uuids={bid_item_uuid for bid_item_uuid, _, _ in bids})
+        items_auto_bidders_ceilings: Dict[str, List[Tuple[str, int]]] = \
+            self.auto_bid_resolver.retrieve_items_auto_bidders_ceilings(items_uuids=list(items_auction_states))
+
+        now: datetime.datetime = datetime.datetime.utcnow()
+        bids_results: List[Tuple[Dict[str, Any], int]] = []
+        items_bids: Dict[str, List[Tuple[str, int]]] = {}
+        # Position of accepted bids in their item bids list, by submission index.
+        accepted_bids_positions: Dict[int, Tuple[str, int]] = {}
+        for bid_index, (bid_item_uuid, bidder_uuid, bid_price_in_usd) in enumerate(bids):
+            item_auction_state: ItemAuctionState = items_auction_states.get(bid_item_uuid)
+            if bidder_uuid not in existing_users_uuids:
+                bids_results.append(
+                    ({'message': f'User with uuid {bidder_uuid} does not exists.'}, status.HTTP_404_NOT_FOUND))
+            elif not item_auction_state:
+                bids_results.append(
+                    ({'message': f'Item with uuid {bid_item_uuid} does not exists.'}, status.HTTP_404_NOT_FOUND))
+            elif now > item_auction_state.bid_expiration_timestamp:
+                bids_results.append(({'message': 'Bid is closed now'}, status.HTTP_400_BAD_REQUEST))
+            elif item_auction_state.highest_bid_price_in_usd is not None and \
+                    item_auction_state.highest_bid_price_in_usd >= bid_price_in_usd:
+                bids_results.append((
+                    {'message': f'Bid price should be higher than {item_auction_state.highest_bid_price_in_usd}'},
+                    status.HTTP_400_BAD_REQUEST))
+            else:
+                item_auto_bidders_ceilings: List[Tuple[str, int]] = items_auto_bidders_ceilings.get(bid_item_uuid, [])
+                request_metrics.record_auto_bid_cascade(depth=len(item_auto_bidders_ceilings))
+                auto_bids: List[Tuple[str, int]] = self.auto_bid_resolver.compute_auto_bids(
+                    highest_bidder_uuid=bidder_uuid, current_highest_bid=bid_price_in_usd,
+                    auto_bidders_ceilings=item_auto_bidders_ceilings)
+                item_bids: List[Tuple[str, int]] = items_bids.setdefault(bid_item_uuid, [])
+                accepted_bids_positions[bid_index] = (bid_item_uuid, len(item_bids))
+                item_bids.extend([(bidder_uuid, bid_price_in_usd)] + auto_bids)
+
+                # Following bids on this item have to beat the resolved auto bids.
+                item_auction_state.highest_bidder_uuid, item_auction_state.highest_bid_price_in_usd = item_bids[-1]
+                bids_results.append(None)
+
+        new_items_bids: Dict[str, List[Bid]] = \
+            self.bid_database_client.create_items_bids_if_higher(items_bids=items_bids) if items_bids else {}
+        request_metrics.record_bids_written(
+            bids_count=sum(len(item_new_bids) for item_new_bids in new_items_bids.values()))
+
+        # Items outbid concurrently since they were read: report their current state.
+        outbid_items_auction_states: Dict[str, ItemAuctionState] = self.item_database_client.retrieve_items_auction_states(
+            items_uuids=set(items_bids) - set(new_items_bids))
+        for bid_index, (bid_item_uuid, bid_position) in accepted_bids_positions.items():
+            if bid_item_uuid in new_items_bids:
+                bids_results[bid_index] = (new_items_bids[bid_item_uuid][bid_position].to_json_dict(), status.HTTP_200_OK)
+            elif now > outbid_items_auction_states[bid_item_uuid].bid_expiration_timestamp:
+                bids_results[bid_index] = ({'message': 'Bid is closed now'}, status.HTTP_400_BAD_REQUEST)
+            else:
+                bids_results[bid_index] = ({
+                    'message': 'Bid price should be higher than '
+                               f'{outbid_items_auction_states[bid_item_uuid].highest_bid_price_in_usd}'
+                }, status.HTTP_400_BAD_REQUEST)
+        return bids_results
+
+    def retrieve_bid_status(self, bid_ticket_uuid: str) -> wrappers.Response:
+        """
+        Retrieves the result of a bid submitted to the bid ingestion pipeline.
+        Inputs:
+            - bid_ticket_uuid: Bid ticket uuid returned on bid submission.
+        Returns:
+            - Http response with the bid status.
+        """
+        bid_future: futures.Future = \
+            self.bid_ingestion_pipeline.retrieve_bid_future(bid_ticket_uuid=bid_ticket_uuid) \
+            if self.bid_ingestion_pipeline else None
+        if not bid_future:
+            return ServerHelper.create_item_not_found_message(
+                message=f'Bid ticket with uuid {bid_ticket_uuid} does not exists.')
+        return self.create_bid_ticket_response(bid_ticket_uuid=bid_ticket_uuid, bid_future=bid_future)
+
+    @staticmethod
+    def create_bid_ticket_response(bid_ticket_uuid: str, bid_future: futures.Future) -> wrappers.Response:
+        """
+        Creates the http response describing a queued bid.
+        Inputs:
+            - bid_ticket_uuid: Bid ticket uuid.
+            - bid_future: Future resolved with the bid result.
+        Returns:
+            - 202 response while the bid is pending, otherwise the bid result and its status code. Bids whose
+              processing failed are rejected with a 500 status, or 503 when the pipeline was shut down.
+        """
+        if not bid_future.done():
+            return jsonify({'bid_ticket_uuid': bid_ticket_uuid, 'status': BidStatus.PENDING}), \
+                status.HTTP_202_ACCEPTED
+
+        bid_exception: BaseException = bid_future.exception()
+        if bid_exception is not None:
+            logger.error(f'Bid ticket {bid_ticket_uuid} failed.', exc_info=bid_exception)
+            return jsonify({
+                'bid_ticket_uuid': bid_ticket_uuid,
+                'status': BidStatus.REJECTED,
+                'result': {'message': 'Bid could not be processed, retry later.'}
+            }), status.HTTP_503_SERVICE_UNAVAILABLE if isinstance(bid_exception, RuntimeError) \
+                else status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        bid_result, bid_status = bid_future.result()
+        return jsonify({
+            'bid_ticket_uuid': bid_ticket_uuid,
+            'status': BidStatus.ACCEPTED if bid_status == status.HTTP_200_OK else BidStatus.REJECTED,
+            'result': bid_result
+        }), bid_status
+
+    def process_bid(self, bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Validates and places an item bid.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bidder_uuid: UUID representing the bidder.
+            - bid_price_in_usd: Submitted bid price.
+        Returns:
+            - Response json dictionary and http status.
+        """
         # Check if user exists.
         if not self.user_database_client.check_if_user_exists(user_uuid=bidder_uuid):
-            return ServerHelper.create_item_not_found_message(message=f'User with uuid {bid_item_uuid} does not exists.')
+            return {'message': f'User with uuid {bid_item_uuid} does not exists.'}, status.HTTP_404_NOT_FOUND
 
         # Check if item exists.
-        if not self.item_database_client.check_if_item_exists(item_uuid=bid_item_uuid):
-            return ServerHelper.create_item_not_found_message(message=f'Item with uuid {bid_item_uuid} does not exists.')
+        item_auction_state: ItemAuctionState = \
+            self.item_database_client.retrieve_item_auction_state(item_uuid=bid_item_uuid)
+        if not item_auction_state:
+            return {'message': f'Item with uuid {bid_item_uuid} does not exists.'}, status.HTTP_404_NOT_FOUND
 
         # Check if the bid is greater than the most recent bid.
-        item_most_recent_bid: Bid = self.bid_database_client.retrieve_item_most_recent_bid(item_uuid=bid_item_uuid)
-        if item_most_recent_bid and item_most_recent_bid.bid_price_in_usd >= bid_price_in_usd:
-            return ServerHelper.create_http_response(
-                message=f'Bid price should be higher than {item_most_recent_bid.bid_price_in_usd}', status=status.HTTP_400_BAD_REQUEST)
+        item_highest_bid_price_in_usd: int = item_auction_state.highest_bid_price_in_usd
+        if item_highest_bid_price_in_usd is not None and item_highest_bid_price_in_usd >= bid_price_in_usd:
+            return {'message': f'Bid price should be higher than {item_highest_bid_price_in_usd}'}, \
+                status.HTTP_400_BAD_REQUEST
 
-        new_bid_response: wrappers.Response = \
-            self.place_a_bid(bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid, bid_price_in_usd=bid_price_in_usd)
-        return new_bid_response
-    
-    def place_a_bid(self, bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int) -> wrappers.Response:
+        return self.place_a_bid(bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid, bid_price_in_usd=bid_price_in_usd)
+
+    def place_a_bid(self, bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int) -> Tuple[Dict[str, Any], int]:
         """
         Places an item bid with a given amount.
         Returns:
-            - Http response indicating the success or failure of item bid placement.
+            - Response json dictionary and http status indicating the success or failure of item bid placement.
         """
         # Check the bid close date.
         item_close_date: datetime.datetime = \
             self.item_database_client.retrieve_item_close_date(item_uuid=bid_item_uuid)
         if datetime.datetime.utcnow() > item_close_date:
-            return ServerHelper.create_http_response(
-                message='Bid is closed now', status=status.HTTP_400_BAD_REQUEST)
-
-        new_bid: Bid = self.bid_database_client.create_item_bid(
-            bid_price_in_usd=bid_price_in_usd, bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid)
-       
-        registered_item_auto_bidders_uuids_with_enough_funds: List[str] = \
-            self.auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds(
-                item_uuid=bid_item_uuid, highest_bider_uuid=bidder_uuid, current_highest_bid=new_bid.bid_price_in_usd)
-        
-        for auto_bidder_uuid in registered_item_auto_bidders_uuids_with_enough_funds:
-            self.place_a_bid(
-                bid_item_uuid=bid_item_uuid, bidder_uuid=auto_bidder_uuid, 
-                bid_price_in_usd=bid_price_in_usd + 1)
-        
-        return jsonify(new_bid.to_json_dict())
\ No newline at end of file
+            return {'message': 'Bid is closed now'}, status.HTTP_400_BAD_REQUEST
+
+        # Resolve triggered auto bids in closed form and save all bids at once.
+        new_bids: List[Bid] = self.auto_bid_resolver.place_bid(
+            bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid, bid_price_in_usd=bid_price_in_usd)
+        if new_bids:
+            return new_bids[0].to_json_dict(), status.HTTP_200_OK
+
+        # A concurrent bid won the conditional insert, or the cached state was stale: report the current state.
+        item_auction_state: ItemAuctionState = self.item_database_client.retrieve_item_auction_state(
+            item_uuid=bid_item_uuid, use_cache=False)
+        if datetime.datetime.utcnow() > item_auction_state.bid_expiration_timestamp:
+            return {'message': 'Bid is closed now'}, status.HTTP_400_BAD_REQUEST
+        return {'message': f'Bid price should be higher than {item_auction_state.highest_bid_price_in_usd}'}, \
+            status.HTTP_400_BAD_REQUEST
+
+    def publish_bids(self, bid_item_uuid: str, bids_json_dicts: List[Dict[str, Any]], item_version: Tuple[int, int]):
+        """
+        Publishes committed bids to the clients streaming their item, in placement order.
+        Called by ``bid_database_client`` for every accepted bid, auto bids included.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bids_json_dicts: Json dictionaries of the new bids, the submitted bid followed by the auto bids
+              it triggered.
+            - item_version: Item version of the commit of the bids.
+        """
+        for bid_json_dict in bids_json_dicts:
+            self.events_hub.publish(
+                item_uuid=bid_item_uuid, event_name='bid', data=bid_json_dict, event_id=bid_json_dict['bid_uuid'],
+                item_version=item_version)
@@ -0,0 +1,206 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from flask import json
+from collections import deque
+from typing import Any, Deque, Dict, List, Set, Tuple
+import threading
+
+
+class ItemSubscription:
+    """
+    Subscription of a client to the events of an item: a bounded buffer of serialized events, each with
+    the item version it was published at, filled by publishers and drained by the client stream.
+    """
+
+    def __init__(self, item_uuid: str, max_buffered_events: int):
+        self.item_uuid: str = item_uuid
+        self.max_buffered_events: int = max_buffered_events
+        # Set once the buffer overflows or the subscription is closed, no event is buffered anymore.
+        self.dropped: bool = False
+        self.__events: Deque[Tuple[str, Tuple[int, int]]] = deque()
+        self.__condition: threading.Condition = threading.Condition()
+
+    def push_event(self, event: str, item_version: Tuple[int, int] = None) -> bool:
+        """
+        Buffers an event, dropping the subscription when its buffer is full.
+        Inputs:
+            - event: Serialized event.
+            - item_version: Item version the event was published at, if any.
+        Returns:
+            - Whether the event was buffered.
+        """
+        with self.__condition:
+            if self.dropped:
+                return False
+            if len(self.__events) >= self.max_buffered_events:
+                self.dropped = True
+                self.__events.clear()
+                self.__condition.notify_all()
+                return False
+            self.__events.append((event, item_version))
+            self.__condition.notify_all()
+            return True
+
+    def retrieve_events(self, timeout: float) -> List[Tuple[str, Tuple[int, int]]]:
+        """
+        Drains the buffered events, waiting for one if there is none.
+        Inputs:
+            - timeout: Maximum time to wait, in seconds.
+        Returns:
+            - (event, item version) pairs of the buffered events, empty if none was published in time
+              or the subscription is dropped.
+        """
+        with self.__condition:
+            if not self.__events and not self.dropped:
+                self.__condition.wait(timeout)
+            events: List[Tuple[str, Tuple[int, int]]] = list(self.__events)
+            self.__events.clear()
+            return events
+
+    def close(self):
+        with self.__condition:
+            self.dropped = True
+            self.__events.clear()
+            self.__condition.notify_all()
+
+
+class ItemEventsHub:
+    """
+    In process publish/subscribe hub of item events, such as accepted bids, streamed to clients as
+    Server-Sent Events. An event is serialized once and fanned out to the subscriptions of its item.
+
+    Publishers never wait on clients: each subscription buffers at most ``max_buffered_events`` events
+    and a client falling that far behind is dropped, its stream ends and the client reconnects. Events
+    are only published to the subscriptions of the process: with pre-forked workers, streams also watch
+    the ``ItemVersions`` counters to notice the bids accepted by the other workers.
+    """
+
+    def __init__(self, max_subscribers: int = GeneralConstants.ITEM_EVENTS_MAX_SUBSCRIBERS,
+                 max_buffered_events: int = GeneralConstants.ITEM_EVENTS_MAX_BUFFERED_EVENTS):
+        self.max_subscribers: int = max_subscribers
+        self.max_buffered_events: int = max_buffered_events
+        self.published_events: int = 0
+        self.dropped_subscriptions: int = 0
+        self.__subscriptions: Dict[str, Set[ItemSubscription]] = {}
+        self.__subscriptions_count: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def subscriptions_count(self) -> int:
+        return self.__subscriptions_count
+
+    def subscribe(self, item_uuid: str) -> ItemSubscription:
+        """
+        Subscribes to the events of an item.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+        Returns:
+            - New subscription, None if the hub already has ``max_subscribers`` subscriptions.
+        """
+        with self.__lock:
+            if self.__subscriptions_count >= self.max_subscribers:
+                return None
+            subscription: ItemSubscription = ItemSubscription(
+                item_uuid=item_uuid, max_buffered_events=self.max_buffered_events)
+            self.__subscriptions.setdefault(item_uuid, set()).add(subscription)
+            self.__subscriptions_count += 1
+            return subscription
+
+    def unsubscribe(self, subscription: ItemSubscription):
+        """
+        Closes a subscription and forgets it, subscriptions already forgotten are ignored.
+        Inputs:
+            - subscription: Subscription to close.
+        """
+        subscription.close()
+        with self.__lock:
+            self.__discard_subscription(subscription=subscription)
+
+    def __discard_subscription(self, subscription: ItemSubscription):
+        item_subscriptions: Set[ItemSubscription] = self.__subscriptions.get(subscription.item_uuid)
+        if item_subscriptions is None or subscription not in item_subscriptions:
+            return
+        item_subscriptions.remove(subscription)
+        self.__subscriptions_count -= 1
+        if not item_subscriptions:
+            del self.__subscriptions[subscription.item_uuid]
+
+    def check_if_item_has_subscribers(self, item_uuid: str) -> bool:
+        """
+        Lets publishers skip building events nobody receives.
+        """
+        return item_uuid in self.__subscriptions
+
+    def publish(self, item_uuid: str, event_name: str, data: Dict[str, Any], event_id: str = None,
+                item_version: Tuple[int, int] = None) -> int:
+        """
+        Publishes an event to the subscriptions of an item, dropping the subscriptions whose buffer is full.
+        Inputs:
+            - item_uuid: UUID representing the item the event is about.
+            - event_name: Server-Sent Events event type.
+            - data: Json dictionary of the event.
+            - event_id: Optional Server-Sent Events event id.
+            - item_version: Item version of the change the event reports, lets streams tell which
+              version changes their events account for.
+        Returns:
+            - Number of subscriptions the event was buffered for.
+        """
+        with self.__lock:
+            item_subscriptions: List[ItemSubscription] = list(self.__subscriptions.get(item_uuid, ()))
+        if not item_subscriptions:
+            return 0
+
+        event: str = self.format_event(event_name=event_name, data=data, event_id=event_id)
+        dropped_subscriptions: List[ItemSubscription] = [
+            subscription for subscription in item_subscriptions
+            if not subscription.push_event(event=event, item_version=item_version)]
+        with self.__lock:
+            self.published_events += 1
+            for subscription in dropped_subscriptions:
+                self.__discard_subscription(subscription=subscription)
+            self.dropped_subscriptions += len(dropped_subscriptions)
+        return len(item_subscriptions) - len(dropped_subscriptions)
+
+    @staticmethod
+    def format_event(event_name: str, data: Dict[str, Any], event_id: str = None) -> str:
+        """
+        Serializes an event in the Server-Sent Events format.
+        Inputs:
+            - event_name: Event type.
+            - data: Json dictionary of the event, serialized on a single line.
+            - event_id: Optional event id.
+        Returns:
+            - Serialized event, terminated by a blank line.
+        """
+        event_id_line: str = f'id: {event_id}\n' if event_id is not None else ''
+        return f'{event_id_line}event: {event_name}\ndata: {json.dumps(data)}\n\n'
+
+    def retrieve_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            - Current subscriptions, published events and dropped subscriptions count.
+        """
+        with self.__lock:
+            return {
+                'subscriptions': self.__subscriptions_count, 'published_events': self.published_events,
+                'dropped_subscriptions': self.dropped_subscriptions
+            }
+
+    def clear(self):
+        """
+        Closes every subscription and resets the counters.
+        """
+        with self.__lock:
+            subscriptions: List[ItemSubscription] = [
+                subscription for item_subscriptions in self.__subscriptions.values()
+                for subscription in item_subscriptions]
+            self.__subscriptions = {}
+            self.__subscriptions_count = 0
+            self.published_events = 0
+            self.dropped_subscriptions = 0
+        for subscription in subscriptions:
+            subscription.close()
+
+
+item_events_hub = ItemEventsHub()
@@ -2,16 +2,26 @@ __author__ = "Frank Kwizera"
 
 from src.shared.server_routes import ItemManagementServerRoutes
 from src.storage.database_client import ItemDatabaseClient, BidDatabaseClient, AutoBidDatabaseClient
-from src.storage.database_tables import Item, Bid
+from src.storage.database_tables import Item, Bid, AutoBid
 from src.server.server_helper import ServerHelper
-from flask import jsonify, Flask, wrappers
+from src.server.response_cache import response_cache
+from src.server.item_events_hub import ItemEventsHub, ItemSubscription, item_events_hub
+from src.storage.item_versions import ItemVersions, item_versions
+from src.shared.constants import GeneralConstants, AuctionStatus, StreamFormat
+from flask import jsonify, json, Flask, request, wrappers, stream_with_context
+from flask_api import status
 from src.get_app import get_app
-from typing import List, Dict, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
 
 
 class ItemManagementServer:
-    def __init__(self):
+    def __init__(self, events_hub: ItemEventsHub = None):
+        """
+        Inputs:
+            - events_hub: Hub of the item events streamed to clients, defaults to ``item_events_hub``.
+        """
         self.app: Flask = get_app()
+        self.events_hub: ItemEventsHub = events_hub or item_events_hub
         self.map_endpoints(app=self.app)
 
         # Initiate database clients.
@@ -22,43 +32,265 @@ class ItemManagementServer:
     def map_endpoints(self, app: Flask):
         """
         Maps all item management server routes to the corresponding methods.
+        Listings and item details are served from ``response_cache`` until a write changes the items.
+        Listings filtered by auction status also change as time passes the close timestamps, they are not cached.
         """
-        app.add_url_rule(ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, endpoint="retrieve_all_items", view_func=self.retrieve_all_items, methods=['GET'])
-        app.add_url_rule(ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + '/<string:item_uuid>', endpoint="retrieve_item_details", view_func=self.retrieve_item_details, methods=['GET'])
+        retrieve_all_items: Callable[..., wrappers.Response] = response_cache.cached(
+            retrieve_version=item_versions.retrieve_items_version,
+            check_if_cacheable=lambda: 'status' not in request.args)(self.retrieve_all_items)
+        retrieve_item_details: Callable[..., wrappers.Response] = response_cache.cached(
+            retrieve_version=item_versions.retrieve_item_version)(self.retrieve_item_details)
+        app.add_url_rule(ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, endpoint="retrieve_all_items", view_func=retrieve_all_items, methods=['GET'])
+        app.add_url_rule(ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + '/<string:item_uuid>', endpoint="retrieve_item_details", view_func=retrieve_item_details, methods=['GET'])
+        app.add_url_rule(
+            ItemManagementServerRoutes.STREAM_ITEM + '<string:item_uuid>', endpoint="stream_item",
+            view_func=self.stream_item, methods=['GET'])
 
     def retrieve_all_items(self) -> wrappers.Response:
         """
-        Retrieves all stored items.
+        Retrieves one page of stored items.
+        Query parameters:
+            - limit: Page size, defaults to ``GeneralConstants.ITEMS_PAGE_DEFAULT_LIMIT``.
+            - cursor: ``next_cursor`` value returned with the previous page.
+            - status: Optional auction status filter, ``open`` or ``closed``.
+            - min_price_in_usd, max_price_in_usd: Optional current price range.
+            - stream: Optional ``json`` or ``ndjson``, streams every matching item after the cursor instead of a page.
         Returns:
-            - List of all items.
+            - Page items and the cursor of the next page, None on the last page.
+        """
+        try:
+            limit: int = int(request.args.get('limit', GeneralConstants.ITEMS_PAGE_DEFAULT_LIMIT))
+            after_item_id: int = self.parse_optional_int_query_parameter(parameter_name='cursor')
+            min_price_in_usd: int = self.parse_optional_int_query_parameter(parameter_name='min_price_in_usd')
+            max_price_in_usd: int = self.parse_optional_int_query_parameter(parameter_name='max_price_in_usd')
+        except ValueError:
+            return ServerHelper.create_http_response(
+                message='limit, cursor and prices should be integers.', status=status.HTTP_400_BAD_REQUEST)
+
+        if not 0 < limit <= GeneralConstants.ITEMS_PAGE_MAX_LIMIT:
+            return ServerHelper.create_http_response(
+                message=f'limit should be between 1 and {GeneralConstants.ITEMS_PAGE_MAX_LIMIT}.',
+                status=status.HTTP_400_BAD_REQUEST)
+
+        auction_status: str = request.args.get('status')
+        if auction_status not in (None, AuctionStatus.OPEN, AuctionStatus.CLOSED):
+            return ServerHelper.create_http_response(
+                message=f'status should be {AuctionStatus.OPEN} or {AuctionStatus.CLOSED}.',
+                status=status.HTTP_400_BAD_REQUEST)
+
+        stream_format: str = request.args.get('stream')
+        if stream_format not in (None, StreamFormat.JSON, StreamFormat.NDJSON):
+            return self.create_invalid_stream_format_response()
+
+        if stream_format:
+            items_json_dicts: Iterator[Dict[str, Union[str, int]]] = (
+                item.to_json_dict() for item in self.item_database_client.iterate_items(
+                    after_item_id=after_item_id, auction_status=auction_status,
+                    min_price_in_usd=min_price_in_usd, max_price_in_usd=max_price_in_usd))
+            return ServerHelper.create_streaming_response(
+                fragments=self.serialize_stream(json_dicts=items_json_dicts, stream_format=stream_format),
+                stream_format=stream_format)
+
+        # Fetch one extra item to know whether there is a next page.
+        items: List[Item] = self.item_database_client.retrieve_items_page(
+            limit=limit + 1, after_item_id=after_item_id, auction_status=auction_status,
+            min_price_in_usd=min_price_in_usd, max_price_in_usd=max_price_in_usd)
+        next_cursor: str = str(items[limit - 1].item_id) if len(items) > limit else None
+        return jsonify({
+            'items': [item.to_json_dict() for item in items[:limit]],
+            'next_cursor': next_cursor
+        })
+
+    @staticmethod
+    def parse_optional_int_query_parameter(parameter_name: str) -> int:
         """
-        all_items: List[Item] = self.item_database_client.retrieve_all_items()
-        return jsonify([item.to_json_dict() for item in all_items])
+        Parses an optional integer query parameter.
+        Inputs:
+            - parameter_name: Query parameter name.
+        Returns:
+            - Parsed value, None if the parameter is missing.
+        Raises:
+            - ValueError if the parameter is not an integer.
+        """
+        parameter_value: str = request.args.get(parameter_name)
+        return None if parameter_value is None else int(parameter_value)
+
+    @staticmethod
+    def serialize_stream(json_dicts: Iterable[Dict[str, Union[str, int]]], stream_format: str) -> Iterator[str]:
+        """
+        Serializes json dictionaries in the requested ``StreamFormat``.
+        """
+        if stream_format == StreamFormat.NDJSON:
+            return ServerHelper.iterate_ndjson_lines(json_dicts)
+        return ServerHelper.iterate_json_array(json_dicts)
+
+    @staticmethod
+    def create_invalid_stream_format_response() -> wrappers.Response:
+        return ServerHelper.create_http_response(
+            message=f'stream should be {StreamFormat.JSON} or {StreamFormat.NDJSON}.',
+            status=status.HTTP_400_BAD_REQUEST)
     
     def retrieve_item_details(self, item_uuid: str) -> wrappers.Response:
         """
         Retrieves single item details.
         Inputs:
             - item_uuid: UUID representing a target item record.
+        Query parameters:
+            - bids_limit: Optional number of most recent bids to return.
+            - stream: Optional ``json`` or ``ndjson``, streams the item bids and auto bidders.
         Returns:
             - Item record json dictionary.
         """
-        item: Item = self.item_database_client.retrieve_item_by_item_uuid(item_uuid=item_uuid)
+        stream_format: str = request.args.get('stream')
+        if stream_format not in (None, StreamFormat.JSON, StreamFormat.NDJSON):
+            return self.create_invalid_stream_format_response()
+
+        try:
+            bids_limit: int = self.parse_optional_int_query_parameter(parameter_name='bids_limit')
+            if bids_limit is not None and bids_limit < 0:
+                raise ValueError(bids_limit)
+        except ValueError:
+            return ServerHelper.create_http_response(
+                message='bids_limit should be a non-negative integer.', status=status.HTTP_400_BAD_REQUEST)
+
+        # Full bid histories are streamed straight from the database.
+        if stream_format and bids_limit is None:
+            item: Item = self.item_database_client.retrieve_item_by_item_uuid(item_uuid=item_uuid)
+            if not item:
+                return ServerHelper.create_item_not_found_message()
+            return ServerHelper.create_streaming_response(
+                fragments=self.stream_item_details(item=item, stream_format=stream_format),
+                stream_format=stream_format)
+
+        item, item_bids = self.item_database_client.retrieve_item_details(item_uuid=item_uuid, bids_limit=bids_limit)
         if not item:
             return ServerHelper.create_item_not_found_message()
-        
+
+        if stream_format:
+            return ServerHelper.create_streaming_response(
+                fragments=self.stream_item_details(
+                    item=item, stream_format=stream_format, item_bids=item_bids, item_auto_bidders=item.auto_bidders),
+                stream_format=stream_format)
+
         item_dict: Dict[str, Union[str, int]] = item.to_json_dict()
-        # Retrieve registered bids.
-        item_dict['item_bids'] = []
-        item_bids: List[Bid] = self.bid_database_client.retrieve_item_bids(item_uuid=item.item_uuid)
-        for item_bid in item_bids:
-            item_dict['item_bids'].append(item_bid.to_json_dict())
-
-        item_dict['item_auto_bidders'] = []
-        item_auto_bidders: List[AutoBid] = \
-            self.auto_bid_database_client.retrieve_item_auto_bidders(item_uuid=item.item_uuid)
-        
-        for item_auto_bidder in item_auto_bidders:
-            item_dict['item_auto_bidders'].append(item_auto_bidder.to_json_dict())
-
-        return jsonify(item_dict)
\ No newline at end of file
+        item_dict['item_bids'] = [item_bid.to_json_dict() for item_bid in item_bids]
+        item_dict['item_auto_bidders'] = [item_auto_bidder.to_json_dict() for item_auto_bidder in item.auto_bidders]
+        return jsonify(item_dict)
+
+    def stream_item_details(self, item: Item, stream_format: str, item_bids: Iterable[Bid] = None,
+                            item_auto_bidders: Iterable[AutoBid] = None) -> Iterator[str]:
+        """
+        Serializes item details while reading item bids and auto bidders from the database.
+        JSON streams have the same shape as the non streamed response. NDJSON streams send one
+        ``{"item": ...}`` line followed by one ``{"item_bid": ...}`` or ``{"item_auto_bidder": ...}`` line per record.
+        Inputs:
+            - item: Target item record.
+            - stream_format: Requested ``StreamFormat``.
+            - item_bids: Optional already retrieved bids, all item bids are read from the database by default.
+            - item_auto_bidders: Optional already retrieved auto bidders, read from the database by default.
+        Returns:
+            - Iterator of serialized fragments.
+        """
+        if item_bids is None:
+            item_bids = self.bid_database_client.iterate_item_bids(item_uuid=item.item_uuid)
+        if item_auto_bidders is None:
+            item_auto_bidders = self.auto_bid_database_client.iterate_item_auto_bidders(item_uuid=item.item_uuid)
+
+        item_bids_json_dicts: Iterator[Dict[str, Union[str, int]]] = (
+            item_bid.to_json_dict() for item_bid in item_bids)
+        item_auto_bidders_json_dicts: Iterator[Dict[str, Union[str, int]]] = (
+            item_auto_bidder.to_json_dict() for item_auto_bidder in item_auto_bidders)
+
+        if stream_format == StreamFormat.NDJSON:
+            yield from ServerHelper.iterate_ndjson_lines([{'item': item.to_json_dict()}])
+            yield from ServerHelper.iterate_ndjson_lines(
+                {'item_bid': item_bid_json_dict} for item_bid_json_dict in item_bids_json_dicts)
+            yield from ServerHelper.iterate_ndjson_lines(
+                {'item_auto_bidder': item_auto_bidder_json_dict}
+                for item_auto_bidder_json_dict in item_auto_bidders_json_dicts)
+            return
+
+        # Serialize the item keys one by one, then stream both arrays as the last keys.
+        yield '{'
+        for key, value in item.to_json_dict().items():
+            yield f'{json.dumps(key)}: {json.dumps(value)}, '
+        yield '"item_bids": '
+        yield from ServerHelper.iterate_json_array(item_bids_json_dicts)
+        yield ', "item_auto_bidders": '
+        yield from ServerHelper.iterate_json_array(item_auto_bidders_json_dicts)
+        yield '}'
+
+    def stream_item(self, item_uuid: str) -> wrappers.Response:
+        """
+        Streams the live state of an item as Server-Sent Events: an ``item`` event with the item record,
+        then a ``bid`` event per accepted bid, auto bids included. Comment lines are sent as heartbeats.
+        Lets clients watch auctions without polling ``retrieve_item_details``.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+        Returns:
+            - Event stream, ``204 No Content`` once the auction is closed so that clients stop reconnecting.
+        """
+        # Subscribe before reading the item, so that no bid is missed in between.
+        subscription: ItemSubscription = self.events_hub.subscribe(item_uuid=item_uuid)
+        if subscription is None:
+            return ServerHelper.create_http_response(
+                message='Too many item streams, retry later.', status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        item_version: Tuple[int, int] = item_versions.retrieve_item_version(item_uuid=item_uuid)
+        item: Item = self.item_database_client.retrieve_item_by_item_uuid(item_uuid=item_uuid)
+        if not item or item.auction_closed_timestamp:
+            self.events_hub.unsubscribe(subscription=subscription)
+            return ServerHelper.create_item_not_found_message() if not item else ('', status.HTTP_204_NO_CONTENT)
+
+        response: wrappers.Response = wrappers.Response(
+            stream_with_context(self.iterate_item_events(
+                subscription=subscription, item=item, item_version=item_version)),
+            mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Ask buffering proxies to forward events as they are sent.
+        response.headers['X-Accel-Buffering'] = 'no'
+        # The events iterator does not unsubscribe if the client disconnects before it starts.
+        response.call_on_close(lambda: self.events_hub.unsubscribe(subscription=subscription))
+        return response
+
+    def iterate_item_events(self, subscription: ItemSubscription, item: Item,
+                            item_version: Tuple[int, int]) -> Iterator[str]:
+        """
+        Serializes the events of an item subscription until the auction closes, the client disconnects
+        or falls behind. Bids accepted by other worker processes are not published to this process hub:
+        whenever the item version moves beyond the versions of the events received, the current item
+        record is sent as well.
+        Inputs:
+            - subscription: Subscription to the item events.
+            - item: Item record read after subscribing.
+            - item_version: Item version read before the item record.
+        Returns:
+            - Iterator of serialized events.
+        """
+        try:
+            yield f'retry: {GeneralConstants.ITEM_EVENTS_RETRY_INTERVAL_IN_MS}\n'
+            yield ItemEventsHub.format_event(event_name='item', data=item.to_json_dict())
+            while not subscription.dropped:
+                events: List[Tuple[str, Tuple[int, int]]] = subscription.retrieve_events(
+                    timeout=GeneralConstants.ITEM_EVENTS_HEARTBEAT_INTERVAL_IN_SECONDS)
+                for _, event_item_version in events:
+                    # Events only account for the commit right after the version already streamed.
+                    if event_item_version is not None and \
+                            ItemVersions.check_if_next_item_version(item_version, event_item_version):
+                        item_version = event_item_version
+                if events:
+                    yield ''.join(event for event, _ in events)
+
+                current_item_version: Tuple[int, int] = item_versions.retrieve_item_version(item_uuid=item.item_uuid)
+                if current_item_version == item_version:
+                    if not events:
+                        yield ': heartbeat\n\n'
+                    continue
+
+                item_version = current_item_version
+                item = self.item_database_client.retrieve_item_by_item_uuid(item_uuid=item.item_uuid)
+                yield ItemEventsHub.format_event(event_name='item', data=item.to_json_dict())
+                if item.auction_closed_timestamp:
+                    return
+        finally:
+            self.events_hub.unsubscribe(subscription=subscription)
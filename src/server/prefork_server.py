@@ -0,0 +1,176 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from werkzeug.serving import BaseWSGIServer, select_address_family
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask
+from typing import Callable, Dict, List, Tuple
+import threading
+import logging
+import signal
+import socket
+import os
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class ThreadPoolWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug WSGI server accepting connections on an inherited socket and handling
+    requests on a fixed size thread pool.
+
+    Requests to ``stream_routes`` are long lived and mostly idle, such as Server-Sent Events streams:
+    they are handed to a thread of their own instead of holding a pool thread for their whole life.
+    """
+    multiprocess = True
+
+    def __init__(self, host: str, app: Flask, threads: int, fd: int, stream_routes: Tuple[str, ...] = ()):
+        BaseWSGIServer.__init__(self, host, 0, app, fd=fd)
+        self.multithread: bool = threads > 1 or bool(stream_routes)
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=threads)
+        self.stream_routes: Tuple[bytes, ...] = tuple(stream_route.encode() for stream_route in stream_routes)
+
+    def process_request(self, request: socket.socket, client_address):
+        self.executor.submit(self.dispatch_request, request, client_address)
+
+    def dispatch_request(self, request: socket.socket, client_address):
+        """
+        Handles a request on the current pool thread, or on a new thread for stream requests.
+        """
+        if self.stream_routes and self.check_if_stream_request(request=request):
+            threading.Thread(
+                target=self.process_request_in_thread, args=(request, client_address), daemon=True).start()
+            return
+        self.process_request_in_thread(request, client_address)
+
+    def check_if_stream_request(self, request: socket.socket) -> bool:
+        """
+        Peeks at the request line, left in the socket for the request handler.
+        Request lines split across packets are not recognized, the request is then handled by the pool.
+        """
+        try:
+            request_line: bytes = request.recv(
+                GeneralConstants.STREAM_REQUEST_LINE_PEEK_SIZE_IN_BYTES, socket.MSG_PEEK).split(b'\r\n', 1)[0]
+        except OSError:
+            return False
+        request_line_parts: List[bytes] = request_line.split(b' ')
+        return len(request_line_parts) > 1 and request_line_parts[1].startswith(self.stream_routes)
+
+    def process_request_in_thread(self, request: socket.socket, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        self.executor.shutdown(wait=True)
+        BaseWSGIServer.server_close(self)
+
+
+class PreforkServer:
+    """
+    Pre-forking WSGI server: the parent process binds the listen socket, then forks worker
+    processes that accept connections on it. Workers that exit are replaced until the
+    parent receives SIGINT or SIGTERM.
+    """
+
+    def __init__(self, app: Flask, host: str, port: int, workers: int, threads: int = 1,
+                 before_fork: Callable[[], None] = None, after_fork: Callable[[int], None] = None,
+                 stream_routes: Tuple[str, ...] = ()):
+        """
+        Inputs:
+            - app: WSGI application to serve.
+            - host: Listen address.
+            - port: Listen port, 0 picks a free port.
+            - workers: Number of worker processes.
+            - threads: Number of request handling threads per worker.
+            - before_fork: Called in the parent before forking, e.g. to close database connections.
+            - after_fork: Called in each worker right after the fork with the worker slot number,
+              e.g. to re-create database engines.
+            - stream_routes: Paths prefixes of the long lived requests served outside of the thread pool.
+        """
+        self.app: Flask = app
+        self.host: str = host
+        self.workers: int = workers
+        self.threads: int = threads
+        self.before_fork: Callable[[], None] = before_fork
+        self.after_fork: Callable[[int], None] = after_fork
+        self.stream_routes: Tuple[str, ...] = stream_routes
+        self.workers_pids: Dict[int, int] = {}
+        self.running: bool = False
+
+        self.listen_socket: socket.socket = socket.socket(select_address_family(host, port), socket.SOCK_STREAM)
+        self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listen_socket.bind((host, port))
+        self.listen_socket.listen(BaseWSGIServer.request_queue_size)
+        self.port: int = self.listen_socket.getsockname()[1]
+
+    def serve_forever(self):
+        """
+        Starts the workers and supervises them until the server is stopped.
+        """
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f'Serving on {self.host}:{self.port} with {self.workers} workers x {self.threads} threads')
+
+        for worker_index in range(self.workers):
+            self.spawn_worker(worker_index=worker_index)
+
+        while self.workers_pids:
+            try:
+                exited_pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            worker_index: int = self.workers_pids.pop(exited_pid, None)
+            if self.running and worker_index is not None:
+                logger.warning(f'Worker {exited_pid} exited, starting a new one.')
+                self.spawn_worker(worker_index=worker_index)
+
+        self.listen_socket.close()
+
+    def spawn_worker(self, worker_index: int):
+        """
+        Forks a worker process serving requests on the shared listen socket.
+        Inputs:
+            - worker_index: Worker slot number.
+        """
+        if self.before_fork:
+            self.before_fork()
+
+        worker_pid: int = os.fork()
+        if worker_pid:
+            self.workers_pids[worker_pid] = worker_index
+            return
+
+        # Worker process: default signal handling, own database connections.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code: int = 0
+        try:
+            if self.after_fork:
+                self.after_fork(worker_index)
+            ThreadPoolWSGIServer(
+                host=self.host, app=self.app, threads=self.threads,
+                fd=self.listen_socket.fileno(), stream_routes=self.stream_routes).serve_forever()
+        except BaseException:
+            logger.exception(f'Worker {os.getpid()} crashed.')
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def stop(self, *args):
+        """
+        Stops supervising and terminates every worker.
+        """
+        self.running = False
+        for worker_pid in list(self.workers_pids):
+            try:
+                os.kill(worker_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers_pids.pop(worker_pid, None)
@@ -0,0 +1,361 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.query_instrumentation import query_instrumentation
+from src.server.response_cache import response_cache
+from src.server.item_events_hub import item_events_hub
+from src.shared.server_routes import MetricsServerRoutes
+from src.shared.constants import GeneralConstants
+from flask import Flask, Response, g, has_request_context, request, wrappers
+from typing import Dict, Iterator, List, Tuple
+import multiprocessing
+import itertools
+import threading
+import logging
+import ctypes
+import bisect
+import time
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class ShardedHistogram:
+    """
+    Cumulative histogram split in shards, each guarded by its own lock. Threads are assigned shards in
+    turn on their first record and keep recording into theirs, so concurrent request threads rarely
+    wait on each other. Thread identifiers are not used: they are aligned addresses on Linux.
+
+    Counts are kept in ``values``, a block of doubles which may be shared memory: from ``first_index``, one
+    region per worker process, each made of ``SHARDS_COUNT`` shards of one count per bucket, the ``+Inf``
+    count and the sum of observed values. A histogram records into the region of ``worker_index`` and
+    its snapshot adds every region up, so that the histograms of every worker over the same block agree.
+    """
+    SHARDS_COUNT: int = 16
+    __threads_shards: threading.local = threading.local()
+    __shards_counter: Iterator[int] = itertools.count()
+
+    def __init__(self, buckets: Tuple[float, ...], values: ctypes.Array = None, first_index: int = 0,
+                 workers: int = 1, worker_index: int = 0):
+        """
+        Inputs:
+            - buckets: Sorted bucket upper bounds, a last ``+Inf`` bucket is implied.
+            - values: Block of doubles holding the counts, a private block is allocated by default.
+            - first_index: Index of the first count of the histogram in ``values``.
+            - workers: Number of worker process regions.
+            - worker_index: Region the histogram records into.
+        """
+        self.buckets: Tuple[float, ...] = buckets
+        self.workers: int = workers
+        self.shard_size: int = len(buckets) + 2
+        self.region_size: int = self.SHARDS_COUNT * self.shard_size
+        self.__values: ctypes.Array = values if values is not None else \
+            (ctypes.c_double * (workers * self.region_size))()
+        self.__first_index: int = first_index
+        self.__region_index: int = first_index + worker_index * self.region_size
+        self.__locks: List[threading.Lock] = [threading.Lock() for _ in range(self.SHARDS_COUNT)]
+
+    @classmethod
+    def retrieve_shard_index(cls) -> int:
+        """
+        Returns:
+            - Shard index of the current thread, the same for every histogram.
+        """
+        shard_index: int = getattr(cls.__threads_shards, 'shard_index', None)
+        if shard_index is None:
+            shard_index = cls.__threads_shards.shard_index = next(cls.__shards_counter) % cls.SHARDS_COUNT
+        return shard_index
+
+    def observe(self, value: float):
+        shard_index: int = self.retrieve_shard_index()
+        shard_first_index: int = self.__region_index + shard_index * self.shard_size
+        bucket_index: int = bisect.bisect_left(self.buckets, value)
+        with self.__locks[shard_index]:
+            self.__values[shard_first_index + bucket_index] += 1
+            self.__values[shard_first_index + self.shard_size - 1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """
+        Returns:
+            - Cumulative counts of every bucket, ``+Inf`` included, and the sum of observed values, over
+              every worker region. Other workers are read without locking, a record in progress may be
+              partially included.
+        """
+        totals: List[float] = [0.0] * self.shard_size
+        last_index: int = self.__first_index + self.workers * self.region_size
+        for shard_first_index in range(self.__first_index, last_index, self.shard_size):
+            for index, value in enumerate(self.__values[shard_first_index:shard_first_index + self.shard_size]):
+                totals[index] += value
+        cumulative_counts: List[int] = []
+        count: int = 0
+        for bucket_count in totals[:-1]:
+            count += int(bucket_count)
+            cumulative_counts.append(count)
+        return cumulative_counts, totals[-1]
+
+
+class RequestMetrics:
+    """
+    Per endpoint request metrics, served in the Prometheus text format on ``/metrics``.
+
+    Records the latency of every request by endpoint and status, and for bid endpoints the number of bids
+    written and the depth of the auto bid cascades they trigger, i.e the number of auto bidders
+    the submitted bid is resolved against.
+
+    Histograms live in shared memory, allocated by ``allocate`` before the worker processes are forked,
+    so that whichever worker serves ``/metrics`` reports the histograms of every worker. Series are
+    registered in a shared table on their first record, up to ``max_series``; later series are not
+    exported. A worker replacing an exited one keeps recording into its region, so counts never go back.
+    The statements, response cache and item events counters are kept by each process: they are
+    labelled with the ``worker`` serving the scrape.
+    """
+    LATENCY_BUCKETS_IN_SECONDS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    AUTO_BID_CASCADE_DEPTH_BUCKETS: Tuple[float, ...] = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+    BIDS_WRITTEN_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 10, 50, 100, 500, 1000)
+    # Buckets and help of every histogram, by metric name.
+    HISTOGRAMS: Dict[str, Tuple[Tuple[float, ...], str]] = {
+        'auction_request_duration_seconds': (LATENCY_BUCKETS_IN_SECONDS, 'Request latency by endpoint and status.'),
+        'auction_bids_written_per_request': (BIDS_WRITTEN_BUCKETS, 'Bids written by a request, auto bids included.'),
+        'auction_auto_bid_cascade_depth': (
+            AUTO_BID_CASCADE_DEPTH_BUCKETS, 'Auto bidders a submitted bid is resolved against.')
+    }
+    # Endpoint of the bids processed outside of a request, by the bid ingestion pipeline.
+    BACKGROUND_ENDPOINT: str = 'background'
+
+    def __init__(self, max_series: int = GeneralConstants.METRICS_MAX_SERIES, workers: int = 1):
+        """
+        Inputs:
+            - max_series: Maximum number of histogram series.
+            - workers: Number of worker processes recording metrics.
+        """
+        self.max_series: int = max_series
+        self.series_key_size: int = GeneralConstants.METRICS_SERIES_KEY_MAX_SIZE_IN_BYTES
+        # Histogram of a series: ``SHARDS_COUNT`` shards per worker, sized for the histogram with most buckets.
+        self.series_region_size: int = ShardedHistogram.SHARDS_COUNT * (
+            max(len(buckets) for buckets, _ in self.HISTOGRAMS.values()) + 2)
+        self.worker_index: int = 0
+        # Histograms of this process over the shared memory, by (metric name, Prometheus labels).
+        self.__histograms: Dict[Tuple[str, str], ShardedHistogram] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.allocate(workers=workers)
+
+    def allocate(self, workers: int):
+        """
+        Allocates the shared memory of the histograms of ``workers`` worker processes, dropping the recorded
+        ones. Has to be called before the workers are forked.
+        Inputs:
+            - workers: Number of worker processes.
+        """
+        with self.__lock:
+            self.workers: int = workers
+            # Series keys, with the number of registered series, guarded by the lock of the keys.
+            self.__series_keys: multiprocessing.Array = multiprocessing.Array(
+                ctypes.c_char, self.max_series * self.series_key_size)
+            self.__series_count: multiprocessing.Value = multiprocessing.Value(ctypes.c_int, 0, lock=False)
+            self.__values: ctypes.Array = multiprocessing.RawArray(
+                ctypes.c_double, self.max_series * workers * self.series_region_size)
+            self.__histograms = {}
+
+    def select_worker(self, worker_index: int):
+        """
+        Makes this process record into the histograms region of a worker. Called in each worker after the fork.
+        Inputs:
+            - worker_index: Worker slot number, lower than the allocated number of workers.
+        """
+        with self.__lock:
+            self.worker_index = worker_index
+            self.__histograms = {}
+
+    def install(self, app: Flask):
+        """
+        Records the requests of ``app`` and maps the metrics endpoint.
+        Inputs:
+            - app: Flask app.
+        """
+        app.before_request(self.start_request)
+        app.after_request(self.record_request)
+        app.add_url_rule(
+            MetricsServerRoutes.METRICS, endpoint="retrieve_metrics", view_func=self.retrieve_metrics, methods=['GET'])
+
+    def retrieve_histogram(self, metric_name: str, labels: str) -> ShardedHistogram:
+        """
+        Retrieves the histogram of a series, registered on first use.
+        Inputs:
+            - metric_name: Prometheus metric name, one of ``HISTOGRAMS``.
+            - labels: Prometheus labels, e.g ``endpoint="submit_a_bid"``.
+        Returns:
+            - Histogram, not exported if every series is taken.
+        """
+        histogram: ShardedHistogram = self.__histograms.get((metric_name, labels))
+        if histogram is not None:
+            return histogram
+        buckets: Tuple[float, ...] = self.HISTOGRAMS[metric_name][0]
+        with self.__lock:
+            histogram = self.__histograms.get((metric_name, labels))
+            if histogram is None:
+                series_index: int = self.register_series(series_key=f'{metric_name} {labels}')
+                if series_index is None:
+                    logger.warning(f'Metrics series {metric_name}{{{labels}}} dropped, {self.max_series} taken.')
+                    histogram = ShardedHistogram(buckets=buckets)
+                else:
+                    histogram = ShardedHistogram(
+                        buckets=buckets, values=self.__values,
+                        first_index=series_index * self.workers * self.series_region_size,
+                        workers=self.workers, worker_index=self.worker_index)
+                self.__histograms[(metric_name, labels)] = histogram
+        return histogram
+
+    def register_series(self, series_key: str) -> int:
+        """
+        Finds a series in the shared table, or adds it.
+        Inputs:
+            - series_key: Metric name and labels, separated by a space.
+        Returns:
+            - Series index, None if the table is full or the key too long.
+        """
+        encoded_series_key: bytes = series_key.encode()
+        if len(encoded_series_key) > self.series_key_size:
+            return None
+        with self.__series_keys.get_lock():
+            series_keys: bytes = self.__series_keys.raw
+            for series_index in range(self.__series_count.value):
+                first_index: int = series_index * self.series_key_size
+                if series_keys[first_index:first_index + self.series_key_size].rstrip(b'\0') == encoded_series_key:
+                    return series_index
+            series_index = self.__series_count.value
+            if series_index >= self.max_series:
+                return None
+            first_index = series_index * self.series_key_size
+            self.__series_keys[first_index:first_index + len(encoded_series_key)] = encoded_series_key
+            self.__series_count.value += 1
+            return series_index
+
+    def retrieve_series_keys(self) -> List[Tuple[str, str]]:
+        """
+        Returns:
+            - (metric name, Prometheus labels) of every series registered by any worker.
+        """
+        with self.__series_keys.get_lock():
+            series_keys: bytes = self.__series_keys.raw
+            series_count: int = self.__series_count.value
+        return [
+            tuple(series_keys[first_index:first_index + self.series_key_size].rstrip(b'\0').decode().split(' ', 1))
+            for first_index in range(0, series_count * self.series_key_size, self.series_key_size)]
+
+    @staticmethod
+    def start_request():
+        g.request_started_at = time.perf_counter()
+
+    def record_request(self, response: wrappers.Response) -> wrappers.Response:
+        """
+        Records the request latency, status, bids written and auto bid cascades depth.
+        """
+        endpoint: str = str(request.endpoint)
+        if 'request_started_at' in g:
+            self.retrieve_histogram(
+                metric_name='auction_request_duration_seconds',
+                labels=f'endpoint="{endpoint}",status="{response.status_code}"'
+            ).observe(time.perf_counter() - g.request_started_at)
+        if 'bids_written' in g:
+            self.retrieve_histogram(
+                metric_name='auction_bids_written_per_request', labels=f'endpoint="{endpoint}"').observe(g.bids_written)
+        return response
+
+    def record_bids_written(self, bids_count: int):
+        """
+        Adds written bids to the current request, or records them directly outside of a request.
+        Inputs:
+            - bids_count: Number of bids written.
+        """
+        if has_request_context():
+            g.bids_written = g.get('bids_written', 0) + bids_count
+        else:
+            self.retrieve_histogram(
+                metric_name='auction_bids_written_per_request', labels=f'endpoint="{self.BACKGROUND_ENDPOINT}"'
+            ).observe(bids_count)
+
+    def record_auto_bid_cascade(self, depth: int):
+        """
+        Records an auto bid resolution.
+        Inputs:
+            - depth: Number of auto bidders registered on the item.
+        """
+        endpoint: str = str(request.endpoint) if has_request_context() else self.BACKGROUND_ENDPOINT
+        self.retrieve_histogram(
+            metric_name='auction_auto_bid_cascade_depth', labels=f'endpoint="{endpoint}"').observe(depth)
+
+    def iterate_metrics_lines(self) -> Iterator[str]:
+        """
+        Serializes every metric in the Prometheus text exposition format.
+        Returns:
+            - Iterator of lines.
+        """
+        series_keys: List[Tuple[str, str]] = sorted(self.retrieve_series_keys())
+        for metric_name, (_, metric_help) in self.HISTOGRAMS.items():
+            yield f'# HELP {metric_name} {metric_help}'
+            yield f'# TYPE {metric_name} histogram'
+            for histogram_name, labels in series_keys:
+                if histogram_name != metric_name:
+                    continue
+                histogram: ShardedHistogram = self.retrieve_histogram(metric_name=metric_name, labels=labels)
+                cumulative_counts, values_sum = histogram.snapshot()
+                for bucket, cumulative_count in zip(histogram.buckets + ('+Inf', ), cumulative_counts):
+                    yield f'{metric_name}_bucket{{{labels},le="{bucket}"}} {cumulative_count}'
+                yield f'{metric_name}_sum{{{labels}}} {values_sum}'
+                yield f'{metric_name}_count{{{labels}}} {cumulative_counts[-1]}'
+
+        worker_label: str = f'worker="{self.worker_index}"'
+        yield '# HELP auction_sql_statements_total SQL statements by endpoint.'
+        yield '# TYPE auction_sql_statements_total counter'
+        endpoints_stats: Dict[str, Dict[str, float]] = query_instrumentation.retrieve_endpoints_stats()
+        for endpoint, endpoint_stats in sorted(endpoints_stats.items()):
+            yield f'auction_sql_statements_total{{endpoint="{endpoint}",{worker_label}}} {endpoint_stats["statements"]}'
+        yield '# HELP auction_sql_statements_seconds_total SQL statements time by endpoint.'
+        yield '# TYPE auction_sql_statements_seconds_total counter'
+        for endpoint, endpoint_stats in sorted(endpoints_stats.items()):
+            yield f'auction_sql_statements_seconds_total{{endpoint="{endpoint}",{worker_label}}} ' \
+                f'{endpoint_stats["time_in_seconds"]}'
+
+        response_cache_stats: Dict[str, int] = response_cache.retrieve_stats()
+        for stat_name, metric_help in (
+                ('hits', 'Responses served from the response cache.'),
+                ('misses', 'Cacheable responses built by their view.'),
+                ('not_modified', 'Not modified responses to If-None-Match requests.'),
+                ('evictions', 'Responses evicted from the response cache.')):
+            yield f'# HELP auction_response_cache_{stat_name}_total {metric_help}'
+            yield f'# TYPE auction_response_cache_{stat_name}_total counter'
+            yield f'auction_response_cache_{stat_name}_total{{{worker_label}}} {response_cache_stats[stat_name]}'
+        yield '# HELP auction_response_cache_size_bytes Size of the cached responses bodies.'
+        yield '# TYPE auction_response_cache_size_bytes gauge'
+        yield f'auction_response_cache_size_bytes{{{worker_label}}} {response_cache_stats["size_in_bytes"]}'
+
+        item_events_stats: Dict[str, int] = item_events_hub.retrieve_stats()
+        yield '# HELP auction_item_events_subscriptions Clients streaming item events.'
+        yield '# TYPE auction_item_events_subscriptions gauge'
+        yield f'auction_item_events_subscriptions{{{worker_label}}} {item_events_stats["subscriptions"]}'
+        for stat_name, metric_help in (
+                ('published_events', 'Item events published to at least one subscription.'),
+                ('dropped_subscriptions', 'Item events subscriptions dropped for falling behind.')):
+            yield f'# HELP auction_item_events_{stat_name}_total {metric_help}'
+            yield f'# TYPE auction_item_events_{stat_name}_total counter'
+            yield f'auction_item_events_{stat_name}_total{{{worker_label}}} {item_events_stats[stat_name]}'
+
+    def retrieve_metrics(self) -> wrappers.Response:
+        """
+        Serves the metrics in the Prometheus text exposition format.
+        """
+        return Response(
+            '\n'.join(self.iterate_metrics_lines()) + '\n', mimetype='text/plain',
+            content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def reset(self):
+        """
+        Clears every recorded histogram, of every worker.
+        """
+        with self.__series_keys.get_lock():
+            ctypes.memset(self.__values, 0, ctypes.sizeof(self.__values))
+            ctypes.memset(self.__series_keys.get_obj(), 0, ctypes.sizeof(self.__series_keys.get_obj()))
+            self.__series_count.value = 0
+        with self.__lock:
+            self.__histograms = {}
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,156 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import Directories, GeneralConstants
+from flask import Flask, current_app, request
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Set
+import threading
+import random
+import time
+import sys
+import os
+
+
+class RequestProfiler:
+    """
+    Samples the call stacks of selected requests and dumps them per endpoint as collapsed stacks,
+    the input format of flamegraph tools, to ``Directories.profiles_root()``.
+
+    A request is profiled with the ``PROFILING_SAMPLE_RATE`` app config probability, optionally
+    restricted to the ``PROFILING_ENDPOINTS`` endpoint names, or when it carries the ``X-Profile: 1``
+    header and ``PROFILING_HEADER_ENABLED`` is set. While profiled requests are running, a sampler
+    thread records their stack every ``PROFILING_INTERVAL_IN_SECONDS``. Stacks are sampled rather
+    than traced with cProfile, which only keeps caller and callee pairs instead of whole stacks, and
+    slows down every call of the profiled request.
+
+    Profiling is disabled by default: requests then only pay two config lookups.
+    """
+    PROFILE_HEADER: str = 'X-Profile'
+
+    def __init__(self):
+        self.__profiled_threads: Dict[int, str] = {}
+        self.__endpoints_stacks: Dict[str, Counter] = {}
+        self.__endpoints_requests_counts: Dict[str, int] = {}
+        self.__dirty_endpoints: Set[str] = set()
+        self.__condition: threading.Condition = threading.Condition()
+        self.__sampler_thread: threading.Thread = None
+        self.interval_in_seconds: float = GeneralConstants.PROFILING_INTERVAL_IN_SECONDS
+        self.dump_interval_in_seconds: float = GeneralConstants.PROFILING_DUMP_INTERVAL_IN_SECONDS
+
+    def install(self, app: Flask):
+        """
+        Profiles the requests of ``app`` selected by its config.
+        Inputs:
+            - app: Flask app.
+        """
+        app.config.setdefault('PROFILING_SAMPLE_RATE', GeneralConstants.PROFILING_SAMPLE_RATE)
+        app.config.setdefault('PROFILING_ENDPOINTS', None)
+        app.config.setdefault('PROFILING_HEADER_ENABLED', False)
+        app.before_request(self.start_profiling)
+        app.teardown_request(self.stop_profiling)
+
+    @classmethod
+    def should_profile(cls) -> bool:
+        """
+        Returns:
+            - Whether the current request is to be profiled.
+        """
+        config: Dict = current_app.config
+        if config['PROFILING_HEADER_ENABLED'] and request.headers.get(cls.PROFILE_HEADER) == '1':
+            return True
+        sample_rate: float = config['PROFILING_SAMPLE_RATE']
+        if not sample_rate or random.random() >= sample_rate:
+            return False
+        return config['PROFILING_ENDPOINTS'] is None or request.endpoint in config['PROFILING_ENDPOINTS']
+
+    def start_profiling(self):
+        if not self.should_profile():
+            return
+        endpoint: str = str(request.endpoint)
+        with self.__condition:
+            self.__profiled_threads[threading.get_ident()] = endpoint
+            self.__endpoints_requests_counts[endpoint] = self.__endpoints_requests_counts.get(endpoint, 0) + 1
+            # Threads do not survive forks: a pre-forked worker starts its own sampler.
+            if self.__sampler_thread is None or not self.__sampler_thread.is_alive():
+                self.__sampler_thread = threading.Thread(
+                    target=self.sample_stacks, name='request-profiler', daemon=True)
+                self.__sampler_thread.start()
+            self.__condition.notify_all()
+
+    def stop_profiling(self, exception: BaseException = None):
+        if threading.get_ident() in self.__profiled_threads:
+            with self.__condition:
+                self.__profiled_threads.pop(threading.get_ident(), None)
+
+    @staticmethod
+    def collapse_stack(frame: FrameType) -> str:
+        """
+        Returns:
+            - Stack of ``frame`` from its outermost caller, as ``file:function`` names separated by semicolons.
+        """
+        frames_names: List[str] = []
+        while frame is not None:
+            frames_names.append(f'{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}')
+            frame = frame.f_back
+        return ';'.join(reversed(frames_names))
+
+    def sample_stacks(self):
+        """
+        Samples the stacks of profiled requests, and periodically dumps them. Runs on the sampler thread.
+        """
+        last_dump_at: float = time.monotonic()
+        while True:
+            with self.__condition:
+                while not self.__profiled_threads:
+                    if self.__dirty_endpoints:
+                        break
+                    self.__condition.wait()
+                profiled_threads: Dict[int, str] = dict(self.__profiled_threads)
+
+            threads_frames: Dict[int, FrameType] = sys._current_frames()
+            for thread_id, endpoint in profiled_threads.items():
+                frame: FrameType = threads_frames.get(thread_id)
+                if frame is not None:
+                    stack: str = self.collapse_stack(frame=frame)
+                    with self.__condition:
+                        self.__endpoints_stacks.setdefault(endpoint, Counter())[stack] += 1
+                        self.__dirty_endpoints.add(endpoint)
+            del threads_frames
+
+            if not profiled_threads or time.monotonic() - last_dump_at >= self.dump_interval_in_seconds:
+                self.dump()
+                last_dump_at = time.monotonic()
+            time.sleep(self.interval_in_seconds)
+
+    def dump(self):
+        """
+        Writes the stacks of every endpoint sampled since the last dump to
+        ``<profiles root>/<endpoint>.<process id>.collapsed``, one ``stack count`` line per stack.
+        """
+        with self.__condition:
+            endpoints_stacks: Dict[str, Counter] = {
+                endpoint: Counter(self.__endpoints_stacks[endpoint]) for endpoint in self.__dirty_endpoints}
+            self.__dirty_endpoints = set()
+
+        for endpoint, stacks in endpoints_stacks.items():
+            profile_path: str = os.path.join(Directories.profiles_root(), f'{endpoint}.{os.getpid()}.collapsed')
+            with open(profile_path, 'w') as profile_file:
+                for stack, count in stacks.most_common():
+                    profile_file.write(f'{stack} {count}\n')
+
+    def retrieve_endpoints_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns:
+            - Profiled requests count and stack samples count by endpoint.
+        """
+        with self.__condition:
+            return {
+                endpoint: {
+                    'requests': requests_count,
+                    'samples': sum(self.__endpoints_stacks.get(endpoint, Counter()).values())
+                } for endpoint, requests_count in self.__endpoints_requests_counts.items()
+            }
+
+
+request_profiler = RequestProfiler()
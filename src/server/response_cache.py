@@ -0,0 +1,166 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from flask import current_app, request, wrappers
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+import functools
+import threading
+import hashlib
+
+
+class CachedResponse:
+    """
+    Serialized body of a successful response, with the version of the data it was built from.
+    """
+
+    def __init__(self, version: Hashable, body: bytes, mimetype: str):
+        self.version: Hashable = version
+        self.body: bytes = body
+        self.mimetype: str = mimetype
+        self.etag: str = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def __repr__(self):
+        return f'<CachedResponse: {self.version} {len(self.body)} bytes>'
+
+
+class ResponseCache:
+    """
+    In memory, per process, LRU cache of serialized responses, bounded by the total size of their bodies.
+
+    Responses are cached by endpoint, view arguments and query parameters, together with the version of
+    the data they were built from, see ``ItemVersions``. A cached response is served while that version
+    is unchanged, without querying the database nor serializing again. Responses carry a strong ETag,
+    the hash of their body, and ``Cache-Control: no-cache`` so that clients poll with ``If-None-Match``
+    and get a ``304 Not Modified`` until the data changes. Streamed and unsuccessful responses are not cached.
+    """
+
+    def __init__(self, max_size_in_bytes: int = GeneralConstants.RESPONSE_CACHE_MAX_SIZE_IN_BYTES):
+        self.max_size_in_bytes: int = max_size_in_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.not_modified: int = 0
+        self.evictions: int = 0
+        self.__responses: OrderedDict = OrderedDict()
+        self.__size_in_bytes: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self.__size_in_bytes
+
+    def __len__(self) -> int:
+        return len(self.__responses)
+
+    def get_response(self, key: Hashable, version: Hashable) -> CachedResponse:
+        """
+        Retrieves a cached response and marks it as recently used.
+        Inputs:
+            - key: Response key.
+            - version: Current version of the response data.
+        Returns:
+            - Cached response, None if it is not cached or was built from another version.
+        """
+        with self.__lock:
+            cached_response: CachedResponse = self.__responses.get(key)
+            if cached_response is None or cached_response.version != version:
+                self.misses += 1
+                return None
+            self.__responses.move_to_end(key)
+            self.hits += 1
+            return cached_response
+
+    def set_response(self, key: Hashable, cached_response: CachedResponse):
+        """
+        Caches a response, evicting the least recently used responses until the cache fits its size.
+        Inputs:
+            - key: Response key.
+            - cached_response: Response to cache.
+        """
+        if len(cached_response.body) > self.max_size_in_bytes:
+            return
+        with self.__lock:
+            replaced_response: CachedResponse = self.__responses.pop(key, None)
+            if replaced_response is not None:
+                self.__size_in_bytes -= len(replaced_response.body)
+            self.__responses[key] = cached_response
+            self.__size_in_bytes += len(cached_response.body)
+            while self.__size_in_bytes > self.max_size_in_bytes:
+                _, evicted_response = self.__responses.popitem(last=False)
+                self.__size_in_bytes -= len(evicted_response.body)
+                self.evictions += 1
+
+    def cached(self, retrieve_version: Callable[..., Hashable],
+               check_if_cacheable: Callable[..., bool] = None) -> Callable[[Callable], Callable]:
+        """
+        Decorates a view function so that its responses are cached.
+        Inputs:
+            - retrieve_version: Called with the view arguments, returns the current version of the data
+              the view responds with. It should not query the database.
+            - check_if_cacheable: Optional, called with the view arguments, returns whether the response
+              of the request only depends on that version. Other responses are neither cached nor served
+              from the cache.
+        Returns:
+            - Decorator.
+        """
+        def decorator(view_func: Callable[..., Any]) -> Callable[..., wrappers.Response]:
+            @functools.wraps(view_func)
+            def cached_view(**view_args) -> wrappers.Response:
+                if check_if_cacheable is not None and not check_if_cacheable(**view_args):
+                    return view_func(**view_args)
+                key: Tuple = (
+                    request.endpoint, tuple(sorted(view_args.items())), tuple(sorted(request.args.items(multi=True))))
+                # Read before the data: a write committed meanwhile only makes the response expire early.
+                version: Hashable = retrieve_version(**view_args)
+                cached_response: CachedResponse = self.get_response(key=key, version=version)
+                if cached_response is None:
+                    response: wrappers.Response = current_app.make_response(view_func(**view_args))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    cached_response = CachedResponse(
+                        version=version, body=response.get_data(), mimetype=response.mimetype)
+                    self.set_response(key=key, cached_response=cached_response)
+                return self.create_conditional_response(cached_response=cached_response)
+            return cached_view
+        return decorator
+
+    def create_conditional_response(self, cached_response: CachedResponse) -> wrappers.Response:
+        """
+        Returns:
+            - Response of the cached body, or ``304 Not Modified`` if the request ``If-None-Match`` matches its ETag.
+        """
+        response: wrappers.Response = current_app.response_class(
+            cached_response.body, mimetype=cached_response.mimetype)
+        response.set_etag(cached_response.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.make_conditional(request)
+        if response.status_code == 304:
+            with self.__lock:
+                self.not_modified += 1
+        return response
+
+    def retrieve_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            - Hits, misses, not modified responses, evictions, cached responses count and size.
+        """
+        with self.__lock:
+            return {
+                'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified,
+                'evictions': self.evictions, 'responses': len(self.__responses), 'size_in_bytes': self.__size_in_bytes
+            }
+
+    def clear(self):
+        """
+        Drops every cached response and resets the counters.
+        """
+        with self.__lock:
+            self.__responses.clear()
+            self.__size_in_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.not_modified = 0
+            self.evictions = 0
+
+
+response_cache = ResponseCache()
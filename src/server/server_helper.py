@@ -1,8 +1,9 @@
 __author__ = "Frank Kwizera"
 
+from src.shared.constants import GeneralConstants, StreamFormat
 from flask_api import status
-from flask import jsonify, session, wrappers
-from typing import Callable
+from flask import jsonify, session, wrappers, json, stream_with_context
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 import functools
 
 
@@ -28,4 +29,59 @@ class ServerHelper:
         Returns
             - Json response indicating that the item is not found.
         """
-        return jsonify({'message': message}), status
\ No newline at end of file
+        return jsonify({'message': message}), status
+
+    @staticmethod
+    def iterate_json_array(json_dicts: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Serializes json dictionaries one by one as a json array.
+        Inputs:
+            - json_dicts: Json dictionaries to serialize.
+        Returns:
+            - Iterator of json array fragments.
+        """
+        yield '['
+        separator: str = ''
+        for json_dict in json_dicts:
+            yield separator + json.dumps(json_dict)
+            separator = ','
+        yield ']'
+
+    @staticmethod
+    def iterate_ndjson_lines(json_dicts: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Serializes json dictionaries one by one as newline delimited json.
+        Inputs:
+            - json_dicts: Json dictionaries to serialize.
+        Returns:
+            - Iterator of json lines.
+        """
+        for json_dict in json_dicts:
+            yield json.dumps(json_dict) + '\n'
+
+    @staticmethod
+    def create_streaming_response(fragments: Iterable[str], stream_format: str) -> wrappers.Response:
+        """
+        Creates an http response sending serialized fragments as they are produced.
+        Fragments are grouped into chunks of about ``GeneralConstants.STREAMING_CHUNK_SIZE_IN_BYTES``.
+        The request context is kept alive so that fragments can keep reading from the database.
+        Inputs:
+            - fragments: Serialized response fragments.
+            - stream_format: ``StreamFormat`` of the fragments.
+        Returns:
+            - Streaming http response.
+        """
+        def iterate_chunks() -> Iterator[str]:
+            buffered_fragments: List[str] = []
+            buffered_size: int = 0
+            for fragment in fragments:
+                buffered_fragments.append(fragment)
+                buffered_size += len(fragment)
+                if buffered_size >= GeneralConstants.STREAMING_CHUNK_SIZE_IN_BYTES:
+                    yield ''.join(buffered_fragments)
+                    buffered_fragments, buffered_size = [], 0
+            if buffered_fragments:
+                yield ''.join(buffered_fragments)
+
+        mimetype: str = 'application/x-ndjson' if stream_format == StreamFormat.NDJSON else 'application/json'
+        return wrappers.Response(stream_with_context(iterate_chunks()), mimetype=mimetype)
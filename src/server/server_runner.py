@@ -4,9 +4,21 @@ from flask import Flask
 from src.server.user_management_server import UserManagementServer
 from src.server.item_management_server import ItemManagementServer
 from src.server.bid_management import BidManagementServer
+from src.server.prefork_server import PreforkServer
+from src.server.auction_close_scheduler import AuctionCloseScheduler
+from src.server.request_metrics import RequestMetrics, request_metrics
+from src.storage.auction_close_index import auction_close_index
+from src.storage.auction_state_cache import auction_state_cache
+from src.storage.query_instrumentation import query_instrumentation
+from src.server.response_cache import response_cache
+from src.server.item_events_hub import item_events_hub
+from src.shared.constants import GeneralConstants
 from src.get_app import get_app
 from src.storage.database_provider import db_provider
+from src.shared.server_routes import ItemManagementServerRoutes
 from flask_cors import CORS
+import argparse
+import os
 
 db = db_provider.db
 
@@ -20,13 +32,20 @@ class AuctionServerRunner:
         with self.app.app_context():
             db.create_all()
 
-    def attach_micro_servers(self):
+    def attach_micro_servers(self, bid_ingestion_workers: int = 0):
         """
         Initiates different micro servers.
+        Inputs:
+            - bid_ingestion_workers: Number of threads processing queued bids, bids are processed
+              on the request thread when 0.
         """
         self.user_management_server: UserManagementServer = UserManagementServer()
         self.item_management_server: ItemManagementServer = ItemManagementServer()
-        self.bid_management_server: BidManagementServer = BidManagementServer()
+        self.bid_management_server: BidManagementServer = BidManagementServer(
+            bid_ingestion_workers=bid_ingestion_workers)
+        self.auction_close_scheduler: AuctionCloseScheduler = AuctionCloseScheduler(app=self.app)
+        self.request_metrics: RequestMetrics = request_metrics
+        self.request_metrics.install(app=self.app)
 
     def start(self, port: int = None):
         """
@@ -34,10 +53,71 @@ class AuctionServerRunner:
         Inputs:
             - port: Desired port number.
         """
+        # With the reloader, the app is served by a child process: close auctions there only.
+        if not self.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            self.auction_close_scheduler.start()
         self.app.run(host="0.0.0.0", debug=self.debug, port=port)
 
+    def serve(self, port: int, workers: int, threads: int = 1):
+        """
+        Serves the flask app in production mode: no debugger nor reloader, ``workers`` pre-forked
+        processes sharing the listen socket, each handling requests on ``threads`` threads.
+        Item event streams get a thread of their own, so that idle watchers do not starve other requests.
+        Inputs:
+            - port: Desired port number.
+            - workers: Number of worker processes.
+            - threads: Number of threads per worker process.
+        """
+        self.debug = False
+        self.app.debug = False
+        # Shared by the workers so that any of them reports the request histograms of all of them.
+        self.request_metrics.allocate(workers=workers)
+        prefork_server: PreforkServer = PreforkServer(
+            app=self.app, host="0.0.0.0", port=port, workers=workers, threads=threads,
+            before_fork=db_provider.dispose_connections, after_fork=self.after_fork,
+            stream_routes=(ItemManagementServerRoutes.STREAM_ITEM, ))
+        prefork_server.serve_forever()
+
+    def after_fork(self, worker_index: int):
+        """
+        Prepares a forked worker process: opens its own database connections and drops the state
+        inherited from the supervising process. Auctions are closed by the first worker only, its
+        scheduler thread is started after the fork so that no worker inherits a lock it holds.
+        Inputs:
+            - worker_index: Worker slot number, kept by the replacement of an exited worker.
+        """
+        db_provider.dispose_connections()
+        # Every process local singleton, each guarded by its own lock. No thread runs in the supervising
+        # process, so none of these locks is held at fork time. ``item_versions`` and the request metrics
+        # histograms are shared on purpose.
+        auction_close_index.reset()
+        auction_state_cache.clear()
+        response_cache.clear()
+        item_events_hub.clear()
+        query_instrumentation.reset()
+        self.request_metrics.select_worker(worker_index=worker_index)
+        if worker_index == GeneralConstants.AUCTION_CLOSE_WORKER_INDEX:
+            self.auction_close_scheduler.start()
+
 
 if __name__ == "__main__":
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Runs the auction server.")
+    argument_parser.add_argument("--port", type=int, default=5050)
+    argument_parser.add_argument(
+        "--workers", type=int, default=0, help="Worker processes, runs the development server when 0.")
+    argument_parser.add_argument("--threads", type=int, default=1, help="Request threads per worker process.")
+    argument_parser.add_argument(
+        "--bid-ingestion-workers", type=int, default=0,
+        help="Threads processing bids through per item queues, bids are processed on the request thread when 0. "
+             "Queues and bid tickets are local to a process: requires a single worker process.")
+    arguments: argparse.Namespace = argument_parser.parse_args()
+    if arguments.bid_ingestion_workers > 0 and arguments.workers > 1:
+        argument_parser.error("--bid-ingestion-workers requires --workers 0 or 1: any worker may answer a bid "
+                              "status poll, and bids on an item would not be ordered across workers.")
+
     auction_server_runner: AuctionServerRunner = AuctionServerRunner()
-    auction_server_runner.attach_micro_servers()
-    auction_server_runner.start(port=5050)
\ No newline at end of file
+    auction_server_runner.attach_micro_servers(bid_ingestion_workers=arguments.bid_ingestion_workers)
+    if arguments.workers > 0:
+        auction_server_runner.serve(port=arguments.port, workers=arguments.workers, threads=arguments.threads)
+    else:
+        auction_server_runner.start(port=arguments.port)
\ No newline at end of file
@@ -23,6 +23,16 @@ class Directories:
             os.mkdir(database_root)
         return database_root
 
+    @staticmethod
+    def profiles_root() -> str:
+        """
+        Returns request profiles directory path.
+        """
+        profiles_root: str = os.path.join(Directories.local_path(), "profiles")
+        if not os.path.exists(profiles_root):
+            os.mkdir(profiles_root)
+        return profiles_root
+
 class GeneralConstants:
     PASSWORD_HASHING_METHOD: str = 'sha256'
     UUID_MAX_LENGTH: int = 64
@@ -30,3 +40,76 @@ class GeneralConstants:
     EMAIL_MAX_LENGTH: int = 64
     PASSWORD_HASH_MAX_LENGTH: int = 128
     DESCRIPTION_MAX_LENGTH: int = 128
+    BID_INCREMENT_IN_USD: int = 1
+    AUCTION_STATE_CACHE_MAX_ITEMS: int = 10000
+    AUCTION_STATE_CACHE_MAX_USERS: int = 100000
+    ITEMS_PAGE_DEFAULT_LIMIT: int = 50
+    ITEMS_PAGE_MAX_LIMIT: int = 500
+    STREAMING_YIELD_PER: int = 1000
+    STREAMING_CHUNK_SIZE_IN_BYTES: int = 64 * 1024
+    BID_INGESTION_DRAIN_BATCH_SIZE: int = 100
+    BID_INGESTION_MAX_TRACKED_TICKETS: int = 100000
+    BID_INGESTION_WAIT_TIMEOUT_IN_SECONDS: int = 30
+    BID_PLACEMENT_MAX_ATTEMPTS: int = 5
+    BID_PLACEMENT_RETRY_BACKOFF_IN_SECONDS: float = 0.01
+    BIDS_BATCH_MAX_SIZE: int = 500
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    AUCTION_CLOSE_BATCH_SIZE: int = 500
+    AUCTION_CLOSE_INDEX_WINDOW_SIZE: int = 100000
+    AUCTION_CLOSE_POLL_INTERVAL_IN_SECONDS: int = 10
+    # Pre-forked worker closing auctions, the other workers only serve requests.
+    AUCTION_CLOSE_WORKER_INDEX: int = 0
+    SLOW_QUERY_THRESHOLD_IN_MS: float = 100
+    # Attributes every statement to its ``DatabaseClient`` method, by walking the call stack.
+    QUERY_METHODS_STATS_ENABLED: bool = True
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_IN_SECONDS: float = 0.005
+    PROFILING_DUMP_INTERVAL_IN_SECONDS: float = 10
+    ITEM_VERSIONS_SLOTS: int = 65536
+    # Histogram series shared by the worker processes, and the size of their names.
+    METRICS_MAX_SERIES: int = 512
+    METRICS_SERIES_KEY_MAX_SIZE_IN_BYTES: int = 256
+    RESPONSE_CACHE_MAX_SIZE_IN_BYTES: int = 64 * 1024 * 1024
+    ITEM_EVENTS_MAX_SUBSCRIBERS: int = 10000
+    ITEM_EVENTS_MAX_BUFFERED_EVENTS: int = 100
+    ITEM_EVENTS_HEARTBEAT_INTERVAL_IN_SECONDS: float = 15
+    ITEM_EVENTS_RETRY_INTERVAL_IN_MS: int = 3000
+    STREAM_REQUEST_LINE_PEEK_SIZE_IN_BYTES: int = 256
+
+
+class SQLiteProfile:
+    JOURNAL_MODE: str = 'WAL'
+    SYNCHRONOUS: str = 'NORMAL'
+    BUSY_TIMEOUT_IN_MS: int = 5000
+    CACHE_SIZE_IN_KIB: int = 64 * 1024
+    MMAP_SIZE_IN_BYTES: int = 256 * 1024 * 1024
+    TEMP_STORE: str = 'MEMORY'
+    POOL_SIZE: int = 8
+    POOL_MAX_OVERFLOW: int = 16
+    POOL_TIMEOUT_IN_SECONDS: int = 30
+
+
+class DatabaseConfig:
+    DEFAULT_DATABASE_FILE_NAME: str = 'local_db.sqlite'
+    # Environment variables overriding the app config are named after its keys, e.g ``ANTIQUE_AUCTION_SQLALCHEMY_POOL_SIZE``.
+    ENVIRONMENT_VARIABLES_PREFIX: str = 'ANTIQUE_AUCTION_'
+    CONFIG_FILE_ENVIRONMENT_VARIABLE: str = 'ANTIQUE_AUCTION_DATABASE_CONFIG'
+    # Bind of the engine serving read only sessions, see ``ProfiledSQLAlchemy.get_read_engine``.
+    READ_BIND: str = 'read'
+    SQLITE_STATEMENT_TIMEOUT_CHECK_INSTRUCTIONS: int = 10000
+
+
+class StreamFormat:
+    JSON: str = 'json'
+    NDJSON: str = 'ndjson'
+
+
+class AuctionStatus:
+    OPEN: str = 'open'
+    CLOSED: str = 'closed'
+
+
+class BidStatus:
+    PENDING: str = 'pending'
+    ACCEPTED: str = 'accepted'
+    REJECTED: str = 'rejected'
@@ -15,12 +15,20 @@ db: SQLAlchemy = db_provider.db
 
 
 class DummyDataCreator:
-    def __init__(self):
+    def __init__(self, database_uri: str = None, reset_database: bool = True):
+        """
+        Inputs:
+            - database_uri: Database to write to, defaults to the database of the app config.
+            - reset_database: Whether to drop and recreate every table of the database.
+        """
         self.app: Flask = get_app()
+        if database_uri is not None:
+            self.app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
         self.app.logger.setLevel(logging.INFO)
         self.app.app_context().push()
-        db.drop_all()
-        db.create_all()
+        if reset_database:
+            db.drop_all()
+            db.create_all()
 
         # Initialize database clients.
         self.user_database_client: UserDatabaseClient = UserDatabaseClient()
@@ -46,51 +54,53 @@ class DummyDataCreator:
         Initiates the process of creating dummy data such as user records and item records.
         """
 
-        # Create users.
-        created_users: List[Dict[str, str]] = []
-        for user_info in self.user_details:
-            created_users.append(self.create_user(user_info=user_info))
-
-        # Create items.
-        self.auction_items: List[Dict[str, Union[str, int]]]= [
-            {
-                'item_name': 'Item 1', 
-                'item_description': 'Item 1 description',
-                'item_base_price_in_usd': 200,
-                'item_owner_uuid': created_users[0]['user_uuid'],
-                'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(minutes=1)
-            },
-            {
-                'item_name': 'Item 2', 
-                'item_description': 'Item 2 description',
-                'item_base_price_in_usd': 250,
-                'item_owner_uuid': created_users[0]['user_uuid'],
-                'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(minutes=30)
-            }
-        ]
-
-        item_base_price_in_usd: int = 250
-        for index in range(30):
-            auction_item_dict: Dict[str, Union[str, int]] = {
-                'item_name': f'Item {index + 1}', 
-                'item_description': f'Item {index + 1} description',
-                'item_base_price_in_usd': item_base_price_in_usd,
-                'item_owner_uuid': created_users[0]['user_uuid'],
-                'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
-            }
-            item_dict: Dict[str, str] = self.create_item(auction_item_dict=auction_item_dict)
+        # Save every record in a single transaction.
+        with self.user_database_client.unit_of_work():
+            # Create users.
+            created_users: List[Dict[str, str]] = []
+            for user_info in self.user_details:
+                created_users.append(self.create_user(user_info=user_info))
+
+            # Create items.
+            self.auction_items: List[Dict[str, Union[str, int]]]= [
+                {
+                    'item_name': 'Item 1', 
+                    'item_description': 'Item 1 description',
+                    'item_base_price_in_usd': 200,
+                    'item_owner_uuid': created_users[0]['user_uuid'],
+                    'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(minutes=1)
+                },
+                {
+                    'item_name': 'Item 2', 
+                    'item_description': 'Item 2 description',
+                    'item_base_price_in_usd': 250,
+                    'item_owner_uuid': created_users[0]['user_uuid'],
+                    'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(minutes=30)
+                }
+            ]
+
+            item_base_price_in_usd: int = 250
+            for index in range(30):
+                auction_item_dict: Dict[str, Union[str, int]] = {
+                    'item_name': f'Item {index + 1}', 
+                    'item_description': f'Item {index + 1} description',
+                    'item_base_price_in_usd': item_base_price_in_usd,
+                    'item_owner_uuid': created_users[0]['user_uuid'],
+                    'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
+                }
+                item_dict: Dict[str, str] = self.create_item(auction_item_dict=auction_item_dict)
             
-            # Increase item_base_price_in_usd for the next item.
-            item_base_price_in_usd += 50
+                # Increase item_base_price_in_usd for the next item.
+                item_base_price_in_usd += 50
             
-            # Create one dummy bid.
-            bid_dict: Dict[str, str] = {
-                'bid_price_in_usd': 250, 
-                'bid_item_uuid': item_dict['item_uuid'],
-                'bidder_uuid': created_users[1]['user_uuid']
-            }
-
-            self.create_bid(bid_dict=bid_dict)
+                # Create one dummy bid.
+                bid_dict: Dict[str, str] = {
+                    'bid_price_in_usd': 250, 
+                    'bid_item_uuid': item_dict['item_uuid'],
+                    'bidder_uuid': created_users[1]['user_uuid']
+                }
+
+                self.create_bid(bid_dict=bid_dict)
 
     def create_user(self, user_info: Dict[str, str]) -> Dict[str, str]:
         """
@@ -0,0 +1,328 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.create_dumy_data import DummyDataCreator
+from src.storage.database_tables import User, Item, Bid, UserAutoBid, AutoBid
+from src.storage.database_client import DatabaseClient
+from src.storage.database_provider import db_provider
+from src.shared.constants import GeneralConstants
+from werkzeug.security import generate_password_hash
+from flask_sqlalchemy import SQLAlchemy
+from typing import Any, Dict, Iterator, List, Tuple
+import multiprocessing
+import argparse
+import datetime
+import sqlite3
+import random
+import time
+import uuid
+import os
+
+db: SQLAlchemy = db_provider.db
+
+# Rows of one generated chunk, by model.
+GeneratedRows = List[Tuple[db.Model, List[Dict[str, Any]]]]
+
+
+class SyntheticDataCreator(DummyDataCreator):
+    """
+    Creates a reproducible, production sized dataset.
+
+    Every value is derived from the seed and the row index, so the dataset does not depend on the
+    number of processes. Rows are generated in chunks by a pool of processes and bulk inserted by
+    this process, one transaction per chunk. Popularity is skewed: bids and auto bidders per item
+    follow a power law, so a few hot items get most of the activity.
+    """
+    USER_PASSWORD: str = 'synthetic@1234'
+    USERS_CHUNK_SIZE: int = 10000
+    ITEMS_CHUNK_SIZE: int = 2000
+    MAX_BIDS_PER_ITEM: int = 5000
+    CLOSED_ITEMS_RATIO: float = 0.2
+    CLOSING_BURST_ITEMS_RATIO: float = 0.05
+
+    def __init__(self, users: int, items: int, bids_per_item: str = 'zipf', auto_bidders: int = None,
+                 zipf_exponent: float = 1.5, seed: int = 0, processes: int = 1, now: datetime.datetime = None,
+                 database_uri: str = None, reset_database: bool = True):
+        """
+        Inputs:
+            - users: Number of users.
+            - items: Number of items.
+            - bids_per_item: 'zipf' for power law distributed bids per item, or a fixed number of bids per item.
+            - auto_bidders: Number of users with an auto bid configuration, a tenth of the users by default.
+            - zipf_exponent: Power law exponent of bids and auto bidders per item, lower is more skewed.
+            - seed: Dataset seed.
+            - processes: Number of processes generating rows.
+            - now: Timestamp the close timestamps are relative to, defaults to the current UTC time.
+            - database_uri: Database to write to, defaults to the database of the app config.
+            - reset_database: Whether to drop and recreate every table first, not needed to restore a snapshot.
+        """
+        DummyDataCreator.__init__(self, database_uri=database_uri, reset_database=reset_database)
+        self.database_client: DatabaseClient = DatabaseClient()
+        self.dataset_config: Dict[str, Any] = {
+            'users': users,
+            'items': items,
+            'bids_per_item': bids_per_item,
+            'auto_bidders': users // 10 if auto_bidders is None else min(auto_bidders, users),
+            'zipf_exponent': zipf_exponent,
+            'seed': seed,
+            'password_hash': generate_password_hash(
+                self.USER_PASSWORD, method=GeneralConstants.PASSWORD_HASHING_METHOD),
+            'now': now or datetime.datetime.utcnow()
+        }
+        self.processes: int = processes
+
+    @staticmethod
+    def user_uuid(seed: int, user_index: int) -> str:
+        """
+        Returns:
+            - UUID of the synthetic user at ``user_index``.
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, f'{seed}:user:{user_index}'))
+
+    @staticmethod
+    def user_email(user_index: int) -> str:
+        """
+        Returns:
+            - Email of the synthetic user at ``user_index``.
+        """
+        return f'user_{user_index}@synthetic.auction'
+
+    @staticmethod
+    def item_uuid(seed: int, item_index: int) -> str:
+        """
+        Returns:
+            - UUID of the synthetic item at ``item_index``.
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, f'{seed}:item:{item_index}'))
+
+    def create_synthetic_data(self) -> Dict[str, Any]:
+        """
+        Generates and saves the dataset.
+        Returns:
+            - Dataset summary: configuration, rows count per table and duration.
+        """
+        started_at: float = time.perf_counter()
+        rows_counts: Dict[str, int] = {}
+        users_chunks: List[Tuple[Dict[str, Any], int]] = [
+            (self.dataset_config, first_user_index)
+            for first_user_index in range(0, self.dataset_config['users'], self.USERS_CHUNK_SIZE)]
+        items_chunks: List[Tuple[Dict[str, Any], int]] = [
+            (self.dataset_config, first_item_index)
+            for first_item_index in range(0, self.dataset_config['items'], self.ITEMS_CHUNK_SIZE)]
+
+        for generated_rows in self.generate_rows(generate_users_chunk, users_chunks):
+            self.save_rows(generated_rows=generated_rows, rows_counts=rows_counts)
+        for generated_rows in self.generate_rows(generate_items_chunk, items_chunks):
+            self.save_rows(generated_rows=generated_rows, rows_counts=rows_counts)
+
+        dataset_summary: Dict[str, Any] = {
+            'users': self.dataset_config['users'],
+            'items': self.dataset_config['items'],
+            'bids_per_item': self.dataset_config['bids_per_item'],
+            'auto_bidders': self.dataset_config['auto_bidders'],
+            'zipf_exponent': self.dataset_config['zipf_exponent'],
+            'seed': self.dataset_config['seed'],
+            'user_password': self.USER_PASSWORD,
+            'rows_counts': rows_counts,
+            'duration_in_seconds': time.perf_counter() - started_at
+        }
+        self.app.logger.info(f'Synthetic data created: {dataset_summary}')
+        return dataset_summary
+
+    def generate_rows(self, generate_chunk, chunks: List[Tuple[Dict[str, Any], int]]) -> Iterator[GeneratedRows]:
+        """
+        Generates chunks in order, on a pool of processes when more than one process is configured.
+        """
+        if self.processes <= 1:
+            yield from map(generate_chunk, chunks)
+            return
+        with multiprocessing.get_context('fork').Pool(processes=self.processes) as pool:
+            yield from pool.imap(generate_chunk, chunks)
+
+    def save_rows(self, generated_rows: GeneratedRows, rows_counts: Dict[str, int]):
+        """
+        Bulk inserts the rows of one chunk in a single transaction.
+        """
+        with self.database_client.unit_of_work():
+            for model, rows in generated_rows:
+                rows_counts[model.__tablename__] = rows_counts.get(model.__tablename__, 0) + \
+                    self.database_client.bulk_insert(model=model, rows=rows)
+
+    def snapshot(self, snapshot_path: str):
+        """
+        Copies the database to a standalone SQLite file, restored with ``restore_snapshot``.
+        Inputs:
+            - snapshot_path: Snapshot file path.
+        """
+        db.session.remove()
+        with sqlite3.connect(db.engine.url.database) as database_connection, \
+                sqlite3.connect(snapshot_path) as snapshot_connection:
+            database_connection.backup(snapshot_connection)
+        self.app.logger.info(f'Database snapshot saved to {snapshot_path}')
+
+    @staticmethod
+    def restore_snapshot(snapshot_path: str):
+        """
+        Replaces the database content with a snapshot. Requires an app context.
+        Inputs:
+            - snapshot_path: Snapshot file path.
+        """
+        db.session.remove()
+        db.engine.dispose()
+        with sqlite3.connect(snapshot_path) as snapshot_connection, \
+                sqlite3.connect(db.engine.url.database) as database_connection:
+            snapshot_connection.backup(database_connection)
+
+
+def power_law_count(random_generator: random.Random, zipf_exponent: float, max_count: int) -> int:
+    """
+    Draws a count from a truncated power law: mostly 0 or 1, rarely up to ``max_count``.
+    """
+    return min(max_count, int(random_generator.paretovariate(zipf_exponent)) - 1)
+
+
+def generate_users_chunk(chunk: Tuple[Dict[str, Any], int]) -> GeneratedRows:
+    """
+    Generates users, and auto bid configurations of the first ``auto_bidders`` users.
+    Inputs:
+        - chunk: (dataset configuration, first user index) pair.
+    Returns:
+        - Generated rows by model.
+    """
+    dataset_config, first_user_index = chunk
+    seed: int = dataset_config['seed']
+    random_generator: random.Random = random.Random(f'{seed}:users:{first_user_index}')
+    users_rows: List[Dict[str, Any]] = []
+    users_auto_bids_rows: List[Dict[str, Any]] = []
+    last_user_index: int = min(first_user_index + SyntheticDataCreator.USERS_CHUNK_SIZE, dataset_config['users'])
+    for user_index in range(first_user_index, last_user_index):
+        user_uuid: str = SyntheticDataCreator.user_uuid(seed=seed, user_index=user_index)
+        users_rows.append({
+            'user_uuid': user_uuid,
+            'user_names': f'Synthetic User {user_index}',
+            'user_email': SyntheticDataCreator.user_email(user_index=user_index),
+            'user_password_hash': dataset_config['password_hash']
+        })
+        if user_index < dataset_config['auto_bidders']:
+            users_auto_bids_rows.append({
+                'user_auto_bid_uuid': str(uuid.uuid5(uuid.NAMESPACE_OID, f'{seed}:user_auto_bid:{user_index}')),
+                'bidder_uuid': user_uuid,
+                # Log uniform budgets between 1k and 1M usd.
+                'max_bid_amount_in_usd': int(10 ** random_generator.uniform(3, 6))
+            })
+    return [(User, users_rows), (UserAutoBid, users_auto_bids_rows)]
+
+
+def generate_items_chunk(chunk: Tuple[Dict[str, Any], int]) -> GeneratedRows:
+    """
+    Generates items with their bids and auto bids registrations.
+    Inputs:
+        - chunk: (dataset configuration, first item index) pair.
+    Returns:
+        - Generated rows by model.
+    """
+    dataset_config, first_item_index = chunk
+    seed: int = dataset_config['seed']
+    now: datetime.datetime = dataset_config['now']
+    zipf_exponent: float = dataset_config['zipf_exponent']
+    random_generator: random.Random = random.Random(f'{seed}:items:{first_item_index}')
+    items_rows: List[Dict[str, Any]] = []
+    bids_rows: List[Dict[str, Any]] = []
+    auto_bids_rows: List[Dict[str, Any]] = []
+    last_item_index: int = min(first_item_index + SyntheticDataCreator.ITEMS_CHUNK_SIZE, dataset_config['items'])
+    for item_index in range(first_item_index, last_item_index):
+        item_uuid: str = SyntheticDataCreator.item_uuid(seed=seed, item_index=item_index)
+
+        # Closed items, a burst of items closing within the same minute, then items closing over a week.
+        close_kind: float = random_generator.random()
+        if close_kind < SyntheticDataCreator.CLOSED_ITEMS_RATIO:
+            bid_expiration_timestamp: datetime.datetime = now - datetime.timedelta(
+                seconds=random_generator.uniform(1, 7 * 24 * 3600))
+        elif close_kind < SyntheticDataCreator.CLOSED_ITEMS_RATIO + SyntheticDataCreator.CLOSING_BURST_ITEMS_RATIO:
+            bid_expiration_timestamp = now + datetime.timedelta(minutes=30, seconds=random_generator.uniform(0, 60))
+        else:
+            bid_expiration_timestamp = now + datetime.timedelta(seconds=random_generator.uniform(60, 7 * 24 * 3600))
+
+        if dataset_config['bids_per_item'] == 'zipf':
+            bids_count: int = power_law_count(
+                random_generator, zipf_exponent=zipf_exponent, max_count=SyntheticDataCreator.MAX_BIDS_PER_ITEM)
+        else:
+            bids_count = int(dataset_config['bids_per_item'])
+
+        # Increasing bids from random users.
+        bid_price_in_usd: int = int(10 ** random_generator.uniform(1, 4))
+        item_base_price_in_usd: int = bid_price_in_usd
+        bidder_uuid: str = None
+        for bid_index in range(bids_count):
+            bid_price_in_usd += random_generator.randint(1, 50)
+            bidder_uuid = SyntheticDataCreator.user_uuid(
+                seed=seed, user_index=random_generator.randrange(dataset_config['users']))
+            bids_rows.append({
+                'bid_uuid': str(uuid.uuid5(uuid.NAMESPACE_OID, f'{seed}:bid:{item_index}:{bid_index}')),
+                'bid_price_in_usd': bid_price_in_usd,
+                'bid_item_uuid': item_uuid,
+                'bidder_uuid': bidder_uuid
+            })
+
+        # Hot items attract more auto bidders.
+        auto_bidders_count: int = min(
+            dataset_config['auto_bidders'],
+            power_law_count(random_generator, zipf_exponent=zipf_exponent, max_count=dataset_config['auto_bidders'])
+            + bids_count // 10)
+        for auto_bidder_index in random_generator.sample(range(dataset_config['auto_bidders']), auto_bidders_count):
+            auto_bids_rows.append({
+                'auto_bid_uuid': str(uuid.uuid5(
+                    uuid.NAMESPACE_OID, f'{seed}:auto_bid:{item_index}:{auto_bidder_index}')),
+                'bid_item_uuid': item_uuid,
+                'bidder_uuid': SyntheticDataCreator.user_uuid(seed=seed, user_index=auto_bidder_index)
+            })
+
+        is_closed: bool = bid_expiration_timestamp < now
+        items_rows.append({
+            'item_uuid': item_uuid,
+            'item_name': f'Synthetic Item {item_index}',
+            'item_description': f'Synthetic Item {item_index} description',
+            'item_base_price_in_usd': item_base_price_in_usd,
+            'item_owner_uuid': SyntheticDataCreator.user_uuid(
+                seed=seed, user_index=random_generator.randrange(dataset_config['users'])),
+            'bid_expiration_timestamp': bid_expiration_timestamp,
+            'current_bid_price_in_usd': bid_price_in_usd if bids_count else None,
+            'current_bidder_uuid': bidder_uuid,
+            'bid_count': bids_count,
+            'auction_closed_timestamp': bid_expiration_timestamp if is_closed else None,
+            'winner_uuid': bidder_uuid if is_closed else None,
+            'winning_bid_price_in_usd': bid_price_in_usd if is_closed and bids_count else None
+        })
+    return [(Item, items_rows), (Bid, bids_rows), (AutoBid, auto_bids_rows)]
+
+
+if __name__ == "__main__":
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Replaces the content of a SQLite database with a reproducible synthetic dataset.")
+    argument_parser.add_argument(
+        "--database", required=True,
+        help="SQLite file to write to, its tables are dropped first unless a snapshot is restored.")
+    argument_parser.add_argument("--users", type=int, default=100000)
+    argument_parser.add_argument("--items", type=int, default=1000000)
+    argument_parser.add_argument(
+        "--bids-per-item", default='zipf', help="'zipf' for power law distributed bids per item, or a fixed number.")
+    argument_parser.add_argument(
+        "--auto-bidders", type=int, default=None, help="Users with an auto bid configuration, a tenth by default.")
+    argument_parser.add_argument("--zipf-exponent", type=float, default=1.5)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    argument_parser.add_argument("--snapshot", default=None, help="SQLite file to copy the generated database to.")
+    argument_parser.add_argument(
+        "--from-snapshot", default=None, help="Restores a snapshot instead of generating the dataset.")
+    arguments: argparse.Namespace = argument_parser.parse_args()
+
+    synthetic_data_creator: SyntheticDataCreator = SyntheticDataCreator(
+        users=arguments.users, items=arguments.items, bids_per_item=arguments.bids_per_item,
+        auto_bidders=arguments.auto_bidders, zipf_exponent=arguments.zipf_exponent, seed=arguments.seed,
+        processes=arguments.processes, database_uri=f'sqlite:///{os.path.abspath(arguments.database)}',
+        reset_database=not arguments.from_snapshot)
+    if arguments.from_snapshot:
+        synthetic_data_creator.restore_snapshot(snapshot_path=arguments.from_snapshot)
+    else:
+        synthetic_data_creator.create_synthetic_data()
+        if arguments.snapshot:
+            synthetic_data_creator.snapshot(snapshot_path=arguments.snapshot)
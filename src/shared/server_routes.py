@@ -11,9 +11,16 @@ class ItemManagementServerRoutes:
     CREATE_ITEM = "/create/item"
     RETRIEVE_ALL_ITEMS = "/retrieve/all/items"
     RETRIEVE_ITEM_DETAILS = "/retrieve/item/details/"
+    STREAM_ITEM = "/stream/item/"
 
 
 class BidManagementServerRoutes:
     CREATE_BID = "/create/bid"
+    CREATE_BIDS = "/create/bids"
     REGISTER_USER_AUTO_CONFI_BID = "/register/auto/bid/config"
     REGISTER_AUTO_BID = "/register/auto/bid"
+    RETRIEVE_BID_STATUS = "/retrieve/bid/status"
+
+
+class MetricsServerRoutes:
+    METRICS = "/metrics"
@@ -0,0 +1,117 @@
+__author__ = "Frank Kwizera"
+
+from typing import List, Optional, Set, Tuple
+import datetime
+import threading
+import heapq
+
+
+class AuctionCloseIndex:
+    """
+    In memory, per process, min heap of upcoming item close timestamps.
+
+    Only the items closing up to ``tracked_until`` are held, so that the heap is loaded from the
+    database one window of upcoming closes at a time instead of holding every open item. Items
+    created after the window is loaded are added if they close within it.
+    """
+
+    def __init__(self):
+        self.__items_closes: List[Tuple[datetime.datetime, str]] = []
+        self.__scheduled_items_uuids: Set[str] = set()
+        self.__tracked_until: datetime.datetime = datetime.datetime.min
+        self.__condition: threading.Condition = threading.Condition()
+
+    @property
+    def tracked_until(self) -> datetime.datetime:
+        """
+        Items closing up to this timestamp are tracked, ``datetime.datetime.max`` once every open item is.
+        """
+        return self.__tracked_until
+
+    def __len__(self) -> int:
+        return len(self.__items_closes)
+
+    def schedule_item_close(self, item_uuid: str, bid_expiration_timestamp: datetime.datetime):
+        """
+        Adds an item close if it falls within the tracked window. Wakes waiters up if it is the next close.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+            - bid_expiration_timestamp: Item closing timestamp.
+        """
+        with self.__condition:
+            if bid_expiration_timestamp > self.__tracked_until or item_uuid in self.__scheduled_items_uuids:
+                return
+            heapq.heappush(self.__items_closes, (bid_expiration_timestamp, item_uuid))
+            self.__scheduled_items_uuids.add(item_uuid)
+            if self.__items_closes[0][1] == item_uuid:
+                self.__condition.notify_all()
+
+    def load_items_closes(self, items_closes: List[Tuple[datetime.datetime, str]], complete: bool):
+        """
+        Adds a window of upcoming item closes loaded from the database.
+        Inputs:
+            - items_closes: (bid_expiration_timestamp, item_uuid) pairs of the earliest open items, ordered by close.
+            - complete: Whether every open item was loaded, otherwise later closes are loaded once these are done.
+        """
+        with self.__condition:
+            for bid_expiration_timestamp, item_uuid in items_closes:
+                if item_uuid not in self.__scheduled_items_uuids:
+                    heapq.heappush(self.__items_closes, (bid_expiration_timestamp, item_uuid))
+                    self.__scheduled_items_uuids.add(item_uuid)
+            self.__tracked_until = \
+                datetime.datetime.max if complete or not items_closes else items_closes[-1][0]
+            self.__condition.notify_all()
+
+    def pop_due_items_uuids(self, now: datetime.datetime, limit: int) -> List[str]:
+        """
+        Removes and returns the items closing at or before ``now``, earliest first.
+        Inputs:
+            - now: Current timestamp.
+            - limit: Maximum number of items to return.
+        Returns:
+            - Due items uuids.
+        """
+        due_items_uuids: List[str] = []
+        with self.__condition:
+            while self.__items_closes and self.__items_closes[0][0] <= now and len(due_items_uuids) < limit:
+                _, item_uuid = heapq.heappop(self.__items_closes)
+                self.__scheduled_items_uuids.discard(item_uuid)
+                due_items_uuids.append(item_uuid)
+        return due_items_uuids
+
+    def next_close_timestamp(self) -> Optional[datetime.datetime]:
+        """
+        Returns:
+            - Earliest tracked close timestamp, None if no close is tracked.
+        """
+        with self.__condition:
+            return self.__items_closes[0][0] if self.__items_closes else None
+
+    def wait(self, timeout: float):
+        """
+        Blocks until an earlier close is scheduled, ``notify`` is called or the timeout expires.
+        Inputs:
+            - timeout: Maximum waiting time in seconds.
+        """
+        with self.__condition:
+            self.__condition.wait(timeout=timeout)
+
+    def notify(self):
+        """
+        Wakes up waiters.
+        """
+        with self.__condition:
+            self.__condition.notify_all()
+
+    def reset(self):
+        """
+        Drops every tracked close and stops tracking new ones. Called in forked processes, which leave
+        closing auctions to the process running the scheduler.
+        """
+        self.__items_closes = []
+        self.__scheduled_items_uuids = set()
+        self.__tracked_until = datetime.datetime.min
+        self.__condition = threading.Condition()
+
+
+auction_close_index = AuctionCloseIndex()
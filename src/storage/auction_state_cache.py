@@ -0,0 +1,143 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from collections import OrderedDict
+from typing import Optional
+import datetime
+import threading
+
+
+class ItemAuctionState:
+    """
+    Auction state of a single item as needed by the bid hot path.
+    """
+
+    def __init__(self, bid_expiration_timestamp: datetime.datetime, highest_bid_price_in_usd: int = None,
+                 highest_bidder_uuid: str = None):
+        self.bid_expiration_timestamp: datetime.datetime = bid_expiration_timestamp
+        self.highest_bid_price_in_usd: int = highest_bid_price_in_usd
+        self.highest_bidder_uuid: str = highest_bidder_uuid
+
+    def __repr__(self):
+        return f'<ItemAuctionState: {self.highest_bid_price_in_usd} {self.bid_expiration_timestamp}>'
+
+
+class AuctionStateCache:
+    """
+    In memory, per process, LRU bounded cache of item auction states and known user uuids.
+
+    Item close timestamps and user existence never change once written, the highest bid is kept
+    up to date write-through by ``BidDatabaseClient`` after each committed bid. Items are dropped once
+    their auction is finalized and, in the processes that do not finalize auctions, on the first
+    access past their close timestamp.
+    """
+
+    def __init__(self, max_items: int = GeneralConstants.AUCTION_STATE_CACHE_MAX_ITEMS,
+                 max_users: int = GeneralConstants.AUCTION_STATE_CACHE_MAX_USERS):
+        self.max_items: int = max_items
+        self.max_users: int = max_users
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__items_states: OrderedDict = OrderedDict()
+        self.__known_users_uuids: OrderedDict = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def get_item_state(self, item_uuid: str) -> Optional[ItemAuctionState]:
+        """
+        Retrieves a cached item auction state and marks it as recently used.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+        Returns:
+            - Cached item auction state, None if the item is not cached or is closed.
+        """
+        with self.__lock:
+            item_state: ItemAuctionState = self.__items_states.get(item_uuid)
+            if item_state is not None and item_state.bid_expiration_timestamp < datetime.datetime.utcnow():
+                del self.__items_states[item_uuid]
+                item_state = None
+            if item_state is None:
+                self.misses += 1
+                return None
+            self.__items_states.move_to_end(item_uuid)
+            self.hits += 1
+            return item_state
+
+    def set_item_state(self, item_uuid: str, item_state: ItemAuctionState):
+        """
+        Caches an item auction state, evicting the least recently used item when full.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+            - item_state: Item auction state.
+        """
+        with self.__lock:
+            self.__items_states[item_uuid] = item_state
+            self.__items_states.move_to_end(item_uuid)
+            while len(self.__items_states) > self.max_items:
+                self.__items_states.popitem(last=False)
+
+    def record_item_bid(self, item_uuid: str, bid_price_in_usd: int, bidder_uuid: str):
+        """
+        Updates the highest bid of a cached item after a bid has been committed.
+        Items that are not cached are left alone, they are loaded from the database on next access.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+            - bid_price_in_usd: Committed bid price.
+            - bidder_uuid: UUID representing the bidder.
+        """
+        with self.__lock:
+            item_state: ItemAuctionState = self.__items_states.get(item_uuid)
+            if item_state is None:
+                return
+            item_state.highest_bid_price_in_usd = bid_price_in_usd
+            item_state.highest_bidder_uuid = bidder_uuid
+
+    def remove_item_state(self, item_uuid: str):
+        """
+        Drops an item from the cache.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+        """
+        with self.__lock:
+            self.__items_states.pop(item_uuid, None)
+
+    def check_if_user_is_known(self, user_uuid: str) -> bool:
+        """
+        Checks if a user uuid is known to exist.
+        Inputs:
+            - user_uuid: UUID representing the target user.
+        Returns:
+            - True if the user is known, otherwise False.
+        """
+        with self.__lock:
+            if user_uuid not in self.__known_users_uuids:
+                self.misses += 1
+                return False
+            self.__known_users_uuids.move_to_end(user_uuid)
+            self.hits += 1
+            return True
+
+    def add_known_user(self, user_uuid: str):
+        """
+        Records a user uuid as existing, evicting the least recently used user when full.
+        Inputs:
+            - user_uuid: UUID representing the target user.
+        """
+        with self.__lock:
+            self.__known_users_uuids[user_uuid] = None
+            self.__known_users_uuids.move_to_end(user_uuid)
+            while len(self.__known_users_uuids) > self.max_users:
+                self.__known_users_uuids.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops every cached entry, such as after the database has been recreated.
+        """
+        with self.__lock:
+            self.__items_states.clear()
+            self.__known_users_uuids.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Provide this copy to the entire module, the same way as ``db_provider``.
+auction_state_cache = AuctionStateCache()
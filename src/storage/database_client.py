@@ -1,20 +1,52 @@
 __author__ = "Frank Kwizera"
 
 from src.storage.database_provider import db_provider
+from src.storage.auction_state_cache import AuctionStateCache, ItemAuctionState, auction_state_cache
+from src.storage.auction_close_index import AuctionCloseIndex, auction_close_index
+from src.storage.item_versions import ItemVersions, item_versions as default_item_versions
 from sqlalchemy.orm.session import sessionmaker as Session
+from sqlalchemy.orm import Query, joinedload, selectinload
 from flask_sqlalchemy import SQLAlchemy
 from src.storage.database_tables import User, Item, Bid, AutoBid, UserAutoBid
 from werkzeug.security import generate_password_hash, check_password_hash
-from src.shared.constants import GeneralConstants
+from src.shared.constants import GeneralConstants, AuctionStatus
 from flask import Flask
-from typing import List, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.exc import OperationalError
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+import contextlib
+import functools
+import itertools
 import datetime
+import random
+import time
 
 db: SQLAlchemy = db_provider.db
 
 class DatabaseClient:
+    """
+    Base of the database clients. Writes go through ``session``, the app scoped transactional session,
+    committed after each write or ``unit_of_work``. Reads go through ``read_session``, by default the app
+    scoped autocommit session of the read engine, so that listing traffic neither holds a write pool
+    connection nor a transaction bid writes wait on. Reads in a ``unit_of_work`` use ``session`` instead,
+    to see its uncommitted writes.
+    """
+
     def __init__(self, session: Session = None, app: Flask = None,
-                 use_new_session: bool = False):
+                 use_new_session: bool = False, state_cache: AuctionStateCache = None,
+                 close_index: AuctionCloseIndex = None, read_session: Session = None, use_read_session: bool = True,
+                 item_versions: ItemVersions = None):
+        """
+        Inputs:
+            - session: Session of writes, and of reads unless ``read_session`` is given. Defaults to ``db.session``.
+            - use_new_session: Whether to use new sessions instead of the app scoped ones.
+            - read_session: Session of reads.
+            - use_read_session: Whether reads use a read only session rather than the write session.
+            - item_versions: Item version counters bumped by committed writes.
+        """
+        self.state_cache: AuctionStateCache = state_cache or auction_state_cache
+        self.close_index: AuctionCloseIndex = close_index if close_index is not None else auction_close_index
+        self.item_versions: ItemVersions = item_versions or default_item_versions
         if use_new_session:
             self.session = db_provider.get_new_session()
         elif session is not None:
@@ -22,13 +54,114 @@ class DatabaseClient:
         elif db.session is not None:
             self.session = db.session
 
+        if read_session is not None:
+            self.read_session = read_session
+        elif session is not None or not use_read_session:
+            self.read_session = self.session
+        elif use_new_session:
+            self.read_session = db_provider.get_new_session(read_only=True)
+        else:
+            self.read_session = db.read_session
+
+    @property
+    def reader_session(self) -> Session:
+        """
+        Returns:
+            - Session of reads: the write session within a ``unit_of_work``, otherwise the read session.
+        """
+        return self.session if self.in_unit_of_work() else self.read_session
+
     def add_to_database(self, records: List[db.Model]):
         """
-        Add database records to the database and commit the changes
+        Add database records to the database and commit the changes, or only flush them
+        within a ``unit_of_work``.
         """
         for record in records:
             self.session.add(record)
+        self.commit()
+
+    def bulk_insert(self, model: db.Model, rows: Iterable[Dict[str, Any]],
+                    chunk_size: int = GeneralConstants.BULK_INSERT_CHUNK_SIZE) -> int:
+        """
+        Inserts rows with one ``INSERT`` statement executed once per row of each ``chunk_size`` rows chunk,
+        through the driver ``executemany``, bypassing the ORM unit of work and identity map. The statement
+        is prepared once per chunk and binds one row at a time, so that chunks never reach the SQLite bound
+        parameters limit a multi row ``INSERT`` would. Rows are not loaded back, so they have to hold every value to insert
+        such as uuids. Changes are committed at the end, or at the end of the enclosing ``unit_of_work``.
+        Inputs:
+            - model: Model of the target table.
+            - rows: Dictionaries mapping column names to values.
+            - chunk_size: Number of rows passed to each ``executemany``.
+        Returns:
+            - Number of inserted rows.
+        """
+        inserted_rows_count: int = 0
+        rows_iterator: Iterator[Dict[str, Any]] = iter(rows)
+        while True:
+            rows_chunk: List[Dict[str, Any]] = list(itertools.islice(rows_iterator, chunk_size))
+            if not rows_chunk:
+                break
+            self.session.execute(model.__table__.insert(), rows_chunk)
+            inserted_rows_count += len(rows_chunk)
+        self.commit()
+        self.run_after_commit(self.item_versions.bump_all_versions)
+        return inserted_rows_count
+
+    @contextlib.contextmanager
+    def unit_of_work(self) -> Iterator['DatabaseClient']:
+        """
+        Groups the writes of every database client sharing this session into a single transaction,
+        committed when the outermost unit of work exits, rolled back if it or its commit raises. Caches
+        are only updated once the transaction is committed.
+        """
+        session_info: Dict[str, Any] = self.session.info
+        is_outermost: bool = not session_info.get('unit_of_work_depth')
+        if is_outermost:
+            session_info['after_commit_callbacks'] = []
+        session_info['unit_of_work_depth'] = session_info.get('unit_of_work_depth', 0) + 1
+        try:
+            try:
+                yield self
+            finally:
+                session_info['unit_of_work_depth'] -= 1
+            if is_outermost:
+                self.commit()
+        except BaseException:
+            if is_outermost:
+                # Callbacks of a transaction which did not commit must never run with a later one.
+                session_info.pop('after_commit_callbacks', None)
+                self.session.rollback()
+            raise
+
+    def in_unit_of_work(self) -> bool:
+        """
+        Returns:
+            - True if writes are currently grouped by a ``unit_of_work``.
+        """
+        return bool(self.session.info.get('unit_of_work_depth'))
+
+    def commit(self):
+        """
+        Commits the session and runs the callbacks waiting for it, or only flushes within a ``unit_of_work``.
+        """
+        if self.in_unit_of_work():
+            self.session.flush()
+            return
         self.session.commit()
+        after_commit_callbacks: List[Callable[[], None]] = self.session.info.pop('after_commit_callbacks', [])
+        for after_commit_callback in after_commit_callbacks:
+            after_commit_callback()
+
+    def run_after_commit(self, callback: Callable[[], None]):
+        """
+        Runs a callback, such as a cache update, once the current writes are committed.
+        Inputs:
+            - callback: Function to run.
+        """
+        if self.in_unit_of_work():
+            self.session.info['after_commit_callbacks'].append(callback)
+        else:
+            callback()
 
 class UserDatabaseClient(DatabaseClient):
     def __init__(self, *args, **kwargs):
@@ -49,6 +182,8 @@ class UserDatabaseClient(DatabaseClient):
         user_password_hash: str = generate_password_hash(user_password, method=GeneralConstants.PASSWORD_HASHING_METHOD)
         new_user: User = User(user_names=user_names, user_email=user_email, user_password_hash=user_password_hash)
         self.add_to_database(records=[new_user])
+        new_user_uuid: str = new_user.user_uuid
+        self.run_after_commit(lambda: self.state_cache.add_known_user(user_uuid=new_user_uuid))
         return new_user
     
     def authenticate_user(self, user_email: str, user_password: str) -> User:
@@ -60,7 +195,7 @@ class UserDatabaseClient(DatabaseClient):
         Returns:
             - User object if email and password matches, otherwise None.
         """
-        user: User = self.session.query(User).filter(User.user_email == user_email).first()
+        user: User = self.reader_session.query(User).filter(User.user_email == user_email).first()
         if user and check_password_hash(user.user_password_hash, user_password):
             return user
         return None
@@ -73,7 +208,31 @@ class UserDatabaseClient(DatabaseClient):
         Returns:
             - True if item user, otherwise False.
         """
-        return self.session.query(User).filter(User.user_uuid == user_uuid).scalar() is not None
+        if self.state_cache.check_if_user_is_known(user_uuid=user_uuid):
+            return True
+
+        user_exists: bool = self.reader_session.query(User).filter(User.user_uuid == user_uuid).scalar() is not None
+        if user_exists:
+            self.state_cache.add_known_user(user_uuid=user_uuid)
+        return user_exists
+
+    def retrieve_existing_users_uuids(self, users_uuids: Set[str]) -> Set[str]:
+        """
+        Checks which users exist, querying the users unknown to the cache with a single ``IN`` query.
+        Inputs:
+            - users_uuids: UUIDs representing the target users.
+        Returns:
+            - UUIDs of the existing users.
+        """
+        existing_users_uuids: Set[str] = {
+            user_uuid for user_uuid in users_uuids if self.state_cache.check_if_user_is_known(user_uuid=user_uuid)}
+        unknown_users_uuids: Set[str] = set(users_uuids) - existing_users_uuids
+        if unknown_users_uuids:
+            for user_uuid, in self.reader_session.query(User.user_uuid).filter(
+                    User.user_uuid.in_(unknown_users_uuids)):
+                self.state_cache.add_known_user(user_uuid=user_uuid)
+                existing_users_uuids.add(user_uuid)
+        return existing_users_uuids
 
 
 class ItemDatabaseClient(DatabaseClient):
@@ -100,7 +259,22 @@ class ItemDatabaseClient(DatabaseClient):
             bid_expiration_timestamp=bid_expiration_timestamp)
         
         self.add_to_database(records=[new_item])
+        self.run_after_commit(functools.partial(
+            self.record_new_item, item_uuid=new_item.item_uuid,
+            bid_expiration_timestamp=new_item.bid_expiration_timestamp))
         return new_item
+
+    def record_new_item(self, item_uuid: str, bid_expiration_timestamp: datetime.datetime):
+        """
+        Adds a newly saved item to the auction state cache and to the auction close index, and bumps its version.
+        Inputs:
+            - item_uuid: UUID representing the new item.
+            - bid_expiration_timestamp: Item closing timestamp.
+        """
+        self.state_cache.set_item_state(
+            item_uuid=item_uuid, item_state=ItemAuctionState(bid_expiration_timestamp=bid_expiration_timestamp))
+        self.close_index.schedule_item_close(item_uuid=item_uuid, bid_expiration_timestamp=bid_expiration_timestamp)
+        self.item_versions.bump_item_version(item_uuid=item_uuid)
     
     def retrieve_all_items(self) -> List[Item]:
         """
@@ -108,7 +282,71 @@ class ItemDatabaseClient(DatabaseClient):
         Returns:
             - List of all items.
         """
-        return self.session.query(Item).all()
+        return self.reader_session.query(Item).all()
+
+    def __filtered_items_query(
+            self, after_item_id: int = None, auction_status: str = None,
+            min_price_in_usd: int = None, max_price_in_usd: int = None) -> Query:
+        """
+        Builds the items query shared by paged and streamed listings, ordered by item id.
+        Inputs:
+            - after_item_id: Only items with a greater id are returned, i.e the previous page last item id.
+            - auction_status: Optional ``AuctionStatus`` filter.
+            - min_price_in_usd: Optional minimum current price, inclusive.
+            - max_price_in_usd: Optional maximum current price, inclusive.
+        Returns:
+            - Items query.
+        """
+        items_query: Query = self.reader_session.query(Item)
+        if after_item_id is not None:
+            items_query = items_query.filter(Item.item_id > after_item_id)
+
+        if auction_status == AuctionStatus.OPEN:
+            items_query = items_query.filter(Item.bid_expiration_timestamp >= datetime.datetime.utcnow())
+        elif auction_status == AuctionStatus.CLOSED:
+            items_query = items_query.filter(Item.bid_expiration_timestamp < datetime.datetime.utcnow())
+
+        # Items without bids are priced at their base price.
+        item_current_price = func.coalesce(Item.current_bid_price_in_usd, Item.item_base_price_in_usd)
+        if min_price_in_usd is not None:
+            items_query = items_query.filter(item_current_price >= min_price_in_usd)
+        if max_price_in_usd is not None:
+            items_query = items_query.filter(item_current_price <= max_price_in_usd)
+
+        return items_query.order_by(Item.item_id)
+
+    def retrieve_items_page(
+            self, limit: int, after_item_id: int = None, auction_status: str = None,
+            min_price_in_usd: int = None, max_price_in_usd: int = None) -> List[Item]:
+        """
+        Retrieves one page of auction items ordered by item id (keyset pagination).
+        Inputs:
+            - limit: Maximum number of items to return.
+            - after_item_id: Only items with a greater id are returned, i.e the previous page last item id.
+            - auction_status: Optional ``AuctionStatus`` filter.
+            - min_price_in_usd: Optional minimum current price, inclusive.
+            - max_price_in_usd: Optional maximum current price, inclusive.
+        Returns:
+            - List of items.
+        """
+        return self.__filtered_items_query(
+            after_item_id=after_item_id, auction_status=auction_status,
+            min_price_in_usd=min_price_in_usd, max_price_in_usd=max_price_in_usd).limit(limit).all()
+
+    def iterate_items(
+            self, after_item_id: int = None, auction_status: str = None,
+            min_price_in_usd: int = None, max_price_in_usd: int = None) -> Iterator[Item]:
+        """
+        Iterates over auction items, loading ``GeneralConstants.STREAMING_YIELD_PER`` rows at a time.
+        Inputs:
+            - Same filters as ``retrieve_items_page``.
+        Returns:
+            - Items iterator ordered by item id.
+        """
+        return iter(self.__filtered_items_query(
+            after_item_id=after_item_id, auction_status=auction_status,
+            min_price_in_usd=min_price_in_usd, max_price_in_usd=max_price_in_usd).yield_per(
+                GeneralConstants.STREAMING_YIELD_PER))
 
     def retrieve_item_by_item_uuid(self, item_uuid: str) -> Item:
         """
@@ -118,8 +356,32 @@ class ItemDatabaseClient(DatabaseClient):
         Returns:
             - Item record.
         """
-        return self.session.query(Item).filter(Item.item_uuid == item_uuid).one_or_none()
+        return self.reader_session.query(Item).filter(Item.item_uuid == item_uuid).one_or_none()
     
+    def retrieve_item_details(self, item_uuid: str, bids_limit: int = None) -> Tuple[Item, List[Bid]]:
+        """
+        Retrieves an item together with its bids and auto bidders in two round trips.
+        Auto bidders are joined to the item row, bids are fetched by a second query.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+            - bids_limit: Optional number of most recent bids to retrieve, all bids are retrieved by default.
+        Returns:
+            - Item record with loaded ``auto_bidders`` and its bids in placement order, (None, []) if not found.
+        """
+        item_query: Query = self.reader_session.query(Item).options(joinedload(Item.auto_bidders)).filter(
+            Item.item_uuid == item_uuid)
+        if bids_limit is None:
+            item: Item = item_query.options(selectinload(Item.bids)).one_or_none()
+            return item, list(item.bids) if item else []
+
+        item: Item = item_query.one_or_none()
+        if item is None:
+            return None, []
+
+        most_recent_bids: List[Bid] = self.reader_session.query(Bid).filter(
+            Bid.bid_item_uuid == item_uuid).order_by(Bid.bid_id.desc()).limit(bids_limit).all()
+        return item, most_recent_bids[::-1]
+
     def check_if_item_exists(self, item_uuid: str) -> bool:
         """
         Checks if an item exists.
@@ -128,7 +390,7 @@ class ItemDatabaseClient(DatabaseClient):
         Returns:
             - True if item exists, otherwise False.
         """
-        return self.session.query(Item).filter(Item.item_uuid == item_uuid).scalar() is not None
+        return self.retrieve_item_auction_state(item_uuid=item_uuid) is not None
     
     def retrieve_item_close_date(self, item_uuid: str) -> datetime.datetime:
         """
@@ -138,14 +400,135 @@ class ItemDatabaseClient(DatabaseClient):
         Returns:
             - Item closing date.
         """
-        return self.session.query(Item.bid_expiration_timestamp).filter(
-            Item.item_uuid == item_uuid).one_or_none()[0]
+        return self.retrieve_item_auction_state(item_uuid=item_uuid).bid_expiration_timestamp
+
+    def retrieve_item_auction_state(self, item_uuid: str, use_cache: bool = True) -> ItemAuctionState:
+        """
+        Retrieves item close date and highest bid, from the auction state cache when possible.
+        Inputs:
+            - item_uuid: UUID representing the target item record.
+            - use_cache: Whether a cached state may be returned, otherwise the state is reloaded from the database.
+        Returns:
+            - Item auction state, None if the item does not exist.
+        """
+        item_state: ItemAuctionState = self.state_cache.get_item_state(item_uuid=item_uuid) if use_cache else None
+        if item_state is not None:
+            return item_state
+
+        item_auction_state: Tuple[datetime.datetime, int, str] = self.reader_session.query(
+            Item.bid_expiration_timestamp, Item.current_bid_price_in_usd, Item.current_bidder_uuid).filter(
+                Item.item_uuid == item_uuid).one_or_none()
+        if item_auction_state is None:
+            return None
+
+        item_state = ItemAuctionState(*item_auction_state)
+        # Closed items are not cached, they are dropped from the cache once finalized.
+        if item_state.bid_expiration_timestamp >= datetime.datetime.utcnow():
+            self.state_cache.set_item_state(item_uuid=item_uuid, item_state=item_state)
+        return item_state
+
+    def retrieve_items_auction_states(self, items_uuids: Set[str]) -> Dict[str, ItemAuctionState]:
+        """
+        Retrieves the auction state of several items from the database with a single ``IN`` query.
+        Inputs:
+            - items_uuids: UUIDs representing the target items.
+        Returns:
+            - Dictionary mapping existing items uuids to their auction state.
+        """
+        if not items_uuids:
+            return {}
+        return {
+            item_uuid: ItemAuctionState(*item_auction_state)
+            for item_uuid, *item_auction_state in self.reader_session.query(
+                Item.item_uuid, Item.bid_expiration_timestamp, Item.current_bid_price_in_usd,
+                Item.current_bidder_uuid).filter(Item.item_uuid.in_(items_uuids))}
+
+    def retrieve_upcoming_auctions_closes(self, limit: int) -> List[Tuple[datetime.datetime, str]]:
+        """
+        Retrieves the earliest closes of the items whose auction is not finalized yet.
+        Inputs:
+            - limit: Maximum number of items to retrieve.
+        Returns:
+            - (bid_expiration_timestamp, item_uuid) pairs ordered by close timestamp.
+        """
+        return self.reader_session.query(Item.bid_expiration_timestamp, Item.item_uuid).filter(
+            Item.auction_closed_timestamp.is_(None)).order_by(Item.bid_expiration_timestamp).limit(limit).all()
+
+    def finalize_auctions(self, items_uuids: List[str], closed_timestamp: datetime.datetime) -> int:
+        """
+        Records the current bidder and bid of closed items as their winner and winning bid,
+        then drops the items from the auction state cache and bumps their version.
+        Inputs:
+            - items_uuids: UUIDs representing the items to finalize.
+            - closed_timestamp: Finalization timestamp, only items closed by then are finalized.
+        Returns:
+            - Number of finalized items.
+        """
+        finalized_items_count: int = self.session.query(Item).filter(
+            Item.item_uuid.in_(items_uuids),
+            Item.auction_closed_timestamp.is_(None),
+            Item.bid_expiration_timestamp <= closed_timestamp).update({
+                Item.auction_closed_timestamp: closed_timestamp,
+                Item.winner_uuid: Item.current_bidder_uuid,
+                Item.winning_bid_price_in_usd: Item.current_bid_price_in_usd
+            }, synchronize_session=False)
+        self.commit()
+
+        for item_uuid in items_uuids:
+            self.run_after_commit(functools.partial(self.state_cache.remove_item_state, item_uuid=item_uuid))
+            self.run_after_commit(functools.partial(self.item_versions.bump_item_version, item_uuid=item_uuid))
+        return finalized_items_count
 
 
 class BidDatabaseClient(DatabaseClient):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args,
+                 committed_bids_listener: Callable[[str, List[Dict[str, Any]], Tuple[int, int]], None] = None,
+                 **kwargs):
+        """
+        Inputs:
+            - committed_bids_listener: Called once bids are committed with their item uuid, the json
+              dictionaries of the bids, serialized before the commit expires them, and the item version
+              of their commit.
+        """
         DatabaseClient.__init__(self, *args, **kwargs)
-    
+        self.committed_bids_listener: Callable[[str, List[Dict[str, Any]], Tuple[int, int]], None] = \
+            committed_bids_listener
+
+    def save_items_bids(self, new_items_bids: Dict[str, List[Bid]]):
+        """
+        Saves new bids, then records them once they are committed, see ``record_item_bids``. Bids are
+        serialized after the flush, before the commit expires them, so that listeners do not reload them.
+        Inputs:
+            - new_items_bids: Dictionary mapping items uuids to their ordered new bid records.
+        """
+        new_items_bids = {
+            bid_item_uuid: item_new_bids for bid_item_uuid, item_new_bids in new_items_bids.items() if item_new_bids}
+        for item_new_bids in new_items_bids.values():
+            self.session.add_all(item_new_bids)
+        self.session.flush()
+        items_bids_json_dicts: Dict[str, List[Dict[str, Any]]] = {
+            bid_item_uuid: [bid.to_json_dict() for bid in item_new_bids]
+            for bid_item_uuid, item_new_bids in new_items_bids.items()}
+        self.commit()
+
+        for bid_item_uuid, bids_json_dicts in items_bids_json_dicts.items():
+            self.run_after_commit(functools.partial(
+                self.record_item_bids, item_uuid=bid_item_uuid, bids_json_dicts=bids_json_dicts))
+
+    def record_item_bids(self, item_uuid: str, bids_json_dicts: List[Dict[str, Any]]):
+        """
+        Records committed bids on an item: the last one becomes the item current bid, then every bid is
+        handed to ``committed_bids_listener`` with the item version of their commit.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+            - bids_json_dicts: Json dictionaries of the committed bids, in placement order.
+        """
+        item_version: Tuple[int, int] = self.record_item_bid(
+            item_uuid=item_uuid, bid_price_in_usd=bids_json_dicts[-1]['bid_price_in_usd'],
+            bidder_uuid=bids_json_dicts[-1]['bidder_uuid'])
+        if self.committed_bids_listener is not None:
+            self.committed_bids_listener(item_uuid, bids_json_dicts, item_version)
+
     def create_item_bid(self, bid_price_in_usd: int, 
                         bid_item_uuid: str, bidder_uuid: str) -> Bid:
         """ 
@@ -158,9 +541,130 @@ class BidDatabaseClient(DatabaseClient):
             - Newly created bid record.
         """
         new_bid: Bid = Bid(bid_price_in_usd=bid_price_in_usd, bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid)
-        self.add_to_database(records=[new_bid])
+        self.update_item_current_bid(
+            bid_item_uuid=bid_item_uuid, bid_price_in_usd=bid_price_in_usd, bidder_uuid=bidder_uuid)
+        self.save_items_bids(new_items_bids={bid_item_uuid: [new_bid]})
         return new_bid
 
+    def create_item_bids(self, bid_item_uuid: str, bids: List[Tuple[str, int]]) -> List[Bid]:
+        """
+        Creates and saves several bids on the same item in a single transaction.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bids: Ordered list of (bidder_uuid, bid_price_in_usd) pairs.
+        Returns:
+            - Newly created bid records, in the given order.
+        """
+        new_bids: List[Bid] = [
+            Bid(bid_price_in_usd=bid_price_in_usd, bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid)
+            for bidder_uuid, bid_price_in_usd in bids]
+        if new_bids:
+            self.update_item_current_bid(
+                bid_item_uuid=bid_item_uuid, bid_price_in_usd=new_bids[-1].bid_price_in_usd,
+                bidder_uuid=new_bids[-1].bidder_uuid, new_bids_count=len(new_bids))
+        self.save_items_bids(new_items_bids={bid_item_uuid: new_bids})
+        return new_bids
+
+    def create_item_bids_if_higher(
+            self, bid_item_uuid: str, bids: List[Tuple[str, int]],
+            max_attempts: int = GeneralConstants.BID_PLACEMENT_MAX_ATTEMPTS) -> List[Bid]:
+        """
+        Atomically saves bids on an item if the first bid is higher than the item current bid and
+        the auction is still open.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bids: Ordered list of (bidder_uuid, bid_price_in_usd) pairs. The first one is the submitted
+              bid, the last one becomes the item current bid.
+            - max_attempts: Maximum number of attempts when the database is locked.
+        Returns:
+            - Newly created bid records, empty if the item does not exist, is closed or has a higher bid.
+        """
+        return self.create_items_bids_if_higher(
+            items_bids={bid_item_uuid: bids}, max_attempts=max_attempts).get(bid_item_uuid, [])
+
+    def create_items_bids_if_higher(
+            self, items_bids: Dict[str, List[Tuple[str, int]]],
+            max_attempts: int = GeneralConstants.BID_PLACEMENT_MAX_ATTEMPTS) -> Dict[str, List[Bid]]:
+        """
+        Saves bids on several items in a single transaction. The bids of an item are saved only if
+        their first bid is higher than the item current bid and the auction is still open.
+
+        The item current bid columns are updated with a conditional ``UPDATE`` guarded by the first
+        bid price and the item close date. Only one of several concurrent placements can match that
+        guard; the bids are inserted in the same transaction, so no lock is taken in the application.
+        Transient lock errors are retried ``max_attempts`` times with a jittered exponential backoff.
+        Inputs:
+            - items_bids: Dictionary mapping items uuids to ordered lists of (bidder_uuid, bid_price_in_usd)
+              pairs. The last pair of each list becomes the item current bid.
+            - max_attempts: Maximum number of attempts when the database is locked.
+        Returns:
+            - Dictionary mapping items uuids to their newly created bid records. Items that do not exist,
+              are closed or have a higher bid are left out.
+        """
+        for attempt in range(1, max_attempts + 1):
+            try:
+                new_items_bids: Dict[str, List[Bid]] = {}
+                for bid_item_uuid, bids in items_bids.items():
+                    updated_items_count: int = self.session.query(Item).filter(
+                        Item.item_uuid == bid_item_uuid,
+                        Item.bid_expiration_timestamp >= datetime.datetime.utcnow(),
+                        or_(Item.current_bid_price_in_usd.is_(None),
+                            Item.current_bid_price_in_usd < bids[0][1])).update({
+                                Item.current_bid_price_in_usd: bids[-1][1],
+                                Item.current_bidder_uuid: bids[-1][0],
+                                Item.bid_count: Item.bid_count + len(bids)
+                            }, synchronize_session=False)
+                    if updated_items_count:
+                        new_items_bids[bid_item_uuid] = [
+                            Bid(bid_price_in_usd=bid_price_in_usd, bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid)
+                            for bidder_uuid, bid_price_in_usd in bids]
+
+                if not new_items_bids:
+                    # Nothing was written, end the transaction unless it is part of a unit of work.
+                    if not self.in_unit_of_work():
+                        self.session.rollback()
+                    return {}
+                self.save_items_bids(new_items_bids=new_items_bids)
+            except OperationalError:
+                # A unit of work cannot be replayed partially, let its owner retry it.
+                if self.in_unit_of_work() or attempt == max_attempts:
+                    raise
+                self.session.rollback()
+                time.sleep(random.uniform(0, GeneralConstants.BID_PLACEMENT_RETRY_BACKOFF_IN_SECONDS * 2 ** attempt))
+                continue
+            return new_items_bids
+
+    def record_item_bid(self, item_uuid: str, bid_price_in_usd: int, bidder_uuid: str) -> Tuple[int, int]:
+        """
+        Updates the auction state cache and the item version once bids are committed.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+            - bid_price_in_usd: Committed current bid price.
+            - bidder_uuid: UUID representing the current bidder.
+        Returns:
+            - Item version of the committed bids.
+        """
+        self.state_cache.record_item_bid(
+            item_uuid=item_uuid, bid_price_in_usd=bid_price_in_usd, bidder_uuid=bidder_uuid)
+        return self.item_versions.bump_item_version(item_uuid=item_uuid)
+
+    def update_item_current_bid(self, bid_item_uuid: str, bid_price_in_usd: int,
+                                bidder_uuid: str, new_bids_count: int = 1):
+        """
+        Updates the item denormalized current bid columns. Changes are committed with the bids
+        by the following ``save_items_bids`` call so both writes happen in the same transaction.
+        Inputs:
+            - bid_item_uuid: UUID representing the target item.
+            - bid_price_in_usd: New current bid price.
+            - bidder_uuid: UUID representing the new current bidder.
+            - new_bids_count: Number of bids being added.
+        """
+        self.session.query(Item).filter(Item.item_uuid == bid_item_uuid).update({
+            Item.current_bid_price_in_usd: bid_price_in_usd,
+            Item.current_bidder_uuid: bidder_uuid,
+            Item.bid_count: Item.bid_count + new_bids_count
+        }, synchronize_session=False)
+
     def retrieve_item_bids(self, item_uuid: str) -> List[Bid]:
         """
         Retrieves all item bids.
@@ -169,15 +673,27 @@ class BidDatabaseClient(DatabaseClient):
         Returns:
             - List of registered bids.
         """
-        return self.session.query(Bid).filter(Bid.bid_item_uuid == item_uuid).all()
+        return self.reader_session.query(Bid).filter(Bid.bid_item_uuid == item_uuid).all()
     
+    def iterate_item_bids(self, item_uuid: str) -> Iterator[Bid]:
+        """
+        Iterates over item bids in placement order, loading ``GeneralConstants.STREAMING_YIELD_PER`` rows at a time.
+        Inputs:
+            - item_uuid: UUID representing the item.
+        Returns:
+            - Bids iterator.
+        """
+        return iter(self.reader_session.query(Bid).filter(Bid.bid_item_uuid == item_uuid).order_by(
+            Bid.bid_id).yield_per(GeneralConstants.STREAMING_YIELD_PER))
+
     def retrieve_item_most_recent_bid(self, item_uuid: str) -> List[Bid]:
         """
         Retrieves item most recent bid.
         Returns:
             - Item most recent bid record.
         """
-        return self.session.query(Bid).filter(Bid.bid_item_uuid == item_uuid).order_by(Bid.bid_id.desc()).first()
+        return self.reader_session.query(Bid).filter(
+            Bid.bid_item_uuid == item_uuid).order_by(Bid.bid_id.desc()).first()
 
 
 class AutoBidDatabaseClient(DatabaseClient):
@@ -200,27 +716,103 @@ class AutoBidDatabaseClient(DatabaseClient):
         return user_auto_bid
     
     def check_if_user_auto_bidder_config_exists(self, bidder_uuid: str) -> bool:
-        return self.session.query(UserAutoBid).filter(
+        return self.reader_session.query(UserAutoBid).filter(
             UserAutoBid.bidder_uuid == bidder_uuid).scalar() is not None
     
     def register_auto_bid(self, bid_item_uuid: str, bidder_uuid: str) -> AutoBid:
         auto_bid: AutoBid = AutoBid(bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid)
         self.add_to_database(records=[auto_bid])
+        self.run_after_commit(functools.partial(self.item_versions.bump_item_version, item_uuid=bid_item_uuid))
         return auto_bid
     
     def check_if_user_auto_bid_exists(self, bid_item_uuid: str, bidder_uuid: str) -> bool:
-        return self.session.query(AutoBid).filter(
+        return self.reader_session.query(AutoBid).filter(
             AutoBid.bid_item_uuid == bid_item_uuid, 
             AutoBid.bidder_uuid == bidder_uuid).scalar() is not None
     
     def retrieve_item_auto_bidders(self, item_uuid: str) -> List[AutoBid]:
-        return self.session.query(AutoBid).filter(
+        return self.reader_session.query(AutoBid).filter(
             AutoBid.bid_item_uuid == item_uuid).all()
+
+    def iterate_item_auto_bidders(self, item_uuid: str) -> Iterator[AutoBid]:
+        return iter(self.reader_session.query(AutoBid).filter(AutoBid.bid_item_uuid == item_uuid).order_by(
+            AutoBid.auto_bid_id).yield_per(GeneralConstants.STREAMING_YIELD_PER))
     
+    def __items_auto_bidders_budgets_query(
+            self, items_uuids: List[str], excluded_bidder_uuid: str = None, current_highest_bid: int = None) -> Query:
+        """
+        Builds a single aggregated query joining items auto bidders to their auto bid configuration
+        and to the number of auto bids they registered across all items.
+        Inputs:
+            - items_uuids: UUIDs representing the target items.
+            - excluded_bidder_uuid: Optional bidder uuid to leave out, such as the current highest bidder.
+            - current_highest_bid: Optional bid that the budget per registered item must be higher than.
+        Returns:
+            - Query yielding (bid_item_uuid, bidder_uuid, max_bid_amount_in_usd, registrations_count) rows.
+        """
+        # Only count registrations of bidders registered on the target items.
+        items_bidders_uuids = self.reader_session.query(AutoBid.bidder_uuid).filter(
+            AutoBid.bid_item_uuid.in_(items_uuids))
+        registrations_per_bidder = self.reader_session.query(
+            AutoBid.bidder_uuid.label('bidder_uuid'),
+            func.count(AutoBid.auto_bid_id).label('registrations_count')).filter(
+                AutoBid.bidder_uuid.in_(items_bidders_uuids.subquery())).group_by(
+                AutoBid.bidder_uuid).subquery()
+
+        # Auto bidders are not evaluated on closed items.
+        items_auto_bidders_budgets: Query = self.reader_session.query(
+            AutoBid.bid_item_uuid, AutoBid.bidder_uuid, UserAutoBid.max_bid_amount_in_usd,
+            registrations_per_bidder.c.registrations_count).join(
+                UserAutoBid, UserAutoBid.bidder_uuid == AutoBid.bidder_uuid).join(
+                registrations_per_bidder, registrations_per_bidder.c.bidder_uuid == AutoBid.bidder_uuid).join(
+                Item, Item.item_uuid == AutoBid.bid_item_uuid).filter(
+                AutoBid.bid_item_uuid.in_(items_uuids),
+                Item.auction_closed_timestamp.is_(None),
+                Item.bid_expiration_timestamp >= datetime.datetime.utcnow())
+
+        if excluded_bidder_uuid is not None:
+            items_auto_bidders_budgets = items_auto_bidders_budgets.filter(AutoBid.bidder_uuid != excluded_bidder_uuid)
+
+        if current_highest_bid is not None:
+            # Same as max_bid_amount_in_usd / registrations_count > current_highest_bid without integer division.
+            items_auto_bidders_budgets = items_auto_bidders_budgets.filter(
+                UserAutoBid.max_bid_amount_in_usd > current_highest_bid * registrations_per_bidder.c.registrations_count)
+
+        return items_auto_bidders_budgets.order_by(AutoBid.auto_bid_id)
+
+    def retrieve_item_auto_bidders_budgets(self, item_uuid: str) -> List[Tuple[str, int, int]]:
+        """
+        Retrieves the auto bidding budget of every auto bidder registered on an item.
+        Inputs:
+            - item_uuid: UUID representing the target item.
+        Returns:
+            - List of (bidder_uuid, max_bid_amount_in_usd, number_of_registered_auto_bids) tuples
+              ordered by auto bid registration.
+        """
+        return self.retrieve_items_auto_bidders_budgets(items_uuids=[item_uuid]).get(item_uuid, [])
+
+    def retrieve_items_auto_bidders_budgets(self, items_uuids: List[str]) -> Dict[str, List[Tuple[str, int, int]]]:
+        """
+        Retrieves the auto bidding budget of every auto bidder registered on several items in one query.
+        Inputs:
+            - items_uuids: UUIDs representing the target items.
+        Returns:
+            - Dictionary mapping item uuids to lists of (bidder_uuid, max_bid_amount_in_usd,
+              number_of_registered_auto_bids) tuples ordered by auto bid registration.
+              Items without auto bidders are left out.
+        """
+        items_auto_bidders_budgets: Dict[str, List[Tuple[str, int, int]]] = {}
+        for bid_item_uuid, bidder_uuid, max_bid_amount_in_usd, registrations_count in \
+                self.__items_auto_bidders_budgets_query(items_uuids=items_uuids):
+            items_auto_bidders_budgets.setdefault(bid_item_uuid, []).append(
+                (bidder_uuid, max_bid_amount_in_usd, registrations_count))
+        return items_auto_bidders_budgets
+
     def retrieve_item_auto_bidders_uuids_with_enough_funds(
             self, item_uuid: str, highest_bider_uuid: str, current_highest_bid: int) -> List[str]:
         """
         Retrieves auto bidders uuids with enough funds to place a bid.
+        An auto bidder has enough funds when its budget per registered item is higher than the current bid.
         Inputs:
             - item_uuid: UUID representing a target item to place a bid on.
             - highest_bider_uuid: Current highest bidder uuid.
@@ -228,23 +820,7 @@ class AutoBidDatabaseClient(DatabaseClient):
         Returns:
             - List of auto bidders uuids.
         """
-        item_auto_bidders_uuids: Tuple[str] = self.session.query(AutoBid.bidder_uuid).filter(
-            AutoBid.bid_item_uuid == item_uuid,
-            AutoBid.bidder_uuid != highest_bider_uuid).all()
-
-        auto_bidders_with_enough_funds: List[str] = []
-        for item_auto_bidder_uuid, in item_auto_bidders_uuids:
-            auto_bidder_max_bid_amount_in_usd: int = \
-                self.session.query(UserAutoBid.max_bid_amount_in_usd).filter(
-                    UserAutoBid.bidder_uuid == item_auto_bidder_uuid).one_or_none()[0]
-            number_of_bids_registered_by_user: int = self.session.query(AutoBid).filter(
-                AutoBid.bidder_uuid == item_auto_bidder_uuid).count()
-            average_bid_per_item: int = auto_bidder_max_bid_amount_in_usd / number_of_bids_registered_by_user
-
-            if average_bid_per_item > current_highest_bid:
-                auto_bidders_with_enough_funds.append(item_auto_bidder_uuid)
-
-        return auto_bidders_with_enough_funds
-        
-
-        
\ No newline at end of file
+        item_auto_bidders_budgets: List[Tuple[str, str, int, int]] = self.__items_auto_bidders_budgets_query(
+            items_uuids=[item_uuid], excluded_bidder_uuid=highest_bider_uuid,
+            current_highest_bid=current_highest_bid).all()
+        return [auto_bidder_uuid for _, auto_bidder_uuid, _, _ in item_auto_bidders_budgets]
@@ -1,17 +1,199 @@
 __author__ = "Frank Kwizera"
 
-from flask_sqlalchemy import SQLAlchemy
+from src.shared.constants import DatabaseConfig, Directories, SQLiteProfile
+from flask_sqlalchemy import SQLAlchemy, BaseQuery, _EngineConnector
 from copy import deepcopy
 from sqlalchemy.orm import sessionmaker as Session
 from sqlalchemy.orm import scoped_session
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import URL, make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import event
 
-from typing import Dict, Any
+from flask import Flask, _app_ctx_stack
+from typing import Any, Callable, Dict, List, Mapping
+import functools
+import threading
+import weakref
+import math
+import time
+import os
+
+
+def parse_boolean(value: str) -> bool:
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class ReadEngineConnector(_EngineConnector):
+    """
+    Connector of the read engine: the read replica when ``SQLALCHEMY_READ_REPLICA_URI`` is set,
+    otherwise the primary database, through a pool of its own.
+    """
+
+    def get_uri(self) -> str:
+        return self._app.config.get('SQLALCHEMY_READ_REPLICA_URI') or self._app.config['SQLALCHEMY_DATABASE_URI']
+
+
+class SnapshotQuery(BaseQuery):
+    """
+    Query of read only sessions. Those never commit, so never expire their objects: every query
+    reloads the rows it returns instead of handing out objects as they were first loaded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._populate_existing = True
+
+
+class ProfiledSQLAlchemy(SQLAlchemy):
+    """
+    ``SQLAlchemy`` applying the connection profile of the app config to its SQLite engines:
+    ``SQLITE_PRAGMAS`` are run on every new connection, and file databases are pooled with a
+    ``QueuePool`` when ``SQLALCHEMY_POOL_SIZE`` is set, instead of opening a connection per checkout.
+
+    Also applies the engine options Flask-SQLAlchemy has no config key for, to every backend:
+    ``SQLALCHEMY_POOL_PRE_PING`` tests pooled connections before handing them out, and
+    ``SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS`` aborts longer statements. PostgreSQL enforces the timeout
+    server side; SQLite, which has none, through a progress handler interrupting the statement.
+
+    Besides the app scoped ``session``, provides an app scoped ``read_session`` bound to the read engine.
+    It runs in autocommit mode: each query checks a connection out and returns it once its rows are
+    fetched, so reads never hold a transaction, nor a connection of the write pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__profiled_engines: weakref.WeakSet = weakref.WeakSet()
+        self.__profiled_engines_lock: threading.Lock = threading.Lock()
+        self.read_session: scoped_session = scoped_session(
+            self.create_read_session, scopefunc=_app_ctx_stack.__ident_func__)
+
+    def init_app(self, app: Flask):
+        super().init_app(app)
+        app.teardown_appcontext(self.remove_read_session)
+
+    def remove_read_session(self, response_or_exc: BaseException = None) -> BaseException:
+        self.read_session.remove()
+        return response_or_exc
+
+    def create_read_session(self, app: Flask = None) -> Session:
+        """
+        Returns:
+            - New autocommit session bound to the read engine.
+        """
+        return Session(bind=self.get_read_engine(app=app), autocommit=True, query_cls=SnapshotQuery)()
+
+    def make_connector(self, app: Flask = None, bind: str = None) -> _EngineConnector:
+        if bind == DatabaseConfig.READ_BIND:
+            return ReadEngineConnector(self, self.get_app(app), bind)
+        return super().make_connector(app=app, bind=bind)
+
+    def get_read_engine(self, app: Flask = None) -> Engine:
+        """
+        Returns:
+            - Engine of read only sessions. See ``ReadEngineConnector``.
+        """
+        app = self.get_app(app)
+        database_url: URL = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        # A second engine on an in memory database would open another, empty, database.
+        if not app.config.get('SQLALCHEMY_READ_REPLICA_URI') and database_url.drivername == 'sqlite' \
+                and database_url.database in (None, '', ':memory:'):
+            return self.get_engine(app=app)
+        return self.get_engine(app=app, bind=DatabaseConfig.READ_BIND)
+
+    def apply_driver_hacks(self, app: Flask, info: URL, options: Dict[str, Any]):
+        super().apply_driver_hacks(app, info, options)
+        if info.drivername == 'sqlite' and options.get('pool_size') and 'poolclass' not in options:
+            options['poolclass'] = QueuePool
+            # Pooled connections are used by the thread checking them out, not the one which opened them.
+            options.setdefault('connect_args', {})['check_same_thread'] = False
+        options['pool_pre_ping'] = bool(app.config.get('SQLALCHEMY_POOL_PRE_PING'))
+        statement_timeout_in_ms: int = app.config.get('SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS')
+        if statement_timeout_in_ms and info.drivername.startswith('postgresql'):
+            # Startup parameter of every libpq connection, e.g psycopg2.
+            connect_args: Dict[str, Any] = options.setdefault('connect_args', {})
+            connect_args['options'] = \
+                f"{connect_args.get('options', '')} -c statement_timeout={int(statement_timeout_in_ms)}".strip()
+
+    def get_engine(self, app: Flask = None, bind: str = None) -> Engine:
+        engine: Engine = super().get_engine(app=app, bind=bind)
+        if engine.dialect.name != 'sqlite' or engine in self.__profiled_engines:
+            return engine
+        with self.__profiled_engines_lock:
+            if engine not in self.__profiled_engines:
+                self.__profiled_engines.add(engine)
+                config: Dict[str, Any] = self.get_app(app).config
+                sqlite_pragmas: Dict[str, Any] = dict(config.get('SQLITE_PRAGMAS') or {})
+                if bind == DatabaseConfig.READ_BIND:
+                    # Set last: the other pragmas, such as the journal mode, may have to write.
+                    sqlite_pragmas['query_only'] = 1
+                event.listen(engine, 'connect', functools.partial(
+                    self.apply_sqlite_pragmas, sqlite_pragmas=sqlite_pragmas))
+                if config.get('SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS'):
+                    self.apply_sqlite_statement_timeout(
+                        engine=engine, timeout_in_seconds=config['SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS'] / 1000)
+        return engine
+
+    @staticmethod
+    def apply_sqlite_pragmas(dbapi_connection, connection_record, sqlite_pragmas: Dict[str, Any]):
+        """
+        Runs ``PRAGMA name=value`` for every configured pragma on a new SQLite connection.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma_name, pragma_value in sqlite_pragmas.items():
+                cursor.execute(f'PRAGMA {pragma_name}={pragma_value}')
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def apply_sqlite_statement_timeout(engine: Engine, timeout_in_seconds: float):
+        """
+        Interrupts the statements of ``engine`` running for longer than ``timeout_in_seconds``. They then fail
+        with an ``OperationalError``. Every ``SQLITE_STATEMENT_TIMEOUT_CHECK_INSTRUCTIONS`` virtual machine
+        instructions, a progress handler compares the time with the deadline of the running statement.
+        Inputs:
+            - engine: SQLite engine.
+            - timeout_in_seconds: Statement timeout.
+        """
+        def install_progress_handler(dbapi_connection, connection_record):
+            # Shared with the cursor events through the connection info, which outlives pool checkouts.
+            statement_deadline: List[float] = connection_record.info.setdefault('statement_deadline', [math.inf])
+            dbapi_connection.set_progress_handler(
+                lambda: time.monotonic() > statement_deadline[0],
+                DatabaseConfig.SQLITE_STATEMENT_TIMEOUT_CHECK_INSTRUCTIONS)
+
+        def start_statement(conn, cursor, statement, parameters, context, executemany):
+            conn.info['statement_deadline'][0] = time.monotonic() + timeout_in_seconds
+
+        def end_statement(conn, cursor, statement, parameters, context, executemany):
+            conn.info['statement_deadline'][0] = math.inf
+
+        def end_failed_statement(exception_context):
+            # Otherwise the deadline of the failed statement would interrupt the following rollback.
+            if exception_context.connection is not None:
+                exception_context.connection.info['statement_deadline'][0] = math.inf
+
+        event.listen(engine, 'connect', install_progress_handler)
+        event.listen(engine, 'before_cursor_execute', start_statement)
+        event.listen(engine, 'after_cursor_execute', end_statement)
+        event.listen(engine, 'handle_error', end_failed_statement)
 
 
 class DatabaseProvider:
     """
     Provides database access to all modules of the project.
     """
+    # App config keys which can be overridden by environment variables, with the parsers of their values.
+    ENGINE_CONFIG_PARSERS: Dict[str, Callable[[str], Any]] = {
+        'SQLALCHEMY_DATABASE_URI': str,
+        'SQLALCHEMY_READ_REPLICA_URI': str,
+        'SQLALCHEMY_POOL_SIZE': int,
+        'SQLALCHEMY_MAX_OVERFLOW': int,
+        'SQLALCHEMY_POOL_TIMEOUT': int,
+        'SQLALCHEMY_POOL_PRE_PING': parse_boolean,
+        'SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS': int
+    }
 
     def __init__(self):
         # Load lazily: Do not initialize the datatabase unless it's requested.
@@ -23,9 +205,9 @@ class DatabaseProvider:
         Remove ``__db`` reference from the state
         See https://docs.python.org/3/library/pickle.html#object.__getstate__
         """
-        state: Dict[str, Any] = deepcopy(self.__dict__)
-        del state['__db']
-        return state
+        state: Dict[str, Any] = dict(self.__dict__)
+        del state['_DatabaseProvider__db']
+        return deepcopy(state)
 
     def __setstate__(self, state: Dict[str, Any]):
         """
@@ -34,12 +216,12 @@ class DatabaseProvider:
         See https://docs.python.org/3/library/pickle.html#object.__setstate__
         """
         self.__dict__.update(state)
-        self.__dict__['__db'] = None
+        self.__dict__['_DatabaseProvider__db'] = None
 
     @property
     def db(self):
         if self.__db is None:
-            self.__db = SQLAlchemy()
+            self.__db = ProfiledSQLAlchemy()
         return self.__db
 
     @db.setter
@@ -49,17 +231,104 @@ class DatabaseProvider:
     def close_and_remove_context_db_connection(self):
         if self.__db:
             self.db.get_engine().dispose()
+            self.db.get_read_engine().dispose()
             self.db.session.close_all()
             self.__db = None
 
-    def get_new_session(self):
-        from src.server.get_app import get_app
-        session_factory: Session = Session(bind=self.db.get_engine(app=get_app()))
+    def dispose_connections(self):
+        """
+        Closes the scoped session and every pooled connection while keeping the ``SQLAlchemy`` object,
+        which the models are bound to. Used around ``os.fork`` so that each worker process opens its
+        own connections instead of sharing the parent ones.
+        """
+        if self.__db is None:
+            return
+        from src.get_app import get_app
+        app: Flask = get_app()
+        self.__db.session.remove()
+        self.__db.read_session.remove()
+        for bind in [None] + list(app.config.get('SQLALCHEMY_BINDS') or {}):
+            self.__db.get_engine(app=app, bind=bind).dispose()
+        self.__db.get_read_engine(app=app).dispose()
+
+    @classmethod
+    def apply_engine_config(cls, app: Flask, environ: Mapping[str, str] = None):
+        """
+        Loads the app database config: first from the JSON file of Flask config keys named by the
+        ``ANTIQUE_AUCTION_DATABASE_CONFIG`` environment variable, if any, then from the environment variables
+        named after the ``ENGINE_CONFIG_PARSERS`` keys, e.g ``ANTIQUE_AUCTION_SQLALCHEMY_POOL_SIZE``. The database
+        defaults to the local SQLite file. ``SQLALCHEMY_READ_REPLICA_URI`` points the read engine, used by read
+        only sessions, to a read replica. Has to be called before ``init_app``.
+        Inputs:
+            - app: Flask app.
+            - environ: Environment variables, defaults to ``os.environ``.
+        """
+        environ = os.environ if environ is None else environ
+        config_path: str = environ.get(DatabaseConfig.CONFIG_FILE_ENVIRONMENT_VARIABLE)
+        if config_path:
+            app.config.from_json(config_path)
+        for config_key, parse_value in cls.ENGINE_CONFIG_PARSERS.items():
+            value: str = environ.get(DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + config_key)
+            if value is not None:
+                app.config[config_key] = parse_value(value)
+
+        if 'SQLALCHEMY_DATABASE_URI' not in app.config:
+            app.config['SQLALCHEMY_DATABASE_URI'] = \
+                "sqlite:///" + os.path.join(Directories.database_root(), DatabaseConfig.DEFAULT_DATABASE_FILE_NAME)
+
+    @staticmethod
+    def apply_connection_profile(app: Flask):
+        """
+        Defaults the app database config to the ``SQLiteProfile`` connection profile: write ahead log,
+        ``synchronous=NORMAL`` (no fsync per commit, durable up to the last checkpoint on power loss),
+        a busy timeout instead of immediate "database is locked" errors, a larger page cache, memory
+        mapped reads and in memory temporary tables, and a pool of connections. Values already set in
+        the app config are kept. Has to be called before ``init_app``.
+        Inputs:
+            - app: Flask app.
+        """
+        app.config.setdefault('SQLITE_PRAGMAS', {
+            'journal_mode': SQLiteProfile.JOURNAL_MODE,
+            'synchronous': SQLiteProfile.SYNCHRONOUS,
+            'busy_timeout': SQLiteProfile.BUSY_TIMEOUT_IN_MS,
+            # Negative cache sizes are in KiB rather than pages.
+            'cache_size': -SQLiteProfile.CACHE_SIZE_IN_KIB,
+            'mmap_size': SQLiteProfile.MMAP_SIZE_IN_BYTES,
+            'temp_store': SQLiteProfile.TEMP_STORE
+        })
+        app.config.setdefault('SQLALCHEMY_POOL_SIZE', SQLiteProfile.POOL_SIZE)
+        app.config.setdefault('SQLALCHEMY_MAX_OVERFLOW', SQLiteProfile.POOL_MAX_OVERFLOW)
+        app.config.setdefault('SQLALCHEMY_POOL_TIMEOUT', SQLiteProfile.POOL_TIMEOUT_IN_SECONDS)
+
+    def instrument_queries(self, app: Flask):
+        """
+        Counts and times the statements of every request and ``DatabaseClient`` method, and logs slow ones.
+        See ``QueryInstrumentation``.
+        Inputs:
+            - app: Flask app.
+        """
+        from src.storage.query_instrumentation import query_instrumentation
+        query_instrumentation.install(app=app)
+
+    def get_new_session(self, read_only: bool = False, app: Flask = None):
+        """
+        Creates a new session, independent from the app scoped one.
+        Inputs:
+            - read_only: Whether the session is only used to read, in which case it is an autocommit
+              session bound to the read engine, the read replica when one is configured.
+            - app: Flask app, defaults to ``get_app()``.
+        """
+        if app is None:
+            from src.get_app import get_app
+            app = get_app()
+        if read_only:
+            return scoped_session(functools.partial(self.db.create_read_session, app=app))
+        session_factory: Session = Session(bind=self.db.get_engine(app=app))
         return scoped_session(session_factory)
 
     def recover_context_db_connection(self):
         if self.__db is None:
-            self.__db = SQLAlchemy()
+            self.__db = ProfiledSQLAlchemy()
 
 
 # Provide this copy to the entire module. Clients can still create instances of DataBaseProvider.
@@ -47,7 +47,29 @@ class Item(db.Model):
     item_owner_uuid = db.Column(
         db.String(GeneralConstants.UUID_MAX_LENGTH), 
         db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False)
-    bid_expiration_timestamp = db.Column(db.DateTime, nullable=False)
+    bid_expiration_timestamp = db.Column(db.DateTime, nullable=False, index=True)
+
+    # Denormalized from the most recent bid, kept up to date by ``BidDatabaseClient``.
+    current_bid_price_in_usd = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"))
+    current_bidder_uuid = db.Column(
+        db.String(GeneralConstants.UUID_MAX_LENGTH),
+        db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'))
+    bid_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Set by the auction close scheduler once the auction is finalized.
+    auction_closed_timestamp = db.Column(db.DateTime)
+    winner_uuid = db.Column(
+        db.String(GeneralConstants.UUID_MAX_LENGTH),
+        db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'))
+    winning_bid_price_in_usd = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"))
+
+    bids = db.relationship('Bid', backref='item', order_by='Bid.bid_id')
+    auto_bidders = db.relationship('AutoBid', backref='item', order_by='AutoBid.auto_bid_id')
+
+    # Upcoming closes of not yet finalized items, read without touching the table.
+    __table_args__ = (db.Index(
+        'ix_item_auction_closed_timestamp_bid_expiration_timestamp',
+        'auction_closed_timestamp', 'bid_expiration_timestamp', 'item_uuid'), )
 
     def __init__(self, item_name: str = None, item_description: str = None, item_base_price_in_usd: int = None,
                  item_owner_uuid: str = None, bid_expiration_timestamp: datetime.datetime = None):
@@ -58,6 +80,7 @@ class Item(db.Model):
         self.item_base_price_in_usd = item_base_price_in_usd
         self.item_owner_uuid = item_owner_uuid
         self.bid_expiration_timestamp = bid_expiration_timestamp
+        self.bid_count = 0
     
     def __repr__(self):
         return "<Item: {} {}>".format(self.item_name, self.item_base_price_in_usd)
@@ -73,7 +96,13 @@ class Item(db.Model):
             'item_description': self.item_description,
             'item_base_price_in_usd': self.item_base_price_in_usd,
             'item_owner_uuid': self.item_owner_uuid,
-            'bid_expiration_timestamp': self.bid_expiration_timestamp
+            'bid_expiration_timestamp': self.bid_expiration_timestamp,
+            'current_bid_price_in_usd': self.current_bid_price_in_usd,
+            'current_bidder_uuid': self.current_bidder_uuid,
+            'bid_count': self.bid_count,
+            'auction_closed_timestamp': self.auction_closed_timestamp,
+            'winner_uuid': self.winner_uuid,
+            'winning_bid_price_in_usd': self.winning_bid_price_in_usd
         }
 
 class Bid(db.Model):
@@ -85,7 +114,10 @@ class Bid(db.Model):
         db.ForeignKey('item.item_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False)
     bidder_uuid = db.Column(
         db.String(GeneralConstants.UUID_MAX_LENGTH), 
-        db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False)
+        db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False, index=True)
+
+    # Serves item bids retrieval and most recent bid lookup (scanned backwards for ``bid_id DESC``).
+    __table_args__ = (db.Index('ix_bid_bid_item_uuid_bid_id', 'bid_item_uuid', 'bid_id'), )
     
     def __init__(self, bid_price_in_usd: int, bid_item_uuid: str, bidder_uuid: str):
         self.bid_uuid = str(uuid.uuid4())
@@ -145,7 +177,7 @@ class AutoBid(db.Model):
         db.ForeignKey('item.item_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False)
     bidder_uuid = db.Column(
         db.String(GeneralConstants.UUID_MAX_LENGTH), 
-        db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False)
+        db.ForeignKey('user.user_uuid', onupdate='CASCADE', ondelete='RESTRICT'), nullable=False, index=True)
     
     __table_args__ = (db.UniqueConstraint('bid_item_uuid', 'bidder_uuid'), )
     
@@ -0,0 +1,81 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from typing import Tuple
+import multiprocessing
+import ctypes
+import zlib
+
+
+class ItemVersions:
+    """
+    Version counters of the items, bumped by ``DatabaseClient`` after each committed write changing
+    what the item endpoints return: bids, auto bid registrations, new items and auction finalizations.
+
+    Counters live in shared memory allocated when the module is imported, so that the pre-forked
+    worker processes and the supervising process, which finalizes auctions, see each other writes.
+    Items are hashed into ``ITEM_VERSIONS_SLOTS`` counters: items sharing a counter are invalidated
+    together, which is only ever an extra cache miss.
+    """
+    # Indexes of the counters shared by every item.
+    EPOCH_INDEX: int = 0
+    ITEMS_INDEX: int = 1
+    FIRST_ITEM_INDEX: int = 2
+
+    def __init__(self, slots: int = GeneralConstants.ITEM_VERSIONS_SLOTS):
+        self.slots: int = slots
+        self.__versions = multiprocessing.Array(ctypes.c_uint64, self.FIRST_ITEM_INDEX + slots)
+        # Counters read without the lock shared by every process, which only serializes the bumps: reads
+        # happen on every cached request, and a counter is a single aligned word, never read half written.
+        self.__counters: ctypes.Array = self.__versions.get_obj()
+
+    def retrieve_item_slot_index(self, item_uuid: str) -> int:
+        return self.FIRST_ITEM_INDEX + zlib.crc32(item_uuid.encode()) % self.slots
+
+    def retrieve_item_version(self, item_uuid: str) -> Tuple[int, int]:
+        """
+        Inputs:
+            - item_uuid: UUID representing the target item.
+        Returns:
+            - Version of a single item.
+        """
+        return self.__counters[self.EPOCH_INDEX], self.__counters[self.retrieve_item_slot_index(item_uuid=item_uuid)]
+
+    def retrieve_items_version(self) -> Tuple[int, int]:
+        """
+        Returns:
+            - Version of the items as a whole, bumped with any item version.
+        """
+        return self.__counters[self.EPOCH_INDEX], self.__counters[self.ITEMS_INDEX]
+
+    def bump_item_version(self, item_uuid: str) -> Tuple[int, int]:
+        """
+        Records a committed change of an item.
+        Inputs:
+            - item_uuid: UUID representing the changed item.
+        Returns:
+            - Version of the item right after this change.
+        """
+        item_slot_index: int = self.retrieve_item_slot_index(item_uuid=item_uuid)
+        with self.__versions.get_lock():
+            self.__counters[item_slot_index] += 1
+            self.__counters[self.ITEMS_INDEX] += 1
+            return self.__counters[self.EPOCH_INDEX], self.__counters[item_slot_index]
+
+    @staticmethod
+    def check_if_next_item_version(item_version: Tuple[int, int], next_item_version: Tuple[int, int]) -> bool:
+        """
+        Returns:
+            - Whether ``next_item_version`` follows ``item_version`` with a single change of the item.
+        """
+        return next_item_version == (item_version[0], item_version[1] + 1)
+
+    def bump_all_versions(self):
+        """
+        Records a change of any number of items, such as a bulk insert.
+        """
+        with self.__versions.get_lock():
+            self.__counters[self.EPOCH_INDEX] += 1
+
+
+item_versions = ItemVersions()
@@ -0,0 +1,157 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.constants import GeneralConstants
+from flask import Flask, current_app, g, has_request_context, request, wrappers
+from sqlalchemy.engine import Engine
+from sqlalchemy import event
+from types import FrameType
+from typing import Any, Dict, List, Tuple
+import threading
+import logging
+import time
+import sys
+import os
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+DATABASE_CLIENT_FILE_SUFFIX: str = os.path.join('storage', 'database_client.py')
+# Statements emitted outside of a ``DatabaseClient`` method.
+UNATTRIBUTED_METHOD: str = 'unattributed'
+
+
+class QueryInstrumentation:
+    """
+    Counts SQL statements and their execution time per request, per endpoint and per ``DatabaseClient``
+    method, through the ``before_cursor_execute`` and ``after_cursor_execute`` events of every engine.
+
+    Statements slower than ``SLOW_QUERY_THRESHOLD_IN_MS`` (app config, defaults to
+    ``GeneralConstants.SLOW_QUERY_THRESHOLD_IN_MS``) are logged with their parameters and caller.
+    Finding the method of a statement walks the call stack: with the ``QUERY_METHODS_STATS_ENABLED``
+    app config set to false, only slow statements are attributed, and methods stats stay empty.
+    In debug mode, responses carry the statements count and time of their request in the
+    ``X-Query-Count`` and ``X-Query-Time-Ms`` headers. Statements run while a streamed response
+    body is generated are not included in these headers.
+    """
+    QUERY_COUNT_HEADER: str = 'X-Query-Count'
+    QUERY_TIME_HEADER: str = 'X-Query-Time-Ms'
+
+    def __init__(self):
+        self.slow_query_threshold_in_seconds: float = GeneralConstants.SLOW_QUERY_THRESHOLD_IN_MS / 1000
+        self.methods_stats_enabled: bool = GeneralConstants.QUERY_METHODS_STATS_ENABLED
+        self.__methods_stats: Dict[str, List[float]] = {}
+        self.__endpoints_stats: Dict[str, List[float]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.__listening: bool = False
+
+    def install(self, app: Flask):
+        """
+        Starts instrumenting the statements of every engine, and the requests of ``app``.
+        Inputs:
+            - app: Flask app.
+        """
+        self.slow_query_threshold_in_seconds = app.config.setdefault(
+            'SLOW_QUERY_THRESHOLD_IN_MS', GeneralConstants.SLOW_QUERY_THRESHOLD_IN_MS) / 1000
+        self.methods_stats_enabled = app.config.setdefault(
+            'QUERY_METHODS_STATS_ENABLED', GeneralConstants.QUERY_METHODS_STATS_ENABLED)
+        if not self.__listening:
+            event.listen(Engine, 'before_cursor_execute', self.before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self.after_cursor_execute)
+            self.__listening = True
+        app.after_request(self.record_request)
+
+    @staticmethod
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Statements of a connection run one at a time. A single value, overwritten by the next statement,
+        # so that failed statements, which get no ``after_cursor_execute``, leave nothing behind.
+        conn.info['query_started_at'] = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_in_seconds: float = time.perf_counter() - conn.info['query_started_at']
+        is_slow: bool = elapsed_in_seconds >= self.slow_query_threshold_in_seconds
+        if self.methods_stats_enabled or is_slow:
+            method_name, caller = self.find_caller()
+        if self.methods_stats_enabled:
+            with self.__lock:
+                method_stats: List[float] = self.__methods_stats.setdefault(method_name, [0, 0.0])
+                method_stats[0] += 1
+                method_stats[1] += elapsed_in_seconds
+
+        if has_request_context():
+            g.query_count = g.get('query_count', 0) + 1
+            g.query_time_in_seconds = g.get('query_time_in_seconds', 0.0) + elapsed_in_seconds
+
+        if is_slow:
+            logger.warning(
+                f'Slow query: {elapsed_in_seconds * 1000:.1f} ms in {method_name} called from {caller}: '
+                f'{statement} with parameters {parameters}')
+
+    @staticmethod
+    def find_caller() -> Tuple[str, str]:
+        """
+        Finds the ``DatabaseClient`` method which emitted the current statement. When a method calls
+        another method of a client, the statement is attributed to the outermost one.
+        Returns:
+            - Method name, e.g ``ItemDatabaseClient.retrieve_item_details``, and its caller location.
+        """
+        method_name: str = UNATTRIBUTED_METHOD
+        frame: FrameType = sys._getframe(2)
+        while frame is not None:
+            if frame.f_code.co_filename.endswith(DATABASE_CLIENT_FILE_SUFFIX):
+                client: Any = frame.f_locals.get('self')
+                method_name = f'{type(client).__name__}.{frame.f_code.co_name}' if client is not None \
+                    else frame.f_code.co_name
+            elif method_name != UNATTRIBUTED_METHOD:
+                return method_name, f'{frame.f_code.co_filename}:{frame.f_lineno} {frame.f_code.co_name}'
+            frame = frame.f_back
+        return method_name, 'unknown'
+
+    def record_request(self, response: wrappers.Response) -> wrappers.Response:
+        """
+        Adds the request statements to its endpoint stats, and to the response headers in debug mode.
+        """
+        query_count: int = g.get('query_count', 0)
+        query_time_in_seconds: float = g.get('query_time_in_seconds', 0.0)
+        with self.__lock:
+            endpoint_stats: List[float] = self.__endpoints_stats.setdefault(str(request.endpoint), [0, 0, 0.0])
+            endpoint_stats[0] += 1
+            endpoint_stats[1] += query_count
+            endpoint_stats[2] += query_time_in_seconds
+
+        if current_app.debug:
+            response.headers[self.QUERY_COUNT_HEADER] = str(query_count)
+            response.headers[self.QUERY_TIME_HEADER] = f'{query_time_in_seconds * 1000:.3f}'
+        return response
+
+    def retrieve_methods_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            - Statements count and total time in seconds by ``DatabaseClient`` method.
+        """
+        with self.__lock:
+            return {
+                method_name: {'statements': statements_count, 'time_in_seconds': time_in_seconds}
+                for method_name, (statements_count, time_in_seconds) in self.__methods_stats.items()
+            }
+
+    def retrieve_endpoints_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            - Requests count, statements count and total statements time in seconds by endpoint.
+        """
+        with self.__lock:
+            return {
+                endpoint: {'requests': requests_count, 'statements': statements_count,
+                           'time_in_seconds': time_in_seconds}
+                for endpoint, (requests_count, statements_count, time_in_seconds) in self.__endpoints_stats.items()
+            }
+
+    def reset(self):
+        """
+        Clears the collected stats.
+        """
+        with self.__lock:
+            self.__methods_stats = {}
+            self.__endpoints_stats = {}
+
+
+query_instrumentation = QueryInstrumentation()
@@ -0,0 +1 @@
+python -m src.shared.create_synthetic_data "$@"
@@ -0,0 +1,92 @@
+__author__ = "Frank Kwizera"
+
+from src.server.auction_close_scheduler import AuctionCloseScheduler
+from src.storage.auction_close_index import AuctionCloseIndex
+from src.storage.auction_state_cache import AuctionStateCache
+from src.storage.database_client import ItemDatabaseClient, BidDatabaseClient
+from src.storage.database_tables import Item
+from src.storage.database_provider import db_provider
+from flask_sqlalchemy import SQLAlchemy
+from flask import Flask
+from src.get_app import get_app
+from typing import List
+import unittest
+import datetime
+import time
+import uuid
+
+db: SQLAlchemy = db_provider.db
+
+
+class AuctionCloseSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        self.auction_state_cache: AuctionStateCache = AuctionStateCache()
+        self.auction_close_index: AuctionCloseIndex = AuctionCloseIndex()
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient(
+            state_cache=self.auction_state_cache, close_index=self.auction_close_index)
+        self.bid_database_client: BidDatabaseClient = BidDatabaseClient(state_cache=self.auction_state_cache)
+        self.auction_close_scheduler: AuctionCloseScheduler = AuctionCloseScheduler(
+            app=self.app, item_database_client=self.item_database_client, close_index=self.auction_close_index,
+            batch_size=2, window_size=3, poll_interval_in_seconds=0.05)
+
+    def create_item(self, close_in_seconds: float) -> Item:
+        return self.item_database_client.create_and_save_new_item(
+            item_name='Item 1', item_description='Item 1 description', item_base_price_in_usd=250,
+            item_owner_uuid=str(uuid.uuid4()),
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(seconds=close_in_seconds))
+
+    def retrieve_item(self, item_uuid: str) -> Item:
+        db.session.expire_all()
+        return self.item_database_client.retrieve_item_by_item_uuid(item_uuid=item_uuid)
+
+    def test_due_auctions_are_finalized_in_batches(self):
+        closed_items_uuids: List[str] = [self.create_item(close_in_seconds=-60).item_uuid for _ in range(5)]
+        open_item: Item = self.create_item(close_in_seconds=3600)
+        open_item_uuid: str = open_item.item_uuid
+        bidder_uuid: str = str(uuid.uuid4())
+        self.bid_database_client.create_item_bid(
+            bid_price_in_usd=300, bid_item_uuid=closed_items_uuids[0], bidder_uuid=bidder_uuid)
+
+        # The window holds the 3 earliest closes, the others are loaded once these are finalized.
+        self.auction_close_scheduler.load_upcoming_closes()
+        self.assertEqual(len(self.auction_close_index), 3)
+        self.assertEqual(self.auction_close_scheduler.close_due_auctions(), 3)
+        self.auction_close_scheduler.load_upcoming_closes()
+        self.assertEqual(self.auction_close_scheduler.close_due_auctions(), 2)
+        self.assertEqual(self.auction_close_index.tracked_until, open_item.bid_expiration_timestamp)
+
+        won_item: Item = self.retrieve_item(item_uuid=closed_items_uuids[0])
+        self.assertIsNotNone(won_item.auction_closed_timestamp)
+        self.assertEqual(won_item.winner_uuid, bidder_uuid)
+        self.assertEqual(won_item.winning_bid_price_in_usd, 300)
+        self.assertIsNone(self.auction_state_cache.get_item_state(item_uuid=closed_items_uuids[0]))
+
+        self.assertIsNone(self.retrieve_item(item_uuid=open_item_uuid).auction_closed_timestamp)
+        self.assertIsNotNone(self.auction_state_cache.get_item_state(item_uuid=open_item_uuid))
+
+    def test_new_items_are_finalized_by_the_running_scheduler(self):
+        self.auction_close_scheduler.start()
+        try:
+            item_uuid: str = self.create_item(close_in_seconds=0.2).item_uuid
+            deadline: float = time.time() + 10
+            while self.retrieve_item(item_uuid=item_uuid).auction_closed_timestamp is None and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            self.auction_close_scheduler.stop()
+        self.assertIsNotNone(self.retrieve_item(item_uuid=item_uuid).auction_closed_timestamp)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.close()
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
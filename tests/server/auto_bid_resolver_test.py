@@ -0,0 +1,46 @@
+__author__ = "Frank Kwizera"
+
+from src.server.auto_bid_resolver import AutoBidResolver
+from typing import List, Tuple
+import unittest
+
+
+class AutoBidResolverTest(unittest.TestCase):
+    def test_compute_bid_ceiling(self):
+        self.assertEqual(AutoBidResolver.compute_bid_ceiling(max_bid_amount_in_usd=500, registrations_count=1), 500)
+        self.assertEqual(AutoBidResolver.compute_bid_ceiling(max_bid_amount_in_usd=11, registrations_count=2), 6)
+        self.assertEqual(AutoBidResolver.compute_bid_ceiling(max_bid_amount_in_usd=10, registrations_count=2), 5)
+
+    def test_compute_auto_bids_without_contenders(self):
+        auto_bids: List[Tuple[str, int]] = AutoBidResolver.compute_auto_bids(
+            highest_bidder_uuid='manual', current_highest_bid=300,
+            auto_bidders_ceilings=[('auto_1', 300), ('auto_2', 250)])
+        self.assertEqual(auto_bids, [])
+
+    def test_compute_auto_bids_single_contender(self):
+        auto_bids: List[Tuple[str, int]] = AutoBidResolver.compute_auto_bids(
+            highest_bidder_uuid='manual', current_highest_bid=300,
+            auto_bidders_ceilings=[('auto_1', 5000)])
+        self.assertEqual(auto_bids, [('auto_1', 301)])
+
+    def test_compute_auto_bids_bidding_war(self):
+        auto_bids: List[Tuple[str, int]] = AutoBidResolver.compute_auto_bids(
+            highest_bidder_uuid='manual', current_highest_bid=300,
+            auto_bidders_ceilings=[('auto_1', 1200), ('auto_2', 5000), ('auto_3', 200)])
+        self.assertEqual(auto_bids, [('auto_1', 1200), ('auto_2', 1201)])
+
+    def test_compute_auto_bids_tie_goes_to_earliest_registration(self):
+        auto_bids: List[Tuple[str, int]] = AutoBidResolver.compute_auto_bids(
+            highest_bidder_uuid='manual', current_highest_bid=300,
+            auto_bidders_ceilings=[('auto_1', 900), ('auto_2', 900)])
+        self.assertEqual(auto_bids, [('auto_2', 899), ('auto_1', 900)])
+
+    def test_compute_auto_bids_highest_bidder_defends_with_auto_bid(self):
+        auto_bids: List[Tuple[str, int]] = AutoBidResolver.compute_auto_bids(
+            highest_bidder_uuid='auto_1', current_highest_bid=300,
+            auto_bidders_ceilings=[('auto_1', 900), ('auto_2', 700)])
+        self.assertEqual(auto_bids, [('auto_2', 700), ('auto_1', 701)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
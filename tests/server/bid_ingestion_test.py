@@ -0,0 +1,79 @@
+__author__ = "Frank Kwizera"
+
+from src.server.bid_ingestion import BidIngestionPipeline
+from concurrent.futures import Future
+from flask import Flask
+from typing import Any, Dict, List, Tuple
+import threading
+import unittest
+import time
+
+
+class BidIngestionPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = Flask(__name__)
+        self.processed_bids: Dict[str, List[int]] = {}
+        self.items_in_progress: Dict[str, int] = {}
+        self.max_items_in_progress: int = 0
+        self.lock: threading.Lock = threading.Lock()
+        self.bid_ingestion_pipeline: BidIngestionPipeline = BidIngestionPipeline(
+            app=self.app, process_bid=self.process_bid, workers=4, max_tracked_tickets=100)
+
+    def process_bid(self, bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int) -> Tuple[Dict[str, Any], int]:
+        with self.lock:
+            self.items_in_progress[bid_item_uuid] = self.items_in_progress.get(bid_item_uuid, 0) + 1
+            self.assertEqual(self.items_in_progress[bid_item_uuid], 1)
+            self.max_items_in_progress = max(self.max_items_in_progress, sum(self.items_in_progress.values()))
+        time.sleep(0.001)
+        with self.lock:
+            self.processed_bids.setdefault(bid_item_uuid, []).append(bid_price_in_usd)
+            self.items_in_progress[bid_item_uuid] -= 1
+        return {'bid_price_in_usd': bid_price_in_usd}, 200
+
+    def test_item_bids_are_processed_in_order(self):
+        bid_futures: List[Future] = []
+        for bid_price_in_usd in range(300):
+            for bid_item_uuid in ['item_1', 'item_2', 'item_3']:
+                _, bid_future = self.bid_ingestion_pipeline.submit(
+                    bid_item_uuid=bid_item_uuid, bidder_uuid='bidder', bid_price_in_usd=bid_price_in_usd)
+                bid_futures.append(bid_future)
+
+        for bid_future in bid_futures:
+            self.assertEqual(bid_future.result(timeout=10)[1], 200)
+        for bid_item_uuid in ['item_1', 'item_2', 'item_3']:
+            self.assertEqual(self.processed_bids[bid_item_uuid], list(range(300)))
+        self.assertGreater(self.max_items_in_progress, 1)
+
+    def test_bid_futures_are_retrieved_by_ticket(self):
+        bid_ticket_uuid, bid_future = self.bid_ingestion_pipeline.submit(
+            bid_item_uuid='item_1', bidder_uuid='bidder', bid_price_in_usd=300)
+        self.assertIs(self.bid_ingestion_pipeline.retrieve_bid_future(bid_ticket_uuid), bid_future)
+        self.assertEqual(bid_future.result(timeout=10), ({'bid_price_in_usd': 300}, 200))
+        self.assertIsNone(self.bid_ingestion_pipeline.retrieve_bid_future('unknown ticket'))
+
+        for _ in range(100):
+            self.bid_ingestion_pipeline.submit(bid_item_uuid='item_1', bidder_uuid='bidder', bid_price_in_usd=300)
+        self.assertIsNone(self.bid_ingestion_pipeline.retrieve_bid_future(bid_ticket_uuid))
+
+    def test_processing_errors_are_set_on_the_bid_future(self):
+        def fail_bid(bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int):
+            raise ValueError('Invalid bid')
+
+        self.bid_ingestion_pipeline.process_bid = fail_bid
+        _, bid_future = self.bid_ingestion_pipeline.submit(
+            bid_item_uuid='item_1', bidder_uuid='bidder', bid_price_in_usd=300)
+        with self.assertRaises(ValueError):
+            bid_future.result(timeout=10)
+
+    def test_bids_submitted_after_shutdown_are_rejected(self):
+        self.bid_ingestion_pipeline.shutdown()
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self.bid_ingestion_pipeline.submit(bid_item_uuid='item_1', bidder_uuid='bidder', bid_price_in_usd=300)
+
+    def tearDown(self):
+        self.bid_ingestion_pipeline.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,9 +1,12 @@
 __author__ = "Frank Kwizera"
 
 from src.server.bid_management import BidManagementServer
+from src.server.bid_ingestion import BidIngestionPipeline
+from src.shared.constants import BidStatus
 from src.storage.database_provider import db_provider
 from src.storage.database_client import UserDatabaseClient, ItemDatabaseClient
-from src.storage.database_tables import User, Item
+from src.storage.database_client import BidDatabaseClient, AutoBidDatabaseClient
+from src.storage.database_tables import User, Item, Bid
 from src.shared.server_routes import BidManagementServerRoutes
 from flask.wrappers import Response
 from flask_sqlalchemy import SQLAlchemy
@@ -11,7 +14,7 @@ from flask.testing import FlaskClient
 from flask import Flask
 from src.get_app import get_app
 import unittest
-from typing import Dict
+from typing import Any, Dict, List, Tuple
 import uuid
 import datetime
 import json
@@ -31,6 +34,8 @@ class BidManagementServerTest(unittest.TestCase):
         cls.bid_management_server: BidManagementServer = BidManagementServer()
         cls.user_database_client: UserDatabaseClient = UserDatabaseClient()
         cls.item_database_client: ItemDatabaseClient = ItemDatabaseClient()
+        cls.bid_database_client: BidDatabaseClient = BidDatabaseClient()
+        cls.auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
 
         db.session.remove()
         db.drop_all()
@@ -91,6 +96,163 @@ class BidManagementServerTest(unittest.TestCase):
         self.assertEqual(register_auto_bid_json_response['bid_item_uuid'], item_record.item_uuid)
         self.assertEqual(register_auto_bid_json_response['bidder_uuid'], new_user.user_uuid)
 
+    def test_submit_a_bid_resolves_auto_bids(self):
+        seller: User = self.user_database_client.create_and_save_new_user(
+            user_names='Seller', user_email='seller@gmail.com', user_password='seller@1235')
+        buyer: User = self.user_database_client.create_and_save_new_user(
+            user_names='Buyer', user_email='buyer@gmail.com', user_password='buyer@1235')
+        auto_bidder_1: User = self.user_database_client.create_and_save_new_user(
+            user_names='Auto Bidder 1', user_email='auto1@gmail.com', user_password='auto@1235')
+        auto_bidder_2: User = self.user_database_client.create_and_save_new_user(
+            user_names='Auto Bidder 2', user_email='auto2@gmail.com', user_password='auto@1235')
+
+        item_record: Item = self.item_database_client.create_and_save_new_item(
+            item_name='Item 2', item_description='Item 2 description', item_base_price_in_usd=250,
+            item_owner_uuid=seller.user_uuid,
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+
+        self.auto_bid_database_client.register_user_auto_bid_config(
+            bidder_uuid=auto_bidder_1.user_uuid, max_bid_amount_in_usd=1200)
+        self.auto_bid_database_client.register_user_auto_bid_config(
+            bidder_uuid=auto_bidder_2.user_uuid, max_bid_amount_in_usd=5000)
+        self.auto_bid_database_client.register_auto_bid(
+            bid_item_uuid=item_record.item_uuid, bidder_uuid=auto_bidder_1.user_uuid)
+        self.auto_bid_database_client.register_auto_bid(
+            bid_item_uuid=item_record.item_uuid, bidder_uuid=auto_bidder_2.user_uuid)
+
+        bid_params: Dict[str, str] = {
+            'bid_price_in_usd': 300,
+            'bid_item_uuid': item_record.item_uuid,
+            'bidder_uuid': buyer.user_uuid
+        }
+        submit_bid_response: Response = self.client.post(BidManagementServerRoutes.CREATE_BID, json=bid_params)
+        self.assertEqual(submit_bid_response.status_code, 200)
+
+        submit_bid_json_response: Dict[str, str] = json.loads(submit_bid_response.data)
+        self.assertEqual(submit_bid_json_response['bidder_uuid'], buyer.user_uuid)
+        self.assertEqual(submit_bid_json_response['bid_price_in_usd'], 300)
+
+        item_bids: List[Bid] = self.bid_database_client.retrieve_item_bids(item_uuid=item_record.item_uuid)
+        self.assertEqual(3, len(item_bids))
+
+        most_recent_bid: Bid = self.bid_database_client.retrieve_item_most_recent_bid(item_uuid=item_record.item_uuid)
+        self.assertEqual(most_recent_bid.bidder_uuid, auto_bidder_2.user_uuid)
+        self.assertEqual(most_recent_bid.bid_price_in_usd, 1201)
+
+    def test_submit_a_bid_through_bid_ingestion_pipeline(self):
+        seller: User = self.user_database_client.create_and_save_new_user(
+            user_names='Queue Seller', user_email='queue_seller@gmail.com', user_password='seller@1235')
+        buyer: User = self.user_database_client.create_and_save_new_user(
+            user_names='Queue Buyer', user_email='queue_buyer@gmail.com', user_password='buyer@1235')
+        item_record: Item = self.item_database_client.create_and_save_new_item(
+            item_name='Item 3', item_description='Item 3 description', item_base_price_in_usd=250,
+            item_owner_uuid=seller.user_uuid,
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+
+        self.bid_management_server.bid_ingestion_pipeline = BidIngestionPipeline(
+            app=self.app, process_bid=self.bid_management_server.process_bid, workers=2)
+        try:
+            bid_params: Dict[str, str] = {
+                'bid_price_in_usd': 300,
+                'bid_item_uuid': item_record.item_uuid,
+                'bidder_uuid': buyer.user_uuid
+            }
+            submit_bid_response: Response = self.client.post(BidManagementServerRoutes.CREATE_BID, json=bid_params)
+            self.assertEqual(submit_bid_response.status_code, 200)
+            submit_bid_json_response: Dict[str, str] = json.loads(submit_bid_response.data)
+            self.assertEqual(submit_bid_json_response['status'], BidStatus.ACCEPTED)
+            self.assertEqual(submit_bid_json_response['result']['bid_price_in_usd'], 300)
+
+            submit_bid_response = self.client.post(
+                BidManagementServerRoutes.CREATE_BID + '?wait=false', json=bid_params)
+            self.assertIn(submit_bid_response.status_code, [202, 400])
+            bid_ticket_uuid: str = json.loads(submit_bid_response.data)['bid_ticket_uuid']
+            self.bid_management_server.bid_ingestion_pipeline.retrieve_bid_future(bid_ticket_uuid).result(timeout=10)
+
+            bid_status_response: Response = self.client.get(
+                BidManagementServerRoutes.RETRIEVE_BID_STATUS + f'/{bid_ticket_uuid}')
+            self.assertEqual(bid_status_response.status_code, 400)
+            bid_status_json_response: Dict[str, str] = json.loads(bid_status_response.data)
+            self.assertEqual(bid_status_json_response['status'], BidStatus.REJECTED)
+            self.assertEqual(bid_status_json_response['result']['message'], 'Bid price should be higher than 300')
+
+            bid_status_response = self.client.get(BidManagementServerRoutes.RETRIEVE_BID_STATUS + '/unknown')
+            self.assertEqual(bid_status_response.status_code, 404)
+        finally:
+            self.bid_management_server.bid_ingestion_pipeline.shutdown()
+            self.bid_management_server.bid_ingestion_pipeline = None
+
+    def test_failed_queued_bids_are_rejected(self):
+        def fail_bid(bid_item_uuid: str, bidder_uuid: str, bid_price_in_usd: int):
+            raise ValueError('Invalid bid')
+
+        self.bid_management_server.bid_ingestion_pipeline = BidIngestionPipeline(
+            app=self.app, process_bid=fail_bid, workers=1)
+        bid_params: Dict[str, str] = {
+            'bid_price_in_usd': 300, 'bid_item_uuid': str(uuid.uuid4()), 'bidder_uuid': str(uuid.uuid4())}
+        try:
+            submit_bid_response: Response = self.client.post(BidManagementServerRoutes.CREATE_BID, json=bid_params)
+            self.assertEqual(submit_bid_response.status_code, 500)
+            self.assertEqual(json.loads(submit_bid_response.data)['status'], BidStatus.REJECTED)
+
+            self.bid_management_server.bid_ingestion_pipeline.shutdown()
+            submit_bid_response = self.client.post(BidManagementServerRoutes.CREATE_BID, json=bid_params)
+            self.assertEqual(submit_bid_response.status_code, 503)
+        finally:
+            self.bid_management_server.bid_ingestion_pipeline.shutdown()
+            self.bid_management_server.bid_ingestion_pipeline = None
+
+    def test_submit_bids(self):
+        seller: User = self.user_database_client.create_and_save_new_user(
+            user_names='Batch Seller', user_email='batch_seller@gmail.com', user_password='seller@1235')
+        buyer: User = self.user_database_client.create_and_save_new_user(
+            user_names='Batch Buyer', user_email='batch_buyer@gmail.com', user_password='buyer@1235')
+        auto_bidder: User = self.user_database_client.create_and_save_new_user(
+            user_names='Batch Auto Bidder', user_email='batch_auto@gmail.com', user_password='auto@1235')
+        items: List[Item] = [
+            self.item_database_client.create_and_save_new_item(
+                item_name=f'Batch item {index}', item_description='Batch item description', item_base_price_in_usd=250,
+                item_owner_uuid=seller.user_uuid,
+                bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=close_in_minutes))
+            for index, close_in_minutes in enumerate([15, 15, -1])]
+        self.auto_bid_database_client.register_user_auto_bid_config(
+            bidder_uuid=auto_bidder.user_uuid, max_bid_amount_in_usd=500)
+        self.auto_bid_database_client.register_auto_bid(
+            bid_item_uuid=items[1].item_uuid, bidder_uuid=auto_bidder.user_uuid)
+
+        bids_params: List[Tuple[str, str, int]] = [
+            (items[0].item_uuid, buyer.user_uuid, 300),
+            (items[0].item_uuid, buyer.user_uuid, 300),
+            (items[1].item_uuid, buyer.user_uuid, 400),
+            (items[1].item_uuid, buyer.user_uuid, 450),
+            (items[0].item_uuid, buyer.user_uuid, 310),
+            (items[2].item_uuid, buyer.user_uuid, 300),
+            ('unknown item', buyer.user_uuid, 300),
+            (items[0].item_uuid, 'unknown user', 400)]
+        submit_bids_response: Response = self.client.post(BidManagementServerRoutes.CREATE_BIDS, json={'bids': [
+            {'bid_item_uuid': bid_item_uuid, 'bidder_uuid': bidder_uuid, 'bid_price_in_usd': bid_price_in_usd}
+            for bid_item_uuid, bidder_uuid, bid_price_in_usd in bids_params]})
+        self.assertEqual(submit_bids_response.status_code, 200)
+
+        bids_results: List[Dict[str, Any]] = json.loads(submit_bids_response.data)['results']
+        self.assertEqual(
+            [bid_result['status_code'] for bid_result in bids_results], [200, 400, 200, 200, 200, 400, 404, 404])
+        self.assertEqual(bids_results[0]['result']['bid_price_in_usd'], 300)
+        self.assertEqual(bids_results[1]['result']['message'], 'Bid price should be higher than 300')
+        self.assertEqual(bids_results[4]['status'], BidStatus.ACCEPTED)
+        self.assertEqual(bids_results[5]['result']['message'], 'Bid is closed now')
+
+        self.assertEqual([bid.bid_price_in_usd for bid in self.bid_database_client.retrieve_item_bids(
+            item_uuid=items[0].item_uuid)], [300, 310])
+        self.assertEqual([bid.bid_price_in_usd for bid in self.bid_database_client.retrieve_item_bids(
+            item_uuid=items[1].item_uuid)], [400, 401, 450, 451])
+
+        # The item current bid is the auto bidder last bid.
+        submit_bids_response = self.client.post(BidManagementServerRoutes.CREATE_BIDS, json={'bids': [
+            {'bid_item_uuid': items[1].item_uuid, 'bidder_uuid': buyer.user_uuid, 'bid_price_in_usd': 451}]})
+        self.assertEqual(json.loads(submit_bids_response.data)['results'][0]['result']['message'],
+                         'Bid price should be higher than 451')
+
     @classmethod
     def teardown_class(cls):
         with cls.app.app_context():
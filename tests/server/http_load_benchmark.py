@@ -0,0 +1,327 @@
+"""
+Drives the auction server over HTTP with concurrent clients against a seeded synthetic dataset and
+reports p50/p95/p99 latency and requests per second of the bid, item and login endpoints, and of bids
+triggering auto bid cascades of increasing depth. Results are written to a JSON file; when a baseline
+file is given, scenarios whose p95 latency or throughput regressed beyond the tolerance are reported
+and the run exits with a non zero status.
+The dataset is written to a temporary SQLite file unless ``--database`` is given, the configured
+database is left untouched.
+Usage:
+    python -m tests.server.http_load_benchmark --output baseline.json
+    python -m tests.server.http_load_benchmark --baseline baseline.json --output latest.json
+"""
+
+__author__ = "Frank Kwizera"
+
+from src.server.server_runner import AuctionServerRunner
+from src.shared.create_synthetic_data import SyntheticDataCreator
+from src.shared.server_routes import BidManagementServerRoutes, ItemManagementServerRoutes
+from src.shared.server_routes import UserManagementServerRoutes
+from src.storage.database_client import DatabaseClient
+from src.storage.database_tables import User, Item, UserAutoBid, AutoBid
+from src.storage.database_provider import db_provider
+from src.shared.constants import Directories
+from werkzeug.serving import BaseWSGIServer, make_server
+from flask_sqlalchemy import SQLAlchemy
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import http.client
+import threading
+import itertools
+import argparse
+import datetime
+import logging
+import random
+import tempfile
+import json
+import time
+import sys
+import os
+import uuid
+
+db: SQLAlchemy = db_provider.db
+
+AUTO_BID_CASCADE_DEPTHS: Tuple[int] = (1, 10, 100)
+# Requests to send: (method, path, json body).
+BenchmarkRequest = Tuple[str, str, Optional[Dict[str, Any]]]
+RequestFactory = Callable[[random.Random], BenchmarkRequest]
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    Returns:
+        - Nearest rank percentile of already sorted values.
+    """
+    rank: int = max(1, int(round(percent / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def skewed_choice(random_generator: random.Random, values: List[Any]) -> Any:
+    """
+    Picks mostly from the head of ``values``, the same way traffic concentrates on hot items.
+    """
+    return values[min(len(values) - 1, int(random_generator.paretovariate(1.2)) - 1)]
+
+
+class HttpLoadBenchmark:
+    def __init__(self, users: int, items: int, seed: int, clients: int, requests_per_scenario: int,
+                 database_path: str):
+        """
+        Inputs:
+            - users: Number of synthetic users.
+            - items: Number of synthetic items.
+            - seed: Dataset and traffic seed.
+            - clients: Number of concurrent clients.
+            - requests_per_scenario: Number of requests sent per scenario.
+            - database_path: SQLite file the dataset is written to, its tables are dropped first.
+        """
+        self.seed: int = seed
+        self.users: int = users
+        self.clients: int = clients
+        self.requests_per_scenario: int = requests_per_scenario
+        self.synthetic_data_creator: SyntheticDataCreator = SyntheticDataCreator(
+            users=users, items=items, seed=seed, processes=os.cpu_count(), database_uri=f'sqlite:///{database_path}')
+        self.database_client: DatabaseClient = DatabaseClient()
+        # Every bid is higher than the previous one, so that bids are accepted and trigger auto bids.
+        self.bid_prices: itertools.count = itertools.count(start=10 ** 7, step=1000)
+        self.bid_prices_lock: threading.Lock = threading.Lock()
+
+    def next_bid_price(self) -> int:
+        with self.bid_prices_lock:
+            return next(self.bid_prices)
+
+    def seed_auto_bid_cascades(self, depth: int) -> List[str]:
+        """
+        Creates one open item per request, each with the same ``depth`` auto bidders. Competing auto bidders
+        raise the price up to their ceiling, so every bid of the scenario targets a fresh item.
+        Returns:
+            - Items uuids.
+        """
+        items_uuids: List[str] = [str(uuid.uuid4()) for _ in range(self.requests_per_scenario)]
+        auto_bidders_uuids: List[str] = [str(uuid.uuid4()) for _ in range(depth)]
+        with self.database_client.unit_of_work():
+            self.database_client.bulk_insert(model=User, rows=[{
+                'user_uuid': auto_bidder_uuid,
+                'user_names': f'Cascade Auto Bidder {depth}',
+                'user_email': f'{auto_bidder_uuid}@cascade.auction',
+                'user_password_hash': ''
+            } for auto_bidder_uuid in auto_bidders_uuids])
+            self.database_client.bulk_insert(model=UserAutoBid, rows=[{
+                'user_auto_bid_uuid': str(uuid.uuid4()),
+                'bidder_uuid': auto_bidder_uuid,
+                'max_bid_amount_in_usd': 10 ** 15
+            } for auto_bidder_uuid in auto_bidders_uuids])
+            self.database_client.bulk_insert(model=Item, rows=[{
+                'item_uuid': item_uuid,
+                'item_name': f'Auto bid cascade {depth} item',
+                'item_description': f'Auto bid cascade {depth} item',
+                'item_base_price_in_usd': 1,
+                'item_owner_uuid': SyntheticDataCreator.user_uuid(seed=self.seed, user_index=0),
+                'bid_expiration_timestamp': datetime.datetime.utcnow() + datetime.timedelta(days=1),
+                'bid_count': 0
+            } for item_uuid in items_uuids])
+            self.database_client.bulk_insert(model=AutoBid, rows=[{
+                'auto_bid_uuid': str(uuid.uuid4()),
+                'bid_item_uuid': item_uuid,
+                'bidder_uuid': auto_bidder_uuid
+            } for item_uuid in items_uuids for auto_bidder_uuid in auto_bidders_uuids])
+        return items_uuids
+
+    def create_scenarios(self) -> Dict[str, RequestFactory]:
+        """
+        Returns:
+            - Request factories by scenario name.
+        """
+        open_items_uuids: List[str] = [item_uuid for item_uuid, in db.session.query(Item.item_uuid).filter(
+            Item.auction_closed_timestamp.is_(None)).order_by(Item.bid_count.desc())]
+        items_uuids: List[str] = [item_uuid for item_uuid, in db.session.query(Item.item_uuid).order_by(
+            Item.bid_count.desc())]
+
+        def bidder_uuid(random_generator: random.Random) -> str:
+            return SyntheticDataCreator.user_uuid(
+                seed=self.seed, user_index=random_generator.randrange(self.users))
+
+        def create_bid(items_uuids: List[str]) -> RequestFactory:
+            return lambda random_generator: ('POST', BidManagementServerRoutes.CREATE_BID, {
+                'bid_item_uuid': skewed_choice(random_generator, items_uuids),
+                'bidder_uuid': bidder_uuid(random_generator),
+                'bid_price_in_usd': self.next_bid_price()
+            })
+
+        def bid_on_each_item(items_uuids: List[str]) -> RequestFactory:
+            items_uuids_iterator: Iterator[str] = iter(items_uuids)
+            items_uuids_lock: threading.Lock = threading.Lock()
+
+            def create_request(random_generator: random.Random) -> BenchmarkRequest:
+                with items_uuids_lock:
+                    bid_item_uuid: str = next(items_uuids_iterator)
+                return 'POST', BidManagementServerRoutes.CREATE_BID, {
+                    'bid_item_uuid': bid_item_uuid,
+                    'bidder_uuid': bidder_uuid(random_generator),
+                    'bid_price_in_usd': self.next_bid_price()
+                }
+            return create_request
+
+        scenarios: Dict[str, RequestFactory] = {
+            'create_bid': create_bid(open_items_uuids),
+            'retrieve_all_items': lambda random_generator: (
+                'GET', ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, None),
+            'retrieve_item_details': lambda random_generator: (
+                'GET', ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + skewed_choice(random_generator, items_uuids),
+                None),
+            'user_login': lambda random_generator: ('POST', UserManagementServerRoutes.USER_LOGIN, {
+                'user_email': SyntheticDataCreator.user_email(user_index=random_generator.randrange(self.users)),
+                'user_password': SyntheticDataCreator.USER_PASSWORD
+            })
+        }
+        for depth in AUTO_BID_CASCADE_DEPTHS:
+            scenarios[f'auto_bid_cascade_{depth}'] = bid_on_each_item(self.seed_auto_bid_cascades(depth=depth))
+        return scenarios
+
+    def run_scenario(self, port: int, create_request: RequestFactory, scenario_index: int) -> Dict[str, Any]:
+        """
+        Sends ``requests_per_scenario`` requests from ``clients`` threads.
+        Returns:
+            - Scenario latency percentiles in milliseconds, throughput and responses count by status.
+        """
+        latencies_in_ms: List[float] = []
+        statuses: Dict[str, int] = {}
+        results_lock: threading.Lock = threading.Lock()
+        requests_counter: itertools.count = itertools.count()
+        start_barrier: threading.Barrier = threading.Barrier(self.clients)
+
+        def send_requests(client_index: int):
+            random_generator: random.Random = random.Random(f'{self.seed}:{scenario_index}:{client_index}')
+            start_barrier.wait()
+            while next(requests_counter) < self.requests_per_scenario:
+                method, path, body = create_request(random_generator)
+                connection: http.client.HTTPConnection = http.client.HTTPConnection('127.0.0.1', port)
+                started_at: float = time.perf_counter()
+                try:
+                    connection.request(
+                        method, path, body=json.dumps(body) if body is not None else None,
+                        headers={'Content-Type': 'application/json'})
+                    response: http.client.HTTPResponse = connection.getresponse()
+                    response.read()
+                    response_status: str = str(response.status)
+                except (OSError, http.client.HTTPException):
+                    response_status = 'connection_error'
+                finally:
+                    connection.close()
+                latency_in_ms: float = (time.perf_counter() - started_at) * 1000
+                with results_lock:
+                    latencies_in_ms.append(latency_in_ms)
+                    statuses[response_status] = statuses.get(response_status, 0) + 1
+
+        clients_threads: List[threading.Thread] = [
+            threading.Thread(target=send_requests, args=(client_index,)) for client_index in range(self.clients)]
+        started_at: float = time.perf_counter()
+        for client_thread in clients_threads:
+            client_thread.start()
+        for client_thread in clients_threads:
+            client_thread.join()
+        elapsed_in_seconds: float = time.perf_counter() - started_at
+
+        latencies_in_ms.sort()
+        return {
+            'requests': len(latencies_in_ms),
+            'requests_per_second': len(latencies_in_ms) / elapsed_in_seconds,
+            'p50_in_ms': percentile(latencies_in_ms, 50),
+            'p95_in_ms': percentile(latencies_in_ms, 95),
+            'p99_in_ms': percentile(latencies_in_ms, 99),
+            'statuses': statuses
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Seeds the dataset, serves the app on a threaded server and runs every scenario.
+        Returns:
+            - Benchmark configuration and results by scenario.
+        """
+        dataset_summary: Dict[str, Any] = self.synthetic_data_creator.create_synthetic_data()
+        auction_server_runner: AuctionServerRunner = AuctionServerRunner()
+        auction_server_runner.attach_micro_servers()
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server: BaseWSGIServer = make_server('127.0.0.1', 0, auction_server_runner.app, threaded=True)
+        server_thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            for scenario_index, (scenario_name, create_request) in enumerate(self.create_scenarios().items()):
+                results[scenario_name] = self.run_scenario(
+                    port=server.server_port, create_request=create_request, scenario_index=scenario_index)
+                print(f"{scenario_name:>24} | {results[scenario_name]['requests_per_second']:>8.0f} req/s | "
+                      f"p50 {results[scenario_name]['p50_in_ms']:>7.1f} ms | "
+                      f"p95 {results[scenario_name]['p95_in_ms']:>7.1f} ms | "
+                      f"p99 {results[scenario_name]['p99_in_ms']:>7.1f} ms | {results[scenario_name]['statuses']}")
+        finally:
+            server.shutdown()
+            db.session.remove()
+
+        return {
+            'dataset': dataset_summary['rows_counts'],
+            'seed': self.seed,
+            'clients': self.clients,
+            'requests_per_scenario': self.requests_per_scenario,
+            'scenarios': results
+        }
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compares results to a baseline.
+    Inputs:
+        - results: Benchmark results.
+        - baseline: Results of a previous run.
+        - tolerance: Allowed relative degradation, e.g. 0.2 for 20%.
+    Returns:
+        - Description of every regression.
+    """
+    regressions: List[str] = []
+    for scenario_name, baseline_result in baseline['scenarios'].items():
+        result: Dict[str, Any] = results['scenarios'].get(scenario_name)
+        if result is None:
+            continue
+        if result['p95_in_ms'] > baseline_result['p95_in_ms'] * (1 + tolerance):
+            regressions.append(
+                f"{scenario_name}: p95 {result['p95_in_ms']:.1f} ms, baseline {baseline_result['p95_in_ms']:.1f} ms")
+        if result['requests_per_second'] < baseline_result['requests_per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{scenario_name}: {result['requests_per_second']:.0f} req/s, "
+                f"baseline {baseline_result['requests_per_second']:.0f} req/s")
+    return regressions
+
+
+if __name__ == '__main__':
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="HTTP load benchmark of the auction server.")
+    argument_parser.add_argument("--users", type=int, default=10000)
+    argument_parser.add_argument("--items", type=int, default=50000)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--clients", type=int, default=8)
+    argument_parser.add_argument("--requests", type=int, default=500, help="Requests per scenario.")
+    argument_parser.add_argument(
+        "--output", default=os.path.join(Directories.local_path(), 'http_load_benchmark.json'))
+    argument_parser.add_argument("--baseline", default=None, help="Results file of a previous run to compare to.")
+    argument_parser.add_argument("--tolerance", type=float, default=0.2)
+    argument_parser.add_argument(
+        "--database", default=None, help="SQLite file to write the dataset to, a temporary file by default.")
+    arguments: argparse.Namespace = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as database_directory:
+        benchmark_results: Dict[str, Any] = HttpLoadBenchmark(
+            users=arguments.users, items=arguments.items, seed=arguments.seed, clients=arguments.clients,
+            requests_per_scenario=arguments.requests,
+            database_path=os.path.abspath(arguments.database or os.path.join(database_directory, 'dataset.sqlite'))
+        ).run()
+    with open(arguments.output, 'w') as output_file:
+        json.dump(benchmark_results, output_file, indent=2)
+    print(f'Results saved to {arguments.output}')
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            benchmark_regressions: List[str] = find_regressions(
+                results=benchmark_results, baseline=json.load(baseline_file), tolerance=arguments.tolerance)
+        for benchmark_regression in benchmark_regressions:
+            print(f'Regression: {benchmark_regression}')
+        sys.exit(1 if benchmark_regressions else 0)
@@ -0,0 +1,196 @@
+__author__ = "Frank Kwizera"
+
+from src.server.item_events_hub import ItemEventsHub, ItemSubscription, item_events_hub
+from src.server.item_management_server import ItemManagementServer
+from src.server.bid_management import BidManagementServer
+from src.storage.database_client import UserDatabaseClient, ItemDatabaseClient
+from src.storage.database_client import BidDatabaseClient, AutoBidDatabaseClient
+from src.storage.database_tables import User, Item
+from src.storage.database_provider import db_provider
+from src.shared.server_routes import ItemManagementServerRoutes
+from src.shared.constants import GeneralConstants
+from flask.wrappers import Response
+from flask_sqlalchemy import SQLAlchemy
+from flask.testing import FlaskClient
+from flask import Flask
+from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
+from typing import Any, Dict, Iterator, List, Tuple
+import unittest
+import datetime
+import json
+import uuid
+
+
+db: SQLAlchemy = db_provider.db
+
+
+class ItemEventsHubTest(unittest.TestCase):
+    def setUp(self):
+        self.events_hub: ItemEventsHub = ItemEventsHub(max_subscribers=3, max_buffered_events=2)
+
+    def test_events_are_fanned_out_to_item_subscriptions(self):
+        first_subscription: ItemSubscription = self.events_hub.subscribe(item_uuid='item_1')
+        second_subscription: ItemSubscription = self.events_hub.subscribe(item_uuid='item_1')
+        other_item_subscription: ItemSubscription = self.events_hub.subscribe(item_uuid='item_2')
+        self.assertIsNone(self.events_hub.subscribe(item_uuid='item_3'))
+
+        self.assertEqual(self.events_hub.publish(
+            item_uuid='item_1', event_name='bid', data={'bid_price_in_usd': 300}, event_id='bid_1',
+            item_version=(1, 2)), 2)
+        expected_event: str = 'id: bid_1\nevent: bid\ndata: {"bid_price_in_usd": 300}\n\n'
+        self.assertEqual(first_subscription.retrieve_events(timeout=0), [(expected_event, (1, 2))])
+        self.assertEqual(second_subscription.retrieve_events(timeout=0), [(expected_event, (1, 2))])
+        self.assertEqual(other_item_subscription.retrieve_events(timeout=0), [])
+
+        self.events_hub.unsubscribe(subscription=first_subscription)
+        self.events_hub.unsubscribe(subscription=first_subscription)
+        self.assertFalse(self.events_hub.check_if_item_has_subscribers(item_uuid='item_3'))
+        self.assertIsNotNone(self.events_hub.subscribe(item_uuid='item_3'))
+        self.assertEqual(self.events_hub.publish(item_uuid='item_1', event_name='bid', data={}), 1)
+
+    def test_slow_subscriptions_are_dropped(self):
+        slow_subscription: ItemSubscription = self.events_hub.subscribe(item_uuid='item_1')
+        fast_subscription: ItemSubscription = self.events_hub.subscribe(item_uuid='item_1')
+        for bid_price_in_usd in range(3):
+            self.events_hub.publish(item_uuid='item_1', event_name='bid', data={'bid_price_in_usd': bid_price_in_usd})
+            self.assertEqual(len(fast_subscription.retrieve_events(timeout=0)), 1)
+
+        self.assertTrue(slow_subscription.dropped)
+        self.assertFalse(fast_subscription.dropped)
+        self.assertEqual(slow_subscription.retrieve_events(timeout=1), [])
+        self.assertEqual(self.events_hub.retrieve_stats(), {
+            'subscriptions': 1, 'published_events': 3, 'dropped_subscriptions': 1})
+
+
+class StreamedBidManagementServer(BidManagementServer):
+    """
+    Bid management server placing bids without mapping its endpoints, already mapped by other tests.
+    """
+
+    def map_endpoints(self, app: Flask):
+        pass
+
+
+class ItemStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        self.client: FlaskClient = self.app.test_client()
+        if 'retrieve_all_items' not in self.app.view_functions:
+            ItemManagementServer()
+        self.bid_management_server: BidManagementServer = StreamedBidManagementServer()
+
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        item_events_hub.clear()
+
+        user_database_client: UserDatabaseClient = UserDatabaseClient()
+        self.buyer: User = user_database_client.create_and_save_new_user(
+            user_names='Buyer', user_email='buyer@gmail.com', user_password='buyer@1235')
+        self.auto_bidder: User = user_database_client.create_and_save_new_user(
+            user_names='Auto Bidder', user_email='auto@gmail.com', user_password='auto@1235')
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient()
+        self.item: Item = self.item_database_client.create_and_save_new_item(
+            item_name='Antique clock', item_description='Clock', item_base_price_in_usd=250,
+            item_owner_uuid=self.buyer.user_uuid,
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+        self.item_stream_url: str = ItemManagementServerRoutes.STREAM_ITEM + self.item.item_uuid
+
+    @staticmethod
+    def parse_events(chunk: bytes) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Returns:
+            - (event name, event data) pairs of the events of a stream chunk, comments are skipped.
+        """
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        for event in chunk.decode().split('\n\n'):
+            event_fields: Dict[str, str] = dict(
+                line.split(': ', 1) for line in event.split('\n') if line and not line.startswith(':'))
+            if 'event' in event_fields:
+                events.append((event_fields['event'], json.loads(event_fields['data'])))
+        return events
+
+    def test_accepted_bids_are_streamed(self):
+        auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
+        auto_bid_database_client.register_user_auto_bid_config(
+            bidder_uuid=self.auto_bidder.user_uuid, max_bid_amount_in_usd=1000)
+        auto_bid_database_client.register_auto_bid(
+            bid_item_uuid=self.item.item_uuid, bidder_uuid=self.auto_bidder.user_uuid)
+
+        stream_response: Response = self.client.get(self.item_stream_url, buffered=False)
+        self.assertEqual(stream_response.status_code, 200)
+        self.assertEqual(stream_response.mimetype, 'text/event-stream')
+        stream_chunks: Iterator[bytes] = iter(stream_response.response)
+        self.assertTrue(next(stream_chunks).startswith(b'retry: '))
+        (event_name, event_data), = self.parse_events(next(stream_chunks))
+        self.assertEqual((event_name, event_data['item_uuid']), ('item', self.item.item_uuid))
+        self.assertEqual(item_events_hub.subscriptions_count, 1)
+
+        with StatementsCapture() as statements_capture:
+            _, bid_status = self.bid_management_server.process_bid(
+                bid_item_uuid=self.item.item_uuid, bidder_uuid=self.buyer.user_uuid, bid_price_in_usd=300)
+        self.assertEqual(bid_status, 200)
+        # Only the response reloads its bid, published bids are serialized before the commit.
+        self.assertEqual(len([statement for statement in statements_capture.statements if statement.startswith('SELECT bid.')]), 1)
+        bids_events: List[Tuple[str, Dict[str, Any]]] = self.parse_events(next(stream_chunks))
+        self.assertEqual([
+            (event_name, event_data['bidder_uuid'], event_data['bid_price_in_usd'])
+            for event_name, event_data in bids_events
+        ], [('bid', self.buyer.user_uuid, 300), ('bid', self.auto_bidder.user_uuid, 301)])
+
+        stream_response.close()
+        self.assertEqual(item_events_hub.subscriptions_count, 0)
+
+    def test_bids_of_other_processes_are_streamed_as_item_snapshots(self):
+        heartbeat_interval_in_seconds: float = GeneralConstants.ITEM_EVENTS_HEARTBEAT_INTERVAL_IN_SECONDS
+        GeneralConstants.ITEM_EVENTS_HEARTBEAT_INTERVAL_IN_SECONDS = 0.01
+        try:
+            stream_response: Response = self.client.get(self.item_stream_url, buffered=False)
+            stream_chunks: Iterator[bytes] = iter(stream_response.response)
+            next(stream_chunks), next(stream_chunks)
+            self.assertEqual(next(stream_chunks), b': heartbeat\n\n')
+
+            # Written without publishing any event, as by another worker process.
+            BidDatabaseClient().create_item_bids_if_higher(
+                bid_item_uuid=self.item.item_uuid, bids=[(self.buyer.user_uuid, 300)])
+            (event_name, event_data), = self.parse_events(next(stream_chunks))
+            self.assertEqual(event_name, 'item')
+            self.assertEqual(event_data['current_bid_price_in_usd'], 300)
+            stream_response.close()
+        finally:
+            GeneralConstants.ITEM_EVENTS_HEARTBEAT_INTERVAL_IN_SECONDS = heartbeat_interval_in_seconds
+
+    def test_bids_of_other_processes_are_not_hidden_by_published_bids(self):
+        stream_response: Response = self.client.get(self.item_stream_url, buffered=False)
+        stream_chunks: Iterator[bytes] = iter(stream_response.response)
+        next(stream_chunks), next(stream_chunks)
+
+        # Written without publishing any event, as by another worker process, then outbid in this process.
+        BidDatabaseClient().create_item_bids_if_higher(
+            bid_item_uuid=self.item.item_uuid, bids=[(self.auto_bidder.user_uuid, 300)])
+        self.bid_management_server.process_bid(
+            bid_item_uuid=self.item.item_uuid, bidder_uuid=self.buyer.user_uuid, bid_price_in_usd=310)
+        (event_name, event_data), = self.parse_events(next(stream_chunks))
+        self.assertEqual((event_name, event_data['bid_price_in_usd']), ('bid', 310))
+        (event_name, event_data), = self.parse_events(next(stream_chunks))
+        self.assertEqual((event_name, event_data['current_bid_price_in_usd']), ('item', 310))
+        stream_response.close()
+
+    def test_closed_and_missing_items_are_not_streamed(self):
+        self.assertEqual(self.client.get(ItemManagementServerRoutes.STREAM_ITEM + str(uuid.uuid4())).status_code, 404)
+
+        self.item_database_client.finalize_auctions(
+            items_uuids=[self.item.item_uuid],
+            closed_timestamp=datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+        self.assertEqual(self.client.get(self.item_stream_url).status_code, 204)
+        self.assertEqual(item_events_hub.subscriptions_count, 0)
+
+    def tearDown(self):
+        item_events_hub.clear()
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
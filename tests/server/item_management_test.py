@@ -1,7 +1,7 @@
 __author__ = "Frank Kwizera"
 
 from src.server.item_management_server import ItemManagementServer
-from src.storage.database_client import ItemDatabaseClient
+from src.storage.database_client import ItemDatabaseClient, BidDatabaseClient
 from src.storage.database_tables import Item
 from src.storage.database_provider import db_provider
 from src.shared.server_routes import ItemManagementServerRoutes
@@ -10,8 +10,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask.testing import FlaskClient
 from flask import Flask
 from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
 import unittest
-from typing import Dict
+from typing import Dict, List, Union
 import uuid
 import datetime
 import json
@@ -27,7 +28,8 @@ class ItemManagementServerTest(unittest.TestCase):
         cls.client: FlaskClient = cls.app.test_client()
         cls.app.app_context().push()
 
-        cls.itemserver = ItemManagementServer()
+        if 'retrieve_all_items' not in cls.app.view_functions:
+            ItemManagementServer()
 
         db.session.remove()
         db.drop_all()
@@ -49,7 +51,41 @@ class ItemManagementServerTest(unittest.TestCase):
         self.assertEqual(all_items.status_code, 200)
 
         all_items_json_response: Dict[str, str] = json.loads(all_items.data)
-        self.assertEqual(1, len(all_items_json_response))
+        self.assertEqual(1, len(all_items_json_response['items']))
+        self.assertIsNone(all_items_json_response['next_cursor'])
+
+    def test_retrieve_all_items_pages(self):
+        more_items: List[Item] = []
+        for index in range(4):
+            item_details: Dict[str, Union[str, int]] = dict(self.item_details, item_base_price_in_usd=300 + index)
+            more_items.append(self.item_database_client.create_and_save_new_item(**item_details))
+
+        retrieved_items_uuids: List[str] = []
+        cursor: str = None
+        while True:
+            query_string: Dict[str, str] = {'limit': 2, 'min_price_in_usd': 300}
+            if cursor:
+                query_string['cursor'] = cursor
+            items_page: Response = self.client.get(
+                ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, query_string=query_string)
+            self.assertEqual(items_page.status_code, 200)
+
+            items_page_json_response: Dict[str, str] = json.loads(items_page.data)
+            self.assertLessEqual(len(items_page_json_response['items']), 2)
+            retrieved_items_uuids.extend(item['item_uuid'] for item in items_page_json_response['items'])
+            cursor = items_page_json_response['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(retrieved_items_uuids, [item.item_uuid for item in more_items])
+
+        closed_items: Response = self.client.get(
+            ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, query_string={'status': 'closed'})
+        self.assertEqual(json.loads(closed_items.data)['items'], [])
+
+        invalid_limit: Response = self.client.get(
+            ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, query_string={'limit': 'all'})
+        self.assertEqual(invalid_limit.status_code, 400)
 
     def test_retrieve_item_details(self):
         item_details_response: Response = \
@@ -62,6 +98,69 @@ class ItemManagementServerTest(unittest.TestCase):
         self.assertEqual(item_details_json_response['item_owner_uuid'], self.item_record.item_owner_uuid)
         self.assertEqual(item_details_json_response['item_base_price_in_usd'], self.item_record.item_base_price_in_usd)
     
+    def test_retrieve_item_details_bids_limit(self):
+        bid_database_client: BidDatabaseClient = BidDatabaseClient()
+        item_record: Item = self.item_database_client.create_and_save_new_item(**self.item_details)
+        for bid_price_in_usd in (300, 310, 320):
+            bid_database_client.create_item_bid(
+                bid_price_in_usd=bid_price_in_usd, bid_item_uuid=item_record.item_uuid, bidder_uuid=str(uuid.uuid4()))
+        item_details_url: str = ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + f'{item_record.item_uuid}'
+
+        with StatementsCapture() as statements_capture:
+            item_details_response: Response = self.client.get(item_details_url)
+        self.assertEqual(len(statements_capture.statements), 2)
+        item_details_json_response: Dict[str, str] = json.loads(item_details_response.data)
+        self.assertEqual([bid['bid_price_in_usd'] for bid in item_details_json_response['item_bids']], [300, 310, 320])
+
+        item_details_response: Response = self.client.get(item_details_url, query_string={'bids_limit': 2})
+        item_details_json_response: Dict[str, str] = json.loads(item_details_response.data)
+        self.assertEqual([bid['bid_price_in_usd'] for bid in item_details_json_response['item_bids']], [310, 320])
+        self.assertEqual(item_details_json_response['item_auto_bidders'], [])
+
+        item_details_response: Response = self.client.get(item_details_url, query_string={'bids_limit': 0})
+        self.assertEqual(json.loads(item_details_response.data)['item_bids'], [])
+
+        item_details_response: Response = self.client.get(item_details_url, query_string={'bids_limit': -1})
+        self.assertEqual(item_details_response.status_code, 400)
+        self.assertIn('non-negative integer', item_details_response.get_data(as_text=True))
+
+    def test_retrieve_all_items_stream(self):
+        all_items: Response = self.client.get(
+            ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, query_string={'stream': 'json'})
+        self.assertEqual(all_items.status_code, 200)
+        self.assertTrue(all_items.is_streamed)
+
+        all_items_json_response: List[Dict[str, str]] = json.loads(all_items.data)
+        self.assertIn(self.item_record.item_uuid, [item['item_uuid'] for item in all_items_json_response])
+
+        all_items: Response = self.client.get(
+            ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, query_string={'stream': 'ndjson'})
+        self.assertEqual(all_items.mimetype, 'application/x-ndjson')
+        all_items_lines: List[Dict[str, str]] = [json.loads(line) for line in all_items.data.splitlines()]
+        self.assertEqual(all_items_lines, all_items_json_response)
+
+    def test_retrieve_item_details_stream(self):
+        bid_database_client: BidDatabaseClient = BidDatabaseClient()
+        for bid_price_in_usd in (300, 310):
+            bid_database_client.create_item_bid(
+                bid_price_in_usd=bid_price_in_usd, bid_item_uuid=self.item_record.item_uuid,
+                bidder_uuid=str(uuid.uuid4()))
+        item_details_url: str = ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + f'{self.item_record.item_uuid}'
+
+        item_details_response: Response = self.client.get(item_details_url)
+        streamed_item_details_response: Response = self.client.get(item_details_url, query_string={'stream': 'json'})
+        self.assertTrue(streamed_item_details_response.is_streamed)
+        self.assertEqual(json.loads(streamed_item_details_response.data), json.loads(item_details_response.data))
+
+        ndjson_item_details_response: Response = self.client.get(item_details_url, query_string={'stream': 'ndjson'})
+        item_details_lines: List[Dict[str, str]] = [
+            json.loads(line) for line in ndjson_item_details_response.data.splitlines()]
+        self.assertEqual(item_details_lines[0]['item']['item_uuid'], self.item_record.item_uuid)
+        self.assertEqual([line['item_bid']['bid_price_in_usd'] for line in item_details_lines[1:]], [300, 310])
+
+        invalid_stream_response: Response = self.client.get(item_details_url, query_string={'stream': 'xml'})
+        self.assertEqual(invalid_stream_response.status_code, 400)
+
     @classmethod
     def teardown_class(cls):
         with cls.app.app_context():
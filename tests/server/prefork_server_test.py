@@ -0,0 +1,87 @@
+__author__ = "Frank Kwizera"
+
+from src.server.prefork_server import PreforkServer
+from flask import Flask, Response, jsonify
+from typing import Dict, Iterator, Set
+import multiprocessing
+import urllib.request
+import unittest
+import json
+import time
+import os
+
+
+class PreforkServerTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = Flask(__name__)
+        self.app.add_url_rule('/pid', endpoint='pid', view_func=lambda: jsonify({'pid': os.getpid()}))
+
+        self.forked_workers: multiprocessing.Value = multiprocessing.get_context('fork').Value('i', 0)
+        self.prefork_server: PreforkServer = PreforkServer(
+            app=self.app, host='127.0.0.1', port=0, workers=2, threads=2, after_fork=self.count_forked_worker)
+        self.server_process: multiprocessing.Process = multiprocessing.get_context('fork').Process(
+            target=self.prefork_server.serve_forever)
+        self.server_process.start()
+        self.prefork_server.listen_socket.close()
+
+    def count_forked_worker(self, worker_index: int):
+        with self.forked_workers.get_lock():
+            self.forked_workers.value += 1
+
+    def test_workers_serve_requests(self):
+        workers_pids: Set[int] = set()
+        for _ in range(10):
+            with urllib.request.urlopen(f'http://127.0.0.1:{self.prefork_server.port}/pid', timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                response_json: Dict[str, int] = json.loads(response.read())
+            workers_pids.add(response_json['pid'])
+
+        deadline: float = time.time() + 10
+        while self.forked_workers.value < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.forked_workers.value, 2)
+        self.assertNotIn(os.getpid(), workers_pids)
+        self.assertNotIn(self.server_process.pid, workers_pids)
+
+    def tearDown(self):
+        self.server_process.terminate()
+        self.server_process.join(timeout=10)
+        self.assertEqual(self.server_process.exitcode, 0)
+
+
+class PreforkServerStreamRoutesTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = Flask(__name__)
+        self.app.add_url_rule('/pid', endpoint='pid', view_func=lambda: jsonify({'pid': os.getpid()}))
+        self.app.add_url_rule('/stream/wait', endpoint='wait', view_func=self.wait)
+
+        self.prefork_server: PreforkServer = PreforkServer(
+            app=self.app, host='127.0.0.1', port=0, workers=1, threads=1, stream_routes=('/stream/', ))
+        self.server_process: multiprocessing.Process = multiprocessing.get_context('fork').Process(
+            target=self.prefork_server.serve_forever)
+        self.server_process.start()
+        self.prefork_server.listen_socket.close()
+
+    @staticmethod
+    def wait() -> Response:
+        def iterate_lines() -> Iterator[str]:
+            yield 'started\n'
+            time.sleep(60)
+        return Response(iterate_lines(), mimetype='text/plain')
+
+    def test_streams_do_not_hold_pool_threads(self):
+        base_url: str = f'http://127.0.0.1:{self.prefork_server.port}'
+        with urllib.request.urlopen(f'{base_url}/stream/wait', timeout=5) as stream_response:
+            self.assertEqual(stream_response.readline(), b'started\n')
+            # The single pool thread is free while the stream is open.
+            with urllib.request.urlopen(f'{base_url}/pid', timeout=5) as response:
+                self.assertEqual(response.status, 200)
+
+    def tearDown(self):
+        self.server_process.terminate()
+        self.server_process.join(timeout=10)
+        self.assertEqual(self.server_process.exitcode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,121 @@
+__author__ = "Frank Kwizera"
+
+from src.server.request_metrics import RequestMetrics, ShardedHistogram
+from src.shared.server_routes import MetricsServerRoutes
+from flask.wrappers import Response
+from flask.testing import FlaskClient
+from flask import Flask, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
+import multiprocessing
+import threading
+import unittest
+
+
+class ShardedHistogramTest(unittest.TestCase):
+    def test_observe_from_concurrent_threads(self):
+        histogram: ShardedHistogram = ShardedHistogram(buckets=(1, 10))
+
+        def observe_values():
+            for value in (0.5, 1, 5, 50):
+                histogram.observe(value)
+
+        observers_threads: List[threading.Thread] = [threading.Thread(target=observe_values) for _ in range(20)]
+        for observer_thread in observers_threads:
+            observer_thread.start()
+        for observer_thread in observers_threads:
+            observer_thread.join()
+
+        cumulative_counts, values_sum = histogram.snapshot()
+        self.assertEqual(cumulative_counts, [40, 60, 80])
+        self.assertEqual(values_sum, 20 * 56.5)
+
+    def test_concurrent_threads_record_into_different_shards(self):
+        threads_count: int = 16
+        barrier: threading.Barrier = threading.Barrier(threads_count)
+
+        def retrieve_shard_index() -> int:
+            # Keep every pool thread busy so that each one runs a task.
+            barrier.wait(timeout=5)
+            return ShardedHistogram.retrieve_shard_index()
+
+        with ThreadPoolExecutor(max_workers=threads_count) as executor:
+            shards_indexes: Set[int] = set(executor.map(lambda _: retrieve_shard_index(), range(threads_count)))
+        self.assertGreater(len(shards_indexes), 1)
+
+
+class RequestMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = Flask('Request metrics test')
+        self.request_metrics: RequestMetrics = RequestMetrics()
+        self.request_metrics.install(app=self.app)
+        self.client: FlaskClient = self.app.test_client()
+
+        def submit_a_bid():
+            self.request_metrics.record_auto_bid_cascade(depth=3)
+            self.request_metrics.record_bids_written(bids_count=1)
+            self.request_metrics.record_bids_written(bids_count=2)
+            return jsonify({})
+        self.app.add_url_rule('/create/bid', endpoint='submit_a_bid', view_func=submit_a_bid, methods=['POST'])
+
+    def retrieve_metrics_lines(self) -> List[str]:
+        metrics_response: Response = self.client.get(MetricsServerRoutes.METRICS)
+        self.assertEqual(metrics_response.status_code, 200)
+        self.assertTrue(metrics_response.content_type.startswith('text/plain; version=0.0.4'))
+        return metrics_response.data.decode().splitlines()
+
+    def test_retrieve_metrics(self):
+        for _ in range(2):
+            self.assertEqual(self.client.post('/create/bid').status_code, 200)
+        self.assertEqual(self.client.get('/unknown').status_code, 404)
+
+        metrics_lines: List[str] = self.retrieve_metrics_lines()
+        self.assertIn('# TYPE auction_request_duration_seconds histogram', metrics_lines)
+        self.assertIn('auction_request_duration_seconds_count{endpoint="submit_a_bid",status="200"} 2', metrics_lines)
+        self.assertIn('auction_request_duration_seconds_count{endpoint="None",status="404"} 1', metrics_lines)
+        self.assertIn('auction_bids_written_per_request_bucket{endpoint="submit_a_bid",le="2"} 0', metrics_lines)
+        self.assertIn('auction_bids_written_per_request_bucket{endpoint="submit_a_bid",le="3"} 2', metrics_lines)
+        self.assertIn('auction_bids_written_per_request_sum{endpoint="submit_a_bid"} 6.0', metrics_lines)
+        self.assertIn('auction_auto_bid_cascade_depth_bucket{endpoint="submit_a_bid",le="5"} 2', metrics_lines)
+        self.assertIn('auction_auto_bid_cascade_depth_count{endpoint="submit_a_bid"} 2', metrics_lines)
+
+    def test_record_outside_of_requests(self):
+        with self.app.app_context():
+            self.request_metrics.record_auto_bid_cascade(depth=0)
+            self.request_metrics.record_bids_written(bids_count=4)
+
+        metrics_lines: List[str] = self.retrieve_metrics_lines()
+        self.assertIn('auction_auto_bid_cascade_depth_count{endpoint="background"} 1', metrics_lines)
+        self.assertIn('auction_bids_written_per_request_sum{endpoint="background"} 4.0', metrics_lines)
+
+    def test_aggregate_workers_histograms(self):
+        self.request_metrics.allocate(workers=2)
+
+        def submit_bids_from_other_worker():
+            self.request_metrics.select_worker(worker_index=1)
+            for _ in range(3):
+                self.client.post('/create/bid')
+
+        other_worker: multiprocessing.Process = multiprocessing.get_context('fork').Process(
+            target=submit_bids_from_other_worker)
+        other_worker.start()
+        other_worker.join(timeout=10)
+        self.assertEqual(other_worker.exitcode, 0)
+        self.assertEqual(self.client.post('/create/bid').status_code, 200)
+
+        metrics_lines: List[str] = self.retrieve_metrics_lines()
+        self.assertIn('auction_request_duration_seconds_count{endpoint="submit_a_bid",status="200"} 4', metrics_lines)
+        self.assertIn('auction_bids_written_per_request_sum{endpoint="submit_a_bid"} 12.0', metrics_lines)
+        self.assertTrue(any(
+            metrics_line.startswith('auction_response_cache_hits_total{worker="0"} ') for metrics_line in metrics_lines))
+
+    def test_drop_series_beyond_max_series(self):
+        self.request_metrics = RequestMetrics(max_series=1)
+        with self.app.app_context():
+            self.request_metrics.record_auto_bid_cascade(depth=0)
+            with self.assertLogs('src.server.request_metrics', level='WARNING'):
+                self.request_metrics.record_bids_written(bids_count=4)
+
+        metrics_lines: List[str] = list(self.request_metrics.iterate_metrics_lines())
+        self.assertIn('auction_auto_bid_cascade_depth_count{endpoint="background"} 1', metrics_lines)
+        self.assertFalse(any(line.startswith('auction_bids_written_per_request_sum') for line in metrics_lines))
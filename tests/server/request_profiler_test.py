@@ -0,0 +1,77 @@
+__author__ = "Frank Kwizera"
+
+from src.server.request_profiler import RequestProfiler
+from src.shared.constants import Directories
+from flask.testing import FlaskClient
+from flask import Flask, jsonify
+from typing import Dict, List
+import unittest
+import time
+import os
+
+
+def spin(duration_in_seconds: float):
+    spin_until: float = time.perf_counter() + duration_in_seconds
+    while time.perf_counter() < spin_until:
+        pass
+
+
+class RequestProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = Flask('Request profiler test')
+        self.request_profiler: RequestProfiler = RequestProfiler()
+        self.request_profiler.interval_in_seconds = 0.001
+        self.request_profiler.install(app=self.app)
+        self.client: FlaskClient = self.app.test_client()
+
+        def retrieve_slowly():
+            spin(duration_in_seconds=0.05)
+            return jsonify({})
+        self.app.add_url_rule('/slow', endpoint='retrieve_slowly', view_func=retrieve_slowly)
+        self.app.add_url_rule('/fast', endpoint='retrieve_quickly', view_func=lambda: jsonify({}))
+        self.profile_path: str = os.path.join(Directories.profiles_root(), f'retrieve_slowly.{os.getpid()}.collapsed')
+
+    def tearDown(self):
+        if os.path.exists(self.profile_path):
+            os.remove(self.profile_path)
+
+    def wait_for_profile(self) -> List[str]:
+        for _ in range(200):
+            if os.path.exists(self.profile_path):
+                with open(self.profile_path) as profile_file:
+                    return profile_file.read().splitlines()
+            time.sleep(0.01)
+        self.fail(f'{self.profile_path} was not dumped.')
+
+    def test_requests_are_not_profiled_by_default(self):
+        self.client.get('/slow', headers={RequestProfiler.PROFILE_HEADER: '1'})
+        self.assertEqual(self.request_profiler.retrieve_endpoints_stats(), {})
+
+    def test_profile_requests_with_header(self):
+        self.app.config['PROFILING_HEADER_ENABLED'] = True
+        self.client.get('/slow')
+        self.assertEqual(self.request_profiler.retrieve_endpoints_stats(), {})
+
+        self.client.get('/slow', headers={RequestProfiler.PROFILE_HEADER: '1'})
+        profile_lines: List[str] = self.wait_for_profile()
+        self.assertTrue(any('request_profiler_test.py:retrieve_slowly;request_profiler_test.py:spin' in profile_line
+                            for profile_line in profile_lines))
+        for profile_line in profile_lines:
+            stack, count = profile_line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+
+        endpoints_stats: Dict[str, Dict[str, int]] = self.request_profiler.retrieve_endpoints_stats()
+        self.assertEqual(endpoints_stats['retrieve_slowly']['requests'], 1)
+        self.assertGreater(endpoints_stats['retrieve_slowly']['samples'], 0)
+
+    def test_sample_requests_of_selected_endpoints(self):
+        self.app.config['PROFILING_SAMPLE_RATE'] = 1.0
+        self.app.config['PROFILING_ENDPOINTS'] = {'retrieve_slowly'}
+        self.client.get('/fast')
+        self.client.get('/slow')
+        self.client.get('/slow')
+        self.wait_for_profile()
+
+        endpoints_stats: Dict[str, Dict[str, int]] = self.request_profiler.retrieve_endpoints_stats()
+        self.assertEqual(list(endpoints_stats), ['retrieve_slowly'])
+        self.assertEqual(endpoints_stats['retrieve_slowly']['requests'], 2)
@@ -0,0 +1,166 @@
+__author__ = "Frank Kwizera"
+
+from src.server.item_management_server import ItemManagementServer
+from src.server.response_cache import CachedResponse, ResponseCache, response_cache
+from src.storage.database_client import ItemDatabaseClient, BidDatabaseClient, AutoBidDatabaseClient
+from src.storage.auction_state_cache import AuctionStateCache
+from src.storage.database_tables import Item
+from src.storage.database_provider import db_provider
+from src.shared.server_routes import ItemManagementServerRoutes
+from flask.wrappers import Response
+from flask_sqlalchemy import SQLAlchemy
+from flask.testing import FlaskClient
+from flask import Flask, jsonify
+from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
+import unittest
+import datetime
+import json
+import uuid
+
+
+db: SQLAlchemy = db_provider.db
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = Flask('Response cache test')
+        self.client: FlaskClient = self.app.test_client()
+        self.response_cache: ResponseCache = ResponseCache(max_size_in_bytes=100)
+        self.version: int = 0
+        self.views_calls_count: int = 0
+
+        def retrieve_value(value: str):
+            self.views_calls_count += 1
+            if value == 'missing':
+                return jsonify({}), 404
+            return jsonify({'value': value, 'version': self.version})
+        self.app.add_url_rule(
+            '/value/<string:value>', endpoint='retrieve_value', methods=['GET'],
+            view_func=self.response_cache.cached(retrieve_version=lambda value: self.version)(retrieve_value))
+
+    def test_responses_are_cached_by_version(self):
+        first_response: Response = self.client.get('/value/a')
+        self.assertEqual(first_response.status_code, 200)
+        self.assertEqual(first_response.headers['Cache-Control'], 'no-cache')
+        etag: str = first_response.headers['ETag']
+        self.assertEqual(self.client.get('/value/a').data, first_response.data)
+        self.assertEqual(self.views_calls_count, 1)
+
+        # Query parameters are part of the key.
+        self.client.get('/value/a', query_string={'limit': 1})
+        self.assertEqual(self.views_calls_count, 2)
+
+        not_modified_response: Response = self.client.get('/value/a', headers={'If-None-Match': etag})
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(not_modified_response.data, b'')
+
+        self.version += 1
+        modified_response: Response = self.client.get('/value/a', headers={'If-None-Match': etag})
+        self.assertEqual(modified_response.status_code, 200)
+        self.assertEqual(json.loads(modified_response.data)['version'], 1)
+        self.assertNotEqual(modified_response.headers['ETag'], etag)
+        self.assertEqual(self.views_calls_count, 3)
+
+        for _ in range(2):
+            self.assertEqual(self.client.get('/value/missing').status_code, 404)
+        self.assertEqual(self.views_calls_count, 5)
+        self.assertEqual(self.response_cache.retrieve_stats(), {
+            'hits': 2, 'misses': 5, 'not_modified': 1, 'evictions': 0, 'responses': 2,
+            'size_in_bytes': self.response_cache.size_in_bytes})
+
+    def test_least_recently_used_responses_are_evicted(self):
+        for key in ('a', 'b', 'c'):
+            self.response_cache.set_response(key=key, cached_response=CachedResponse(
+                version=0, body=b'x' * 40, mimetype='application/json'))
+        self.assertEqual(len(self.response_cache), 2)
+        self.assertEqual(self.response_cache.size_in_bytes, 80)
+        self.assertIsNone(self.response_cache.get_response(key='a', version=0))
+
+        self.assertIsNotNone(self.response_cache.get_response(key='b', version=0))
+        self.response_cache.set_response(key='d', cached_response=CachedResponse(
+            version=0, body=b'x' * 40, mimetype='application/json'))
+        self.assertIsNotNone(self.response_cache.get_response(key='b', version=0))
+        self.assertIsNone(self.response_cache.get_response(key='c', version=0))
+        self.assertEqual(self.response_cache.evictions, 2)
+
+        # Responses larger than the cache are not cached.
+        self.response_cache.set_response(key='e', cached_response=CachedResponse(
+            version=0, body=b'x' * 101, mimetype='application/json'))
+        self.assertIsNone(self.response_cache.get_response(key='e', version=0))
+
+
+class ItemResponsesCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        self.client: FlaskClient = self.app.test_client()
+        if 'retrieve_all_items' not in self.app.view_functions:
+            ItemManagementServer()
+
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        response_cache.clear()
+
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient(state_cache=AuctionStateCache())
+        self.item: Item = self.item_database_client.create_and_save_new_item(
+            item_name='Antique clock', item_description='Clock', item_base_price_in_usd=250,
+            item_owner_uuid=str(uuid.uuid4()),
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+        self.item_details_url: str = ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + self.item.item_uuid
+
+    def count_statements(self, url: str, etag: str) -> int:
+        with StatementsCapture() as statements_capture:
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        return len(statements_capture.statements)
+
+    def test_item_details_are_invalidated_by_writes(self):
+        details_response: Response = self.client.get(self.item_details_url)
+        self.assertEqual(details_response.status_code, 200)
+        self.assertEqual(self.count_statements(url=self.item_details_url, etag=details_response.headers['ETag']), 0)
+
+        BidDatabaseClient(state_cache=AuctionStateCache()).create_item_bids_if_higher(
+            bid_item_uuid=self.item.item_uuid, bids=[(str(uuid.uuid4()), 300)])
+        details_response = self.client.get(
+            self.item_details_url, headers={'If-None-Match': details_response.headers['ETag']})
+        self.assertEqual(details_response.status_code, 200)
+        self.assertEqual(json.loads(details_response.data)['current_bid_price_in_usd'], 300)
+
+        auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
+        bidder_uuid: str = str(uuid.uuid4())
+        auto_bid_database_client.register_user_auto_bid_config(bidder_uuid=bidder_uuid, max_bid_amount_in_usd=1000)
+        auto_bid_database_client.register_auto_bid(bid_item_uuid=self.item.item_uuid, bidder_uuid=bidder_uuid)
+        details_response = self.client.get(
+            self.item_details_url, headers={'If-None-Match': details_response.headers['ETag']})
+        self.assertEqual(details_response.status_code, 200)
+        self.assertEqual(len(json.loads(details_response.data)['item_auto_bidders']), 1)
+
+    def test_items_listing_is_invalidated_by_writes(self):
+        listing_response: Response = self.client.get(ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS)
+        self.assertEqual(len(json.loads(listing_response.data)['items']), 1)
+        self.assertEqual(self.count_statements(
+            url=ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, etag=listing_response.headers['ETag']), 0)
+
+        self.item_database_client.create_and_save_new_item(
+            item_name='Antique vase', item_description='Vase', item_base_price_in_usd=100,
+            item_owner_uuid=str(uuid.uuid4()),
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+        listing_response = self.client.get(
+            ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS, headers={'If-None-Match': listing_response.headers['ETag']})
+        self.assertEqual(listing_response.status_code, 200)
+        self.assertEqual(len(json.loads(listing_response.data)['items']), 2)
+
+    def test_status_filtered_listings_are_not_cached(self):
+        open_items_url: str = ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS + '?status=open'
+        self.assertEqual(len(json.loads(self.client.get(open_items_url).data)['items']), 1)
+        self.assertEqual(len(response_cache), 0)
+
+        # The item close time passes, no write bumps the items version.
+        db.session.execute(Item.__table__.update().values(
+            bid_expiration_timestamp=datetime.datetime.utcnow() - datetime.timedelta(seconds=1)))
+        db.session.commit()
+        self.assertEqual(json.loads(self.client.get(open_items_url).data)['items'], [])
+
+    def tearDown(self):
+        db.session.remove()
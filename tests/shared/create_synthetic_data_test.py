@@ -0,0 +1,87 @@
+__author__ = "Frank Kwizera"
+
+from src.shared.create_synthetic_data import SyntheticDataCreator
+from src.storage.database_client import UserDatabaseClient
+from src.storage.database_tables import User, Item, Bid, UserAutoBid, AutoBid
+from src.storage.database_provider import db_provider
+from flask_sqlalchemy import SQLAlchemy
+from typing import Any, Dict, List
+import tempfile
+import unittest
+import datetime
+import os
+
+db: SQLAlchemy = db_provider.db
+
+
+class SyntheticDataCreatorTest(unittest.TestCase):
+    def setUp(self):
+        self.now: datetime.datetime = datetime.datetime(2030, 1, 1)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def create_synthetic_data(self, processes: int) -> Dict[str, Any]:
+        return SyntheticDataCreator(
+            users=200, items=300, seed=7, processes=processes, now=self.now).create_synthetic_data()
+
+    @staticmethod
+    def dump_tables() -> Dict[str, List[tuple]]:
+        return {
+            model.__tablename__: sorted(tuple(row) for row in db.session.execute(model.__table__.select()))
+            for model in (User, Item, Bid, UserAutoBid, AutoBid)
+        }
+
+    def test_create_synthetic_data_is_reproducible(self):
+        dataset_summary: Dict[str, Any] = self.create_synthetic_data(processes=1)
+        self.assertEqual(dataset_summary['rows_counts']['user'], 200)
+        self.assertEqual(dataset_summary['rows_counts']['item'], 300)
+        self.assertEqual(dataset_summary['rows_counts']['user_auto_bid'], 20)
+        self.assertGreater(dataset_summary['rows_counts']['bid'], 0)
+        first_tables: Dict[str, List[tuple]] = self.dump_tables()
+
+        # Same seed, generated by a pool of processes.
+        self.create_synthetic_data(processes=2)
+        second_tables: Dict[str, List[tuple]] = self.dump_tables()
+        # Password hashes are salted at random.
+        password_hash_index: int = list(User.__table__.columns.keys()).index('user_password_hash')
+        for tables in (first_tables, second_tables):
+            tables['user'] = [row[:password_hash_index] + row[password_hash_index + 1:] for row in tables['user']]
+        self.assertEqual(second_tables, first_tables)
+
+    def test_items_match_their_bids(self):
+        self.create_synthetic_data(processes=1)
+        for item in Item.query.all():
+            self.assertEqual(item.bid_count, len(item.bids))
+            if item.bids:
+                self.assertEqual(item.current_bid_price_in_usd, item.bids[-1].bid_price_in_usd)
+                self.assertEqual(item.current_bidder_uuid, item.bids[-1].bidder_uuid)
+            if item.bid_expiration_timestamp < self.now:
+                self.assertEqual(item.auction_closed_timestamp, item.bid_expiration_timestamp)
+                self.assertEqual(item.winner_uuid, item.current_bidder_uuid)
+            else:
+                self.assertIsNone(item.auction_closed_timestamp)
+
+    def test_synthetic_users_can_login(self):
+        self.create_synthetic_data(processes=1)
+        user: User = UserDatabaseClient().authenticate_user(
+            user_email=SyntheticDataCreator.user_email(user_index=3), user_password=SyntheticDataCreator.USER_PASSWORD)
+        self.assertEqual(user.user_uuid, SyntheticDataCreator.user_uuid(seed=7, user_index=3))
+
+    def test_snapshot_and_restore_snapshot(self):
+        synthetic_data_creator: SyntheticDataCreator = SyntheticDataCreator(
+            users=50, items=50, seed=7, now=self.now)
+        synthetic_data_creator.create_synthetic_data()
+        tables: Dict[str, List[tuple]] = self.dump_tables()
+
+        with tempfile.TemporaryDirectory() as snapshot_directory:
+            snapshot_path: str = os.path.join(snapshot_directory, 'snapshot.sqlite')
+            synthetic_data_creator.snapshot(snapshot_path=snapshot_path)
+            db.session.remove()
+            db.drop_all()
+            db.create_all()
+            self.assertEqual(Item.query.count(), 0)
+
+            SyntheticDataCreator.restore_snapshot(snapshot_path=snapshot_path)
+            self.assertEqual(self.dump_tables(), tables)
@@ -0,0 +1,29 @@
+__author__ = "Frank Kwizera"
+
+from sqlalchemy.engine import Engine
+from sqlalchemy import event
+from typing import Any, List, Tuple
+
+
+class StatementsCapture:
+    """
+    Captures the SQL statements emitted, by any engine, while the context is entered.
+    """
+
+    def __init__(self):
+        # (statement, parameters) pairs, in emission order.
+        self.statements_parameters: List[Tuple[str, Any]] = []
+
+    def __enter__(self) -> 'StatementsCapture':
+        event.listen(Engine, 'before_cursor_execute', self.capture_statement)
+        return self
+
+    def __exit__(self, *exception_info):
+        event.remove(Engine, 'before_cursor_execute', self.capture_statement)
+
+    def capture_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements_parameters.append((statement, parameters))
+
+    @property
+    def statements(self) -> List[str]:
+        return [statement for statement, _ in self.statements_parameters]
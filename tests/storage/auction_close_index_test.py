@@ -0,0 +1,47 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.auction_close_index import AuctionCloseIndex
+from typing import List
+import unittest
+import datetime
+
+
+class AuctionCloseIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.auction_close_index: AuctionCloseIndex = AuctionCloseIndex()
+        self.now: datetime.datetime = datetime.datetime.utcnow()
+
+    def close_timestamp(self, minutes: int) -> datetime.datetime:
+        return self.now + datetime.timedelta(minutes=minutes)
+
+    def test_closes_are_not_tracked_before_loading(self):
+        self.auction_close_index.schedule_item_close('item_1', self.close_timestamp(-1))
+        self.assertEqual(len(self.auction_close_index), 0)
+
+    def test_due_items_are_popped_earliest_first(self):
+        self.auction_close_index.load_items_closes(
+            items_closes=[(self.close_timestamp(-2), 'item_1'), (self.close_timestamp(5), 'item_3')], complete=True)
+        self.auction_close_index.schedule_item_close('item_2', self.close_timestamp(-1))
+        self.auction_close_index.schedule_item_close('item_2', self.close_timestamp(-1))
+        self.assertEqual(len(self.auction_close_index), 3)
+
+        self.assertEqual(self.auction_close_index.pop_due_items_uuids(now=self.now, limit=1), ['item_1'])
+        self.assertEqual(self.auction_close_index.pop_due_items_uuids(now=self.now, limit=10), ['item_2'])
+        self.assertEqual(self.auction_close_index.next_close_timestamp(), self.close_timestamp(5))
+
+    def test_only_closes_within_the_loaded_window_are_tracked(self):
+        items_closes: List = [(self.close_timestamp(minutes), f'item_{minutes}') for minutes in range(3)]
+        self.auction_close_index.load_items_closes(items_closes=items_closes, complete=False)
+        self.assertEqual(self.auction_close_index.tracked_until, self.close_timestamp(2))
+
+        self.auction_close_index.schedule_item_close('early_item', self.close_timestamp(1))
+        self.auction_close_index.schedule_item_close('late_item', self.close_timestamp(3))
+        self.assertEqual(len(self.auction_close_index), 4)
+
+        self.auction_close_index.reset()
+        self.assertEqual(len(self.auction_close_index), 0)
+        self.assertEqual(self.auction_close_index.tracked_until, datetime.datetime.min)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.auction_state_cache import AuctionStateCache, ItemAuctionState
+from src.storage.database_client import UserDatabaseClient, ItemDatabaseClient, BidDatabaseClient
+from src.storage.database_tables import User, Item
+from src.storage.database_provider import db_provider
+from flask_sqlalchemy import SQLAlchemy
+from flask import Flask
+from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
+import unittest
+import datetime
+
+db: SQLAlchemy = db_provider.db
+
+
+class AuctionStateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.auction_state_cache: AuctionStateCache = AuctionStateCache(max_items=2, max_users=2)
+        self.close_date: datetime.datetime = datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
+
+    def test_item_states_are_evicted_least_recently_used_first(self):
+        self.auction_state_cache.set_item_state('item_1', ItemAuctionState(bid_expiration_timestamp=self.close_date))
+        self.auction_state_cache.set_item_state('item_2', ItemAuctionState(bid_expiration_timestamp=self.close_date))
+        self.assertIsNotNone(self.auction_state_cache.get_item_state('item_1'))
+
+        self.auction_state_cache.set_item_state('item_3', ItemAuctionState(bid_expiration_timestamp=self.close_date))
+        self.assertIsNotNone(self.auction_state_cache.get_item_state('item_1'))
+        self.assertIsNone(self.auction_state_cache.get_item_state('item_2'))
+        self.assertIsNotNone(self.auction_state_cache.get_item_state('item_3'))
+
+    def test_record_item_bid(self):
+        self.auction_state_cache.record_item_bid('item_1', bid_price_in_usd=300, bidder_uuid='bidder_1')
+        self.assertIsNone(self.auction_state_cache.get_item_state('item_1'))
+
+        self.auction_state_cache.set_item_state('item_1', ItemAuctionState(bid_expiration_timestamp=self.close_date))
+        self.auction_state_cache.record_item_bid('item_1', bid_price_in_usd=300, bidder_uuid='bidder_1')
+        item_state: ItemAuctionState = self.auction_state_cache.get_item_state('item_1')
+        self.assertEqual(item_state.highest_bid_price_in_usd, 300)
+        self.assertEqual(item_state.highest_bidder_uuid, 'bidder_1')
+
+    def test_closed_items_are_dropped_on_access(self):
+        closed_date: datetime.datetime = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        self.auction_state_cache.set_item_state('item_1', ItemAuctionState(bid_expiration_timestamp=closed_date))
+        self.assertIsNone(self.auction_state_cache.get_item_state('item_1'))
+
+        # The dropped item no longer takes a slot.
+        self.auction_state_cache.set_item_state('item_2', ItemAuctionState(bid_expiration_timestamp=self.close_date))
+        self.auction_state_cache.set_item_state('item_3', ItemAuctionState(bid_expiration_timestamp=self.close_date))
+        self.assertIsNotNone(self.auction_state_cache.get_item_state('item_2'))
+
+    def test_known_users_are_evicted_least_recently_used_first(self):
+        self.auction_state_cache.add_known_user('user_1')
+        self.auction_state_cache.add_known_user('user_2')
+        self.auction_state_cache.add_known_user('user_3')
+        self.assertFalse(self.auction_state_cache.check_if_user_is_known('user_1'))
+        self.assertTrue(self.auction_state_cache.check_if_user_is_known('user_2'))
+        self.assertTrue(self.auction_state_cache.check_if_user_is_known('user_3'))
+
+
+class AuctionStateCacheDatabaseClientsTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        self.auction_state_cache: AuctionStateCache = AuctionStateCache()
+        self.user_database_client: UserDatabaseClient = UserDatabaseClient(state_cache=self.auction_state_cache)
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient(state_cache=self.auction_state_cache)
+        self.bid_database_client: BidDatabaseClient = BidDatabaseClient(state_cache=self.auction_state_cache)
+
+        self.user: User = self.user_database_client.create_and_save_new_user(
+            user_names='Frank Kwizera', user_email='frank@gmail.com', user_password='1234567')
+        self.item: Item = self.item_database_client.create_and_save_new_item(
+            item_name='Item 1', item_description='Item 1 description', item_base_price_in_usd=250,
+            item_owner_uuid=self.user.user_uuid,
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+
+    def test_bid_pre_checks_do_not_read_the_database(self):
+        self.bid_database_client.create_item_bid(
+            bid_price_in_usd=300, bid_item_uuid=self.item.item_uuid, bidder_uuid=self.user.user_uuid)
+        user_uuid: str = self.user.user_uuid
+        item_uuid: str = self.item.item_uuid
+        item_close_date: datetime.datetime = self.item.bid_expiration_timestamp
+
+        with StatementsCapture() as statements_capture:
+            self.assertTrue(self.user_database_client.check_if_user_exists(user_uuid=user_uuid))
+            self.assertTrue(self.item_database_client.check_if_item_exists(item_uuid=item_uuid))
+            self.assertEqual(self.item_database_client.retrieve_item_close_date(item_uuid=item_uuid), item_close_date)
+            item_state: ItemAuctionState = self.item_database_client.retrieve_item_auction_state(item_uuid=item_uuid)
+
+        self.assertEqual(statements_capture.statements, [])
+        self.assertEqual(item_state.highest_bid_price_in_usd, 300)
+        self.assertEqual(item_state.highest_bidder_uuid, user_uuid)
+
+    def test_item_auction_state_is_loaded_on_cache_miss(self):
+        self.bid_database_client.create_item_bid(
+            bid_price_in_usd=300, bid_item_uuid=self.item.item_uuid, bidder_uuid=self.user.user_uuid)
+        self.auction_state_cache.clear()
+
+        item_state: ItemAuctionState = \
+            self.item_database_client.retrieve_item_auction_state(item_uuid=self.item.item_uuid)
+        self.assertEqual(item_state.highest_bid_price_in_usd, 300)
+        self.assertEqual(item_state.bid_expiration_timestamp, self.item.bid_expiration_timestamp)
+        self.assertIsNone(self.item_database_client.retrieve_item_auction_state(item_uuid='unknown item'))
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.close()
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
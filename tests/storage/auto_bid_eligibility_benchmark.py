@@ -0,0 +1,128 @@
+"""
+Benchmarks auto bidders eligibility lookup against the former per bidder (N+1) implementation.
+Usage:
+    python -m tests.storage.auto_bid_eligibility_benchmark
+"""
+
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import AutoBidDatabaseClient
+from src.storage.database_tables import AutoBid, Item, User, UserAutoBid
+from src.storage.database_provider import db_provider
+from flask_sqlalchemy import SQLAlchemy
+from flask import Flask
+from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
+from typing import Callable, Dict, List, Tuple
+import datetime
+import time
+import uuid
+
+db: SQLAlchemy = db_provider.db
+
+AUTO_BIDDERS_COUNTS: Tuple[int] = (10, 100, 1000)
+REPETITIONS: int = 5
+
+
+def per_bidder_retrieve_item_auto_bidders_uuids_with_enough_funds(
+        item_uuid: str, highest_bider_uuid: str, current_highest_bid: int) -> List[str]:
+    """
+    Former implementation issuing two queries per auto bidder. Kept as the benchmark reference.
+    """
+    item_auto_bidders_uuids: Tuple[str] = db.session.query(AutoBid.bidder_uuid).filter(
+        AutoBid.bid_item_uuid == item_uuid,
+        AutoBid.bidder_uuid != highest_bider_uuid).all()
+
+    auto_bidders_with_enough_funds: List[str] = []
+    for item_auto_bidder_uuid, in item_auto_bidders_uuids:
+        auto_bidder_max_bid_amount_in_usd: int = \
+            db.session.query(UserAutoBid.max_bid_amount_in_usd).filter(
+                UserAutoBid.bidder_uuid == item_auto_bidder_uuid).one_or_none()[0]
+        number_of_bids_registered_by_user: int = db.session.query(AutoBid).filter(
+            AutoBid.bidder_uuid == item_auto_bidder_uuid).count()
+        if auto_bidder_max_bid_amount_in_usd / number_of_bids_registered_by_user > current_highest_bid:
+            auto_bidders_with_enough_funds.append(item_auto_bidder_uuid)
+    return auto_bidders_with_enough_funds
+
+
+def seed_auto_bidders(auto_bidders_count: int) -> str:
+    """
+    Registers ``auto_bidders_count`` auto bidders on a new open item, each one also registered on a second item.
+    Returns:
+        - Target item uuid.
+    """
+    # Auto bidders are only evaluated on open items.
+    owner: User = User(user_names='Owner', user_email=f'{uuid.uuid4()}@gmail.com', user_password_hash='1234567')
+    item: Item = Item(
+        item_name='Antique clock', item_description='Clock', item_base_price_in_usd=250,
+        item_owner_uuid=owner.user_uuid,
+        bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(days=1))
+    item_uuid: str = item.item_uuid
+    other_item_uuid: str = str(uuid.uuid4())
+    records: List[db.Model] = [owner, item]
+    for index in range(auto_bidders_count):
+        bidder_uuid: str = str(uuid.uuid4())
+        records.append(UserAutoBid(bidder_uuid=bidder_uuid, max_bid_amount_in_usd=200 + index * 10))
+        records.append(AutoBid(bid_item_uuid=item_uuid, bidder_uuid=bidder_uuid))
+        records.append(AutoBid(bid_item_uuid=other_item_uuid, bidder_uuid=bidder_uuid))
+    db.session.add_all(records)
+    db.session.commit()
+    return item_uuid
+
+
+def measure(lookup: Callable[..., List[str]], item_uuid: str) -> Tuple[int, float, List[str]]:
+    """
+    Runs the lookup ``REPETITIONS`` times.
+    Returns:
+        - (queries per call, average latency in milliseconds, lookup result).
+    """
+    with StatementsCapture() as statements_capture:
+        started_at: float = time.perf_counter()
+        for _ in range(REPETITIONS):
+            result: List[str] = lookup(
+                item_uuid=item_uuid, highest_bider_uuid=str(uuid.uuid4()), current_highest_bid=300)
+        elapsed_in_ms: float = (time.perf_counter() - started_at) * 1000 / REPETITIONS
+    return len(statements_capture.statements) // REPETITIONS, elapsed_in_ms, result
+
+
+def run_benchmark() -> List[Dict[str, float]]:
+    """
+    Runs the benchmark for every size in ``AUTO_BIDDERS_COUNTS`` and prints a summary table.
+    Returns:
+        - One result dictionary per size.
+    """
+    app: Flask = get_app()
+    app.app_context().push()
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+    auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
+    results: List[Dict[str, float]] = []
+    print(f"{'auto bidders':>12} | {'per bidder queries':>18} | {'per bidder ms':>13} | "
+          f"{'set based queries':>17} | {'set based ms':>12}")
+    for auto_bidders_count in AUTO_BIDDERS_COUNTS:
+        item_uuid: str = seed_auto_bidders(auto_bidders_count=auto_bidders_count)
+        per_bidder_queries, per_bidder_ms, per_bidder_result = measure(
+            per_bidder_retrieve_item_auto_bidders_uuids_with_enough_funds, item_uuid=item_uuid)
+        set_based_queries, set_based_ms, set_based_result = measure(
+            auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds, item_uuid=item_uuid)
+        assert sorted(per_bidder_result) == sorted(set_based_result)
+
+        results.append({
+            'auto_bidders_count': auto_bidders_count,
+            'per_bidder_queries': per_bidder_queries,
+            'per_bidder_ms': per_bidder_ms,
+            'set_based_queries': set_based_queries,
+            'set_based_ms': set_based_ms
+        })
+        print(f"{auto_bidders_count:>12} | {per_bidder_queries:>18} | {per_bidder_ms:>13.2f} | "
+              f"{set_based_queries:>17} | {set_based_ms:>12.2f}")
+
+    db.session.remove()
+    db.drop_all()
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmark()
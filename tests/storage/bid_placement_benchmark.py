@@ -0,0 +1,129 @@
+"""
+Benchmarks bid placement with N threads bidding on the same item: the conditional insert of
+``BidDatabaseClient.create_item_bids_if_higher`` against the former read, check then write placement.
+Usage:
+    python -m tests.storage.bid_placement_benchmark
+"""
+
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import BidDatabaseClient, ItemDatabaseClient
+from src.storage.database_tables import Bid, Item
+from src.storage.auction_state_cache import AuctionStateCache
+from src.storage.database_provider import db_provider
+from flask_sqlalchemy import SQLAlchemy
+from flask import Flask
+from src.get_app import get_app
+from typing import Callable, Dict, List, Tuple
+import threading
+import datetime
+import time
+import uuid
+
+db: SQLAlchemy = db_provider.db
+
+THREADS_COUNTS: Tuple[int] = (1, 4, 16)
+BIDS_PER_THREAD: int = 50
+
+
+def read_check_write_place_bid(bid_database_client: BidDatabaseClient, bid_item_uuid: str,
+                               bidder_uuid: str, bid_price_in_usd: int) -> bool:
+    """
+    Former placement: reads the most recent bid, compares in Python, then inserts. Kept as the benchmark reference.
+    """
+    most_recent_bid: Bid = bid_database_client.retrieve_item_most_recent_bid(item_uuid=bid_item_uuid)
+    if most_recent_bid is not None and most_recent_bid.bid_price_in_usd >= bid_price_in_usd:
+        return False
+    bid_database_client.create_item_bid(
+        bid_price_in_usd=bid_price_in_usd, bid_item_uuid=bid_item_uuid, bidder_uuid=bidder_uuid)
+    return True
+
+
+def conditional_place_bid(bid_database_client: BidDatabaseClient, bid_item_uuid: str,
+                          bidder_uuid: str, bid_price_in_usd: int) -> bool:
+    return bool(bid_database_client.create_item_bids_if_higher(
+        bid_item_uuid=bid_item_uuid, bids=[(bidder_uuid, bid_price_in_usd)]))
+
+
+def measure(app: Flask, place_bid: Callable[..., bool], threads_count: int) -> Dict[str, float]:
+    """
+    Makes ``threads_count`` threads place ``BIDS_PER_THREAD`` interleaved increasing bids each on a new item.
+    Returns:
+        - Placement throughput, accepted bids count and the number of accepted bids that were
+          not higher than the previously accepted bid.
+    """
+    item: Item = ItemDatabaseClient(state_cache=AuctionStateCache()).create_and_save_new_item(
+        item_name='Benchmark item', item_description='Benchmark item', item_base_price_in_usd=1,
+        item_owner_uuid=str(uuid.uuid4()),
+        bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+    bid_item_uuid: str = item.item_uuid
+    bid_database_client: BidDatabaseClient = BidDatabaseClient(state_cache=AuctionStateCache())
+    start_barrier: threading.Barrier = threading.Barrier(threads_count)
+
+    def place_bids(thread_index: int):
+        with app.app_context():
+            start_barrier.wait()
+            for bid_index in range(BIDS_PER_THREAD):
+                place_bid(bid_database_client=bid_database_client, bid_item_uuid=bid_item_uuid,
+                          bidder_uuid=str(uuid.uuid4()), bid_price_in_usd=2 + bid_index * threads_count + thread_index)
+            db.session.remove()
+
+    bidders_threads: List[threading.Thread] = [
+        threading.Thread(target=place_bids, args=(thread_index,)) for thread_index in range(threads_count)]
+    started_at: float = time.perf_counter()
+    for bidder_thread in bidders_threads:
+        bidder_thread.start()
+    for bidder_thread in bidders_threads:
+        bidder_thread.join()
+    elapsed_in_seconds: float = time.perf_counter() - started_at
+
+    accepted_bids_prices: List[int] = [
+        bid.bid_price_in_usd for bid in bid_database_client.iterate_item_bids(item_uuid=bid_item_uuid)]
+    return {
+        'bids_per_second': threads_count * BIDS_PER_THREAD / elapsed_in_seconds,
+        'accepted_bids': len(accepted_bids_prices),
+        'lost_updates': sum(
+            1 for previous_price, price in zip(accepted_bids_prices, accepted_bids_prices[1:])
+            if price <= previous_price)
+    }
+
+
+def run_benchmark() -> List[Dict[str, float]]:
+    """
+    Runs the benchmark for every size in ``THREADS_COUNTS`` and prints a summary table.
+    Returns:
+        - One result dictionary per size.
+    """
+    app: Flask = get_app()
+    app.app_context().push()
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+    results: List[Dict[str, float]] = []
+    print(f"{'threads':>7} | {'read check write bids/s':>23} | {'lost updates':>12} | "
+          f"{'conditional bids/s':>18} | {'lost updates':>12}")
+    for threads_count in THREADS_COUNTS:
+        read_check_write: Dict[str, float] = measure(
+            app=app, place_bid=read_check_write_place_bid, threads_count=threads_count)
+        conditional: Dict[str, float] = measure(app=app, place_bid=conditional_place_bid, threads_count=threads_count)
+        assert conditional['lost_updates'] == 0
+
+        results.append({
+            'threads_count': threads_count,
+            'read_check_write_bids_per_second': read_check_write['bids_per_second'],
+            'read_check_write_lost_updates': read_check_write['lost_updates'],
+            'conditional_bids_per_second': conditional['bids_per_second'],
+            'conditional_lost_updates': conditional['lost_updates']
+        })
+        print(f"{threads_count:>7} | {read_check_write['bids_per_second']:>23.0f} | "
+              f"{read_check_write['lost_updates']:>12} | {conditional['bids_per_second']:>18.0f} | "
+              f"{conditional['lost_updates']:>12}")
+
+    db.session.remove()
+    db.drop_all()
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,199 @@
+"""
+Micro benchmarks of the storage layer: calls ``UserDatabaseClient``, ``ItemDatabaseClient``,
+``BidDatabaseClient`` and ``AutoBidDatabaseClient`` methods directly against synthetic datasets of
+increasing size and reports, per call, the average wall time, the number of SQL statements and the
+number of rows the statements returned. A statements count growing with the dataset points to an
+N+1 pattern, a rows count growing with the dataset to a full scan.
+Datasets are written to temporary SQLite files, the configured database is left untouched.
+Usage:
+    python -m tests.storage.database_client_benchmark --items 1000 10000 --output results.json
+"""
+
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import UserDatabaseClient, ItemDatabaseClient
+from src.storage.database_client import BidDatabaseClient, AutoBidDatabaseClient
+from src.shared.create_synthetic_data import SyntheticDataCreator
+from src.storage.database_tables import Item
+from src.storage.database_provider import db_provider
+from src.storage.auction_state_cache import AuctionStateCache
+from src.shared.constants import AuctionStatus
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.engine import Engine
+from sqlalchemy import event
+from typing import Any, Callable, Dict, List, Tuple
+import itertools
+import argparse
+import tempfile
+import json
+import time
+import os
+
+db: SQLAlchemy = db_provider.db
+
+REPETITIONS: int = 20
+# Benchmarked calls: (name, call).
+BenchmarkCase = Tuple[str, Callable[[], Any]]
+
+
+class StatementsRecorder:
+    """
+    Counts the SQL statements emitted while recording, and the rows each ``SELECT`` returns. Rows are
+    counted by re-running the statement wrapped in ``SELECT COUNT(*)``, so calls are timed separately.
+    """
+
+    def __init__(self):
+        self.statements_count: int = 0
+        self.rows_count: int = 0
+
+    def __enter__(self) -> 'StatementsRecorder':
+        event.listen(Engine, 'after_cursor_execute', self.record_statement)
+        return self
+
+    def __exit__(self, *exception_info):
+        event.remove(Engine, 'after_cursor_execute', self.record_statement)
+
+    def record_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements_count += 1
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            count_cursor = conn.connection.cursor()
+            try:
+                count_cursor.execute(f'SELECT COUNT(*) FROM ({statement})', parameters)
+                self.rows_count += count_cursor.fetchone()[0]
+            finally:
+                count_cursor.close()
+
+
+def create_benchmark_cases(seed: int, users: int) -> List[BenchmarkCase]:
+    """
+    Creates the benchmarked calls, on the hottest items of the seeded dataset.
+    Returns:
+        - Benchmark cases.
+    """
+    # Without cached auction states, every call reaches the database.
+    state_cache: AuctionStateCache = AuctionStateCache(max_items=0, max_users=0)
+    user_database_client: UserDatabaseClient = UserDatabaseClient(state_cache=state_cache)
+    item_database_client: ItemDatabaseClient = ItemDatabaseClient(state_cache=state_cache)
+    bid_database_client: BidDatabaseClient = BidDatabaseClient(state_cache=state_cache)
+    auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
+
+    hot_items_uuids: List[str] = [item_uuid for item_uuid, in db.session.query(Item.item_uuid).filter(
+        Item.auction_closed_timestamp.is_(None)).order_by(Item.bid_count.desc()).limit(100)]
+    hot_item_uuid: str = hot_items_uuids[0]
+    users_uuids: List[str] = [
+        SyntheticDataCreator.user_uuid(seed=seed, user_index=user_index) for user_index in range(min(users, 100))]
+    bid_prices: itertools.count = itertools.count(start=10 ** 9)
+
+    return [
+        ('UserDatabaseClient.authenticate_user',
+         lambda: user_database_client.authenticate_user(
+             user_email=SyntheticDataCreator.user_email(user_index=users - 1),
+             user_password=SyntheticDataCreator.USER_PASSWORD)),
+        ('UserDatabaseClient.check_if_user_exists',
+         lambda: user_database_client.check_if_user_exists(user_uuid=users_uuids[-1])),
+        ('UserDatabaseClient.retrieve_existing_users_uuids',
+         lambda: user_database_client.retrieve_existing_users_uuids(users_uuids=set(users_uuids))),
+        ('ItemDatabaseClient.retrieve_all_items',
+         item_database_client.retrieve_all_items),
+        ('ItemDatabaseClient.retrieve_all_items + Item.bids',
+         lambda: [item.bids for item in item_database_client.retrieve_all_items()]),
+        ('ItemDatabaseClient.retrieve_items_page',
+         lambda: item_database_client.retrieve_items_page(limit=50)),
+        ('ItemDatabaseClient.retrieve_items_page open',
+         lambda: item_database_client.retrieve_items_page(limit=50, auction_status=AuctionStatus.OPEN)),
+        ('ItemDatabaseClient.retrieve_item_details',
+         lambda: item_database_client.retrieve_item_details(item_uuid=hot_item_uuid)),
+        ('ItemDatabaseClient.retrieve_item_details 20 bids',
+         lambda: item_database_client.retrieve_item_details(item_uuid=hot_item_uuid, bids_limit=20)),
+        ('ItemDatabaseClient.retrieve_item_auction_state',
+         lambda: item_database_client.retrieve_item_auction_state(item_uuid=hot_item_uuid, use_cache=False)),
+        ('ItemDatabaseClient.retrieve_items_auction_states',
+         lambda: item_database_client.retrieve_items_auction_states(items_uuids=set(hot_items_uuids))),
+        ('ItemDatabaseClient.retrieve_upcoming_auctions_closes',
+         lambda: item_database_client.retrieve_upcoming_auctions_closes(limit=500)),
+        ('BidDatabaseClient.retrieve_item_bids',
+         lambda: bid_database_client.retrieve_item_bids(item_uuid=hot_item_uuid)),
+        ('BidDatabaseClient.retrieve_item_most_recent_bid',
+         lambda: bid_database_client.retrieve_item_most_recent_bid(item_uuid=hot_item_uuid)),
+        ('BidDatabaseClient.create_item_bids_if_higher',
+         lambda: bid_database_client.create_item_bids_if_higher(
+             bid_item_uuid=hot_item_uuid, bids=[(users_uuids[0], next(bid_prices))])),
+        ('AutoBidDatabaseClient.retrieve_item_auto_bidders',
+         lambda: auto_bid_database_client.retrieve_item_auto_bidders(item_uuid=hot_item_uuid)),
+        ('AutoBidDatabaseClient.retrieve_item_auto_bidders_budgets',
+         lambda: auto_bid_database_client.retrieve_item_auto_bidders_budgets(item_uuid=hot_item_uuid)),
+        ('AutoBidDatabaseClient.retrieve_items_auto_bidders_budgets',
+         lambda: auto_bid_database_client.retrieve_items_auto_bidders_budgets(items_uuids=hot_items_uuids)),
+        ('AutoBidDatabaseClient.retrieve_item_auto_bidders_uuids_with_enough_funds',
+         lambda: auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds(
+             item_uuid=hot_item_uuid, highest_bider_uuid=users_uuids[0], current_highest_bid=100)),
+    ]
+
+
+def measure(call: Callable[[], Any]) -> Dict[str, float]:
+    """
+    Times ``REPETITIONS`` calls, then records the statements of one more call. The session is cleared
+    before every call, so that nothing is served from the identity map.
+    Returns:
+        - Average wall time in milliseconds, statements and rows count per call.
+    """
+    elapsed_in_seconds: float = 0
+    for _ in range(REPETITIONS):
+        db.session.remove()
+        started_at: float = time.perf_counter()
+        call()
+        elapsed_in_seconds += time.perf_counter() - started_at
+
+    db.session.remove()
+    with StatementsRecorder() as statements_recorder:
+        call()
+    return {
+        'wall_time_in_ms': elapsed_in_seconds / REPETITIONS * 1000,
+        'statements': statements_recorder.statements_count,
+        'rows_fetched': statements_recorder.rows_count
+    }
+
+
+def run_benchmark(items_counts: List[int], seed: int = 0) -> Dict[int, Dict[str, Dict[str, float]]]:
+    """
+    Runs every benchmark case against a dataset of each size and prints a summary table.
+    Inputs:
+        - items_counts: Dataset sizes, in items, with a user per 10 items.
+        - seed: Dataset seed.
+    Returns:
+        - Results by dataset size and case name.
+    """
+    results: Dict[int, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as database_directory:
+        for items_count in items_counts:
+            users_count: int = max(10, items_count // 10)
+            database_path: str = os.path.join(database_directory, f'{items_count}_items.sqlite')
+            SyntheticDataCreator(
+                users=users_count, items=items_count, seed=seed, processes=os.cpu_count(),
+                database_uri=f'sqlite:///{database_path}').create_synthetic_data()
+
+            results[items_count] = {}
+            print(f"{items_count} items, {users_count} users")
+            print(f"{'call':>72} | {'ms':>9} | {'statements':>10} | {'rows':>8}")
+            for case_name, call in create_benchmark_cases(seed=seed, users=users_count):
+                case_result: Dict[str, float] = measure(call=call)
+                results[items_count][case_name] = case_result
+                print(f"{case_name:>72} | {case_result['wall_time_in_ms']:>9.2f} | "
+                      f"{case_result['statements']:>10} | {case_result['rows_fetched']:>8}")
+            db_provider.dispose_connections()
+    return results
+
+
+if __name__ == '__main__':
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Storage layer micro benchmarks.")
+    argument_parser.add_argument("--items", type=int, nargs='+', default=[1000, 10000], help="Dataset sizes.")
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--output", default=None, help="JSON file to save the results to.")
+    arguments: argparse.Namespace = argument_parser.parse_args()
+
+    benchmark_results: Dict[int, Dict[str, Dict[str, float]]] = run_benchmark(
+        items_counts=arguments.items, seed=arguments.seed)
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            json.dump(benchmark_results, output_file, indent=2)
@@ -1,12 +1,18 @@
 __author__ = "Frank Kwizera"
 
 from src.storage.database_client import UserDatabaseClient, BidDatabaseClient
-from src.storage.database_client import ItemDatabaseClient
+from src.storage.database_client import ItemDatabaseClient, AutoBidDatabaseClient
 from src.storage.database_tables import User, Bid, Item
 from src.storage.database_provider import db_provider
+from src.storage.auction_state_cache import AuctionStateCache
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import event
 from flask import Flask
 from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
+from typing import Dict, List
+import threading
 import unittest
 import uuid
 import datetime
@@ -19,6 +25,7 @@ class DatabaseClientTest:
         self.user_database_client: UserDatabaseClient = UserDatabaseClient()
         self.bid_database_client: BidDatabaseClient = BidDatabaseClient()
         self.item_database_client: ItemDatabaseClient = ItemDatabaseClient()
+        self.auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
     
 
 class UserDatabaseClientTest(unittest.TestCase, DatabaseClientTest):
@@ -171,9 +178,228 @@ class ItemDatabaseClientTest(unittest.TestCase, DatabaseClientTest):
         retrieved_item: Item = \
             self.item_database_client.retrieve_item_by_item_uuid(item_uuid=self.item.item_uuid)
         self.assertIsInstance(retrieved_item, Item)
-        self.assertEqual(retrieved_item, self.item)
+        # Read from the read only session, so a different object than the one written.
+        self.assertEqual(retrieved_item.to_json_dict(), self.item.to_json_dict())
+
+    def test_item_current_bid_is_updated_on_bid(self):
+        self.assertEqual(self.item.bid_count, 0)
+        self.assertIsNone(self.item.current_bid_price_in_usd)
+
+        bidder_uuid: str = str(uuid.uuid4())
+        self.bid_database_client.create_item_bid(
+            bid_price_in_usd=300, bid_item_uuid=self.item.item_uuid, bidder_uuid=str(uuid.uuid4()))
+        self.bid_database_client.create_item_bids(
+            bid_item_uuid=self.item.item_uuid, bids=[(str(uuid.uuid4()), 310), (bidder_uuid, 320)])
+
+        retrieved_item: Item = \
+            self.item_database_client.retrieve_item_by_item_uuid(item_uuid=self.item.item_uuid)
+        self.assertEqual(retrieved_item.current_bid_price_in_usd, 320)
+        self.assertEqual(retrieved_item.current_bidder_uuid, bidder_uuid)
+        self.assertEqual(retrieved_item.bid_count, 3)
+
+    def test_create_item_bids_if_higher(self):
+        bidder_uuid: str = str(uuid.uuid4())
+        new_bids: List[Bid] = self.bid_database_client.create_item_bids_if_higher(
+            bid_item_uuid=self.item.item_uuid, bids=[(str(uuid.uuid4()), 300), (bidder_uuid, 310)])
+        self.assertEqual([bid.bid_price_in_usd for bid in new_bids], [300, 310])
+
+        self.assertEqual(self.bid_database_client.create_item_bids_if_higher(
+            bid_item_uuid=self.item.item_uuid, bids=[(str(uuid.uuid4()), 310)]), [])
+        self.assertEqual(self.bid_database_client.create_item_bids_if_higher(
+            bid_item_uuid='unknown item', bids=[(str(uuid.uuid4()), 310)]), [])
+
+        retrieved_item: Item = \
+            self.item_database_client.retrieve_item_by_item_uuid(item_uuid=self.item.item_uuid)
+        self.assertEqual(retrieved_item.current_bid_price_in_usd, 310)
+        self.assertEqual(retrieved_item.current_bidder_uuid, bidder_uuid)
+        self.assertEqual(retrieved_item.bid_count, 2)
+
+    def test_create_item_bids_if_higher_rejects_closed_items(self):
+        closed_item: Item = self.item_database_client.create_and_save_new_item(**dict(
+            self.item_details, bid_expiration_timestamp=datetime.datetime.utcnow() - datetime.timedelta(minutes=1)))
+        self.assertEqual(self.bid_database_client.create_item_bids_if_higher(
+            bid_item_uuid=closed_item.item_uuid, bids=[(str(uuid.uuid4()), 300)]), [])
+
+    def test_concurrent_create_item_bids_if_higher(self):
+        item_uuid: str = self.item.item_uuid
+
+        def place_bids(first_bid_price_in_usd: int):
+            with self.app.app_context():
+                for bid_price_in_usd in range(first_bid_price_in_usd, first_bid_price_in_usd + 100, 4):
+                    self.bid_database_client.create_item_bids_if_higher(
+                        bid_item_uuid=item_uuid, bids=[(str(uuid.uuid4()), bid_price_in_usd)])
+
+        bidders_threads: List[threading.Thread] = [
+            threading.Thread(target=place_bids, args=(300 + thread_index,)) for thread_index in range(4)]
+        for bidder_thread in bidders_threads:
+            bidder_thread.start()
+        for bidder_thread in bidders_threads:
+            bidder_thread.join()
+
+        accepted_bids_prices: List[int] = [
+            bid.bid_price_in_usd for bid in self.bid_database_client.iterate_item_bids(item_uuid=item_uuid)]
+        self.assertEqual(accepted_bids_prices, sorted(set(accepted_bids_prices)))
+
+        db.session.expire_all()
+        retrieved_item: Item = self.item_database_client.retrieve_item_by_item_uuid(item_uuid=item_uuid)
+        self.assertEqual(retrieved_item.current_bid_price_in_usd, accepted_bids_prices[-1])
+        self.assertEqual(retrieved_item.bid_count, len(accepted_bids_prices))
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.close()
+            db.session.remove()
+            db.drop_all()
+
+
+class AutoBidDatabaseClientTest(unittest.TestCase, DatabaseClientTest):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+
+        DatabaseClientTest.__init__(self)
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        self.item_uuid: str = self.item_database_client.create_and_save_new_item(
+            item_name='Item 1', item_description='Item 1 description', item_base_price_in_usd=250,
+            item_owner_uuid=str(uuid.uuid4()),
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15)).item_uuid
+        self.other_item_uuid: str = str(uuid.uuid4())
+
+        # Budget per item: 500 / 1, 900 / 2 and 1000 / 1.
+        self.bidders_budgets: Dict[str, int] = {
+            str(uuid.uuid4()): 500,
+            str(uuid.uuid4()): 900,
+            str(uuid.uuid4()): 1000
+        }
+        for bidder_uuid, max_bid_amount_in_usd in self.bidders_budgets.items():
+            self.auto_bid_database_client.register_user_auto_bid_config(
+                bidder_uuid=bidder_uuid, max_bid_amount_in_usd=max_bid_amount_in_usd)
+            self.auto_bid_database_client.register_auto_bid(bid_item_uuid=self.item_uuid, bidder_uuid=bidder_uuid)
+
+        self.bidders_uuids: List[str] = list(self.bidders_budgets)
+        self.auto_bid_database_client.register_auto_bid(
+            bid_item_uuid=self.other_item_uuid, bidder_uuid=self.bidders_uuids[1])
+
+    def test_retrieve_item_auto_bidders_budgets(self):
+        auto_bidders_budgets: List[Tuple[str, int, int]] = \
+            self.auto_bid_database_client.retrieve_item_auto_bidders_budgets(item_uuid=self.item_uuid)
+        self.assertEqual(auto_bidders_budgets, [
+            (self.bidders_uuids[0], 500, 1),
+            (self.bidders_uuids[1], 900, 2),
+            (self.bidders_uuids[2], 1000, 1)])
+
+    def test_closed_items_auto_bidders_are_not_evaluated(self):
+        self.item_database_client.finalize_auctions(
+            items_uuids=[self.item_uuid], closed_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=30))
+        self.assertEqual(
+            self.auto_bid_database_client.retrieve_item_auto_bidders_budgets(item_uuid=self.item_uuid), [])
+
+    def test_retrieve_item_auto_bidders_uuids_with_enough_funds(self):
+        auto_bidders_uuids: List[str] = \
+            self.auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds(
+                item_uuid=self.item_uuid, highest_bider_uuid=str(uuid.uuid4()), current_highest_bid=449)
+        self.assertEqual(auto_bidders_uuids, self.bidders_uuids)
+
+        auto_bidders_uuids: List[str] = \
+            self.auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds(
+                item_uuid=self.item_uuid, highest_bider_uuid=str(uuid.uuid4()), current_highest_bid=450)
+        self.assertEqual(auto_bidders_uuids, [self.bidders_uuids[0], self.bidders_uuids[2]])
+
+        auto_bidders_uuids: List[str] = \
+            self.auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds(
+                item_uuid=self.item_uuid, highest_bider_uuid=self.bidders_uuids[2], current_highest_bid=500)
+        self.assertEqual(auto_bidders_uuids, [])
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.close()
+            db.session.remove()
+            db.drop_all()
+
+
+class DatabaseClientWritesTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        self.auction_state_cache: AuctionStateCache = AuctionStateCache()
+        self.user_database_client: UserDatabaseClient = UserDatabaseClient(state_cache=self.auction_state_cache)
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient(state_cache=self.auction_state_cache)
+        self.commits_count: int = 0
+        event.listen(db.engine, 'commit', self.count_commit)
+
+    def count_commit(self, conn):
+        self.commits_count += 1
+
+    def test_bulk_insert(self):
+        users_rows: List[Dict[str, str]] = [{
+            'user_uuid': str(uuid.uuid4()),
+            'user_names': f'User {index}',
+            'user_email': f'user_{index}@gmail.com',
+            'user_password_hash': 'password hash'
+        } for index in range(2500)]
+
+        with StatementsCapture() as statements_capture:
+            inserted_rows_count: int = self.user_database_client.bulk_insert(
+                model=User, rows=iter(users_rows), chunk_size=1000)
+
+        self.assertEqual(inserted_rows_count, 2500)
+        self.assertEqual(len(statements_capture.statements), 3)
+        self.assertEqual(self.commits_count, 1)
+        self.assertEqual(db.session.query(User).count(), 2500)
+
+    def test_unit_of_work_commits_once(self):
+        with self.user_database_client.unit_of_work():
+            user: User = self.user_database_client.create_and_save_new_user(
+                user_names='Frank Kwizera', user_email='frank@gmail.com', user_password='1234567')
+            with self.item_database_client.unit_of_work():
+                item: Item = self.item_database_client.create_and_save_new_item(
+                    item_name='Item 1', item_description='Item 1 description', item_base_price_in_usd=250,
+                    item_owner_uuid=user.user_uuid,
+                    bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(minutes=15))
+            self.assertEqual(self.commits_count, 0)
+            self.assertIsNone(self.auction_state_cache.get_item_state(item_uuid=item.item_uuid))
+
+        self.assertEqual(self.commits_count, 1)
+        self.assertTrue(self.auction_state_cache.check_if_user_is_known(user_uuid=user.user_uuid))
+        self.assertIsNotNone(self.auction_state_cache.get_item_state(item_uuid=item.item_uuid))
+
+    def test_unit_of_work_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.user_database_client.unit_of_work():
+                user: User = self.user_database_client.create_and_save_new_user(
+                    user_names='Frank Kwizera', user_email='frank@gmail.com', user_password='1234567')
+                user_uuid: str = user.user_uuid
+                raise ValueError('Invalid user')
+
+        self.assertFalse(self.auction_state_cache.check_if_user_is_known(user_uuid=user_uuid))
+        self.assertFalse(self.user_database_client.check_if_user_exists(user_uuid=user_uuid))
+        self.assertFalse(self.user_database_client.in_unit_of_work())
+
+    def test_unit_of_work_rolls_back_on_commit_error(self):
+        after_commit_calls: List[str] = []
+        with self.assertRaises(IntegrityError):
+            with self.user_database_client.unit_of_work():
+                self.user_database_client.run_after_commit(lambda: after_commit_calls.append('duplicate users'))
+                # Only flushed, and rejected, by the commit of the unit of work.
+                db.session.add_all([
+                    User(user_names='Frank Kwizera', user_email='frank@gmail.com', user_password_hash='hash'),
+                    User(user_names='Frank Kwizera', user_email='frank@gmail.com', user_password_hash='hash')])
+
+        self.assertFalse(self.user_database_client.in_unit_of_work())
+        user: User = self.user_database_client.create_and_save_new_user(
+            user_names='Frank Kwizera', user_email='frank@gmail.com', user_password='1234567')
+        self.assertTrue(self.user_database_client.check_if_user_exists(user_uuid=user.user_uuid))
+        self.assertEqual(after_commit_calls, [])
 
     def tearDown(self):
+        event.remove(db.engine, 'commit', self.count_commit)
         with self.app.app_context():
             db.session.close()
             db.session.remove()
@@ -181,4 +407,4 @@ class ItemDatabaseClientTest(unittest.TestCase, DatabaseClientTest):
 
 
 if __name__ == '__main__':
-    unittest.main(verbosity=2)
\ No newline at end of file
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.auction_state_cache import AuctionStateCache
+from src.storage.database_client import UserDatabaseClient, ItemDatabaseClient
+from src.storage.database_client import BidDatabaseClient, AutoBidDatabaseClient
+from src.storage.database_provider import db_provider
+from flask_sqlalchemy import SQLAlchemy
+from flask import Flask
+from src.get_app import get_app
+from tests.statements_capture import StatementsCapture
+from typing import Any, Callable, List, Tuple
+import unittest
+import datetime
+import re
+
+
+db: SQLAlchemy = db_provider.db
+
+
+class DatabaseIndexesTest(unittest.TestCase):
+    """
+    Runs ``EXPLAIN QUERY PLAN`` on the statements emitted by the database clients and checks
+    that none of them scans a table or sorts rows to honor ``ORDER BY``.
+    """
+
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        # Use an empty cache so that client reads always reach the database.
+        self.user_database_client: UserDatabaseClient = UserDatabaseClient(state_cache=AuctionStateCache())
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient(state_cache=AuctionStateCache())
+        self.bid_database_client: BidDatabaseClient = BidDatabaseClient()
+        self.auto_bid_database_client: AutoBidDatabaseClient = AutoBidDatabaseClient()
+
+    def capture_statements(self, client_call: Callable[[], Any]) -> List[Tuple[str, Tuple[Any]]]:
+        """
+        Runs the client call and returns the emitted (statement, parameters) pairs.
+        """
+        with StatementsCapture() as statements_capture:
+            client_call()
+        return statements_capture.statements_parameters
+
+    def assert_uses_indexes(self, client_call: Callable[[], Any], allow_sorting: bool = False):
+        """
+        Inputs:
+            - client_call: Database client call to check.
+            - allow_sorting: Whether sorting rows already narrowed down by an index is acceptable.
+        """
+        statements: List[Tuple[str, Tuple[Any]]] = self.capture_statements(client_call)
+        self.assertTrue(statements)
+        for statement, parameters in statements:
+            query_plan: List[str] = [
+                row[-1] for row in db.engine.execute('EXPLAIN QUERY PLAN ' + statement, parameters)]
+            for query_plan_step in query_plan:
+                self.assertIsNone(
+                    re.match(r'^SCAN (TABLE )?\w+$', query_plan_step), f'{query_plan_step} in {statement}')
+                if not allow_sorting:
+                    self.assertNotIn('TEMP B-TREE FOR ORDER BY', query_plan_step, statement)
+
+    def test_user_queries_use_indexes(self):
+        self.assert_uses_indexes(lambda: self.user_database_client.check_if_user_exists(user_uuid='user_uuid'))
+        self.assert_uses_indexes(lambda: self.user_database_client.authenticate_user(
+            user_email='frank@gmail.com', user_password='1234567'))
+
+    def test_item_queries_use_indexes(self):
+        self.assert_uses_indexes(lambda: self.item_database_client.retrieve_item_by_item_uuid(item_uuid='item_uuid'))
+        self.assert_uses_indexes(lambda: self.item_database_client.retrieve_item_auction_state(item_uuid='item_uuid'))
+        self.assert_uses_indexes(lambda: self.item_database_client.retrieve_upcoming_auctions_closes(limit=100))
+        self.assert_uses_indexes(lambda: self.item_database_client.finalize_auctions(
+            items_uuids=['item_uuid'], closed_timestamp=datetime.datetime.utcnow()))
+
+    def test_bid_queries_use_indexes(self):
+        self.assert_uses_indexes(lambda: self.bid_database_client.retrieve_item_bids(item_uuid='item_uuid'))
+        self.assert_uses_indexes(lambda: self.bid_database_client.retrieve_item_most_recent_bid(item_uuid='item_uuid'))
+
+    def test_auto_bid_queries_use_indexes(self):
+        self.assert_uses_indexes(
+            lambda: self.auto_bid_database_client.check_if_user_auto_bidder_config_exists(bidder_uuid='bidder_uuid'))
+        self.assert_uses_indexes(lambda: self.auto_bid_database_client.check_if_user_auto_bid_exists(
+            bid_item_uuid='item_uuid', bidder_uuid='bidder_uuid'))
+        self.assert_uses_indexes(lambda: self.auto_bid_database_client.retrieve_item_auto_bidders(item_uuid='item_uuid'))
+        self.assert_uses_indexes(
+            lambda: self.auto_bid_database_client.retrieve_item_auto_bidders_budgets(item_uuid='item_uuid'),
+            allow_sorting=True)
+        self.assert_uses_indexes(lambda: self.auto_bid_database_client.retrieve_item_auto_bidders_uuids_with_enough_funds(
+            item_uuid='item_uuid', highest_bider_uuid='bidder_uuid', current_highest_bid=300), allow_sorting=True)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.close()
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
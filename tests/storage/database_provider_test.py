@@ -0,0 +1,229 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import ItemDatabaseClient
+from src.storage.auction_state_cache import AuctionStateCache
+from src.storage.database_provider import db_provider, DatabaseProvider
+from src.storage.database_tables import Item
+from src.shared.constants import DatabaseConfig, SQLiteProfile
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine
+from flask import Flask
+from src.get_app import get_app
+from typing import Dict
+import subprocess
+import unittest
+import datetime
+import tempfile
+import shutil
+import socket
+import json
+import os
+
+
+db: SQLAlchemy = db_provider.db
+
+# URI of a PostgreSQL database to run the backend tests against, instead of launching one.
+POSTGRESQL_URI_ENVIRONMENT_VARIABLE: str = 'ANTIQUE_AUCTION_TEST_POSTGRESQL_URI'
+
+
+def create_engine_config_app(environ: Dict[str, str]) -> Flask:
+    """
+    Creates an app configured from ``environ`` the same way as ``get_app``, its tables created.
+    """
+    app: Flask = Flask(__name__)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    DatabaseProvider.apply_engine_config(app=app, environ=environ)
+    DatabaseProvider.apply_connection_profile(app=app)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def create_item(app: Flask) -> str:
+    with app.app_context():
+        item: Item = ItemDatabaseClient(state_cache=AuctionStateCache()).create_and_save_new_item(
+            item_name='Antique clock', item_description='Clock', item_base_price_in_usd=10,
+            item_owner_uuid='owner', bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+        item_uuid: str = item.item_uuid
+        db.session.remove()
+    return item_uuid
+
+
+class DatabaseProviderTest(unittest.TestCase):
+    def setUp(self):
+        self.app: Flask = get_app()
+        self.app.app_context().push()
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        self.databases_directory: str = tempfile.mkdtemp()
+
+    def test_connection_profile(self):
+        self.assertIsInstance(db.engine.pool, QueuePool)
+        self.assertEqual(db.engine.pool.size(), SQLiteProfile.POOL_SIZE)
+
+        self.assertEqual(db.session.execute('PRAGMA journal_mode').scalar(), SQLiteProfile.JOURNAL_MODE.lower())
+        # 1 is NORMAL.
+        self.assertEqual(db.session.execute('PRAGMA synchronous').scalar(), 1)
+        self.assertEqual(db.session.execute('PRAGMA busy_timeout').scalar(), SQLiteProfile.BUSY_TIMEOUT_IN_MS)
+        self.assertEqual(db.session.execute('PRAGMA cache_size').scalar(), -SQLiteProfile.CACHE_SIZE_IN_KIB)
+        # 2 is MEMORY.
+        self.assertEqual(db.session.execute('PRAGMA temp_store').scalar(), 2)
+
+    def test_apply_engine_config(self):
+        database_uri: str = f"sqlite:///{os.path.join(self.databases_directory, 'primary.sqlite')}"
+        config_path: str = os.path.join(self.databases_directory, 'database_config.json')
+        with open(config_path, 'w') as config_file:
+            json.dump({'SQLALCHEMY_DATABASE_URI': database_uri, 'SQLALCHEMY_POOL_SIZE': 2}, config_file)
+
+        app: Flask = Flask(__name__)
+        DatabaseProvider.apply_engine_config(app=app, environ={
+            DatabaseConfig.CONFIG_FILE_ENVIRONMENT_VARIABLE: config_path,
+            # Environment variables take precedence over the config file.
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_POOL_SIZE': '4',
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_POOL_PRE_PING': 'true',
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS': '250',
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_READ_REPLICA_URI': 'sqlite:///replica.sqlite'
+        })
+        self.assertEqual(app.config['SQLALCHEMY_DATABASE_URI'], database_uri)
+        self.assertEqual(app.config['SQLALCHEMY_POOL_SIZE'], 4)
+        self.assertIs(app.config['SQLALCHEMY_POOL_PRE_PING'], True)
+        self.assertEqual(app.config['SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS'], 250)
+        self.assertEqual(app.config['SQLALCHEMY_READ_REPLICA_URI'], 'sqlite:///replica.sqlite')
+
+        default_app: Flask = Flask(__name__)
+        DatabaseProvider.apply_engine_config(app=default_app, environ={})
+        self.assertTrue(default_app.config['SQLALCHEMY_DATABASE_URI'].endswith(
+            DatabaseConfig.DEFAULT_DATABASE_FILE_NAME))
+        self.assertNotIn('SQLALCHEMY_READ_REPLICA_URI', default_app.config)
+
+    def test_read_only_session_uses_read_replica(self):
+        replica_path: str = os.path.join(self.databases_directory, 'replica.sqlite')
+        app: Flask = create_engine_config_app(environ={
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_DATABASE_URI':
+                f"sqlite:///{os.path.join(self.databases_directory, 'primary.sqlite')}",
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_READ_REPLICA_URI': f'sqlite:///{replica_path}',
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_POOL_PRE_PING': '1'
+        })
+        replica_engine: Engine = create_engine(f'sqlite:///{replica_path}')
+        db.Model.metadata.create_all(bind=replica_engine)
+        replica_engine.dispose()
+        with app.app_context():
+            self.assertTrue(db.get_engine(app=app).pool._pre_ping)
+        item_uuid: str = create_item(app=app)
+
+        # The item is written to the primary, and not replicated in this test.
+        write_session = db_provider.get_new_session(app=app)
+        read_only_session = db_provider.get_new_session(read_only=True, app=app)
+        self.assertEqual(write_session.query(Item).filter_by(item_uuid=item_uuid).count(), 1)
+        self.assertEqual(read_only_session.query(Item).filter_by(item_uuid=item_uuid).count(), 0)
+        write_session.remove()
+        read_only_session.remove()
+
+        # Without a read replica, read only sessions use the primary through a pool of their own.
+        read_only_session = db_provider.get_new_session(read_only=True)
+        self.assertIsNot(read_only_session.get_bind(), db.get_engine(app=self.app))
+        self.assertEqual(read_only_session.get_bind().url, db.get_engine(app=self.app).url)
+        self.assertEqual(read_only_session.query(Item).count(), db.session.query(Item).count())
+        read_only_session.remove()
+
+    def test_read_only_session(self):
+        item_uuid: str = create_item(app=self.app)
+        read_only_item: Item = db.read_session.query(Item).filter_by(item_uuid=item_uuid).one()
+
+        # Reads do not keep a transaction or connection open, and see every committed write.
+        self.assertIsNone(db.read_session().transaction)
+        self.assertEqual(db.get_read_engine().pool.checkedout(), 0)
+        db.session.query(Item).filter_by(item_uuid=item_uuid).update({Item.bid_count: 3})
+        db.session.commit()
+        self.assertIs(db.read_session.query(Item).filter_by(item_uuid=item_uuid).one(), read_only_item)
+        self.assertEqual(read_only_item.bid_count, 3)
+
+        with self.assertRaises(OperationalError):
+            db.read_session.execute('DELETE FROM item')
+
+    def test_sqlite_statement_timeout(self):
+        app: Flask = create_engine_config_app(environ={
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_DATABASE_URI':
+                f"sqlite:///{os.path.join(self.databases_directory, 'primary.sqlite')}",
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS': '50'
+        })
+        with app.app_context():
+            with self.assertRaises(OperationalError):
+                db.session.execute(
+                    'WITH RECURSIVE counter(value) AS (SELECT 1 UNION ALL SELECT value + 1 FROM counter) '
+                    'SELECT COUNT(*) FROM counter').scalar()
+            db.session.rollback()
+            self.assertEqual(db.session.execute('SELECT COUNT(*) FROM item').scalar(), 0)
+            db.session.remove()
+            db.get_engine(app=app).dispose()
+
+    def tearDown(self):
+        db.session.remove()
+        shutil.rmtree(self.databases_directory, ignore_errors=True)
+
+
+class PostgreSQLDatabaseProviderTest(unittest.TestCase):
+    """
+    Runs the engine config against PostgreSQL, either the database named by ``ANTIQUE_AUCTION_TEST_POSTGRESQL_URI``
+    or a server launched locally with ``initdb`` and ``pg_ctl``. Skipped when neither is available.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server_directory: str = None
+        cls.database_uri: str = os.environ.get(POSTGRESQL_URI_ENVIRONMENT_VARIABLE)
+        if cls.database_uri:
+            return
+        try:
+            import psycopg2  # noqa: F401
+        except ImportError:
+            raise unittest.SkipTest('psycopg2 is not installed.')
+        if shutil.which('initdb') is None or shutil.which('pg_ctl') is None:
+            raise unittest.SkipTest('PostgreSQL is not installed.')
+
+        with socket.socket() as free_socket:
+            free_socket.bind(('127.0.0.1', 0))
+            port: int = free_socket.getsockname()[1]
+        cls.server_directory = tempfile.mkdtemp()
+        data_directory: str = os.path.join(cls.server_directory, 'data')
+        subprocess.run(['initdb', '-D', data_directory, '-U', 'postgres', '-A', 'trust'],
+                       check=True, stdout=subprocess.DEVNULL)
+        subprocess.run(['pg_ctl', '-D', data_directory, '-w', '-l', os.path.join(cls.server_directory, 'log'),
+                        '-o', f'-p {port} -k {cls.server_directory} -c listen_addresses=127.0.0.1', 'start'],
+                       check=True, stdout=subprocess.DEVNULL)
+        cls.database_uri = f'postgresql://postgres@127.0.0.1:{port}/postgres'
+
+    def test_engine_config(self):
+        app: Flask = create_engine_config_app(environ={
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_DATABASE_URI': self.database_uri,
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_READ_REPLICA_URI': self.database_uri,
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_POOL_SIZE': '2',
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_POOL_PRE_PING': 'true',
+            DatabaseConfig.ENVIRONMENT_VARIABLES_PREFIX + 'SQLALCHEMY_STATEMENT_TIMEOUT_IN_MS': '250'
+        })
+        item_uuid: str = create_item(app=app)
+
+        read_only_session = db_provider.get_new_session(read_only=True, app=app)
+        self.assertEqual(read_only_session.get_bind().pool.size(), 2)
+        self.assertEqual(read_only_session.execute('SHOW statement_timeout').scalar(), '250ms')
+        self.assertEqual(read_only_session.query(Item).filter_by(item_uuid=item_uuid).count(), 1)
+        with self.assertRaises(OperationalError):
+            read_only_session.execute('SELECT pg_sleep(1)')
+        read_only_session.remove()
+
+        with app.app_context():
+            db.drop_all()
+            db.get_engine(app=app).dispose()
+            db.get_read_engine(app=app).dispose()
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.server_directory is not None:
+            subprocess.run(['pg_ctl', '-D', os.path.join(cls.server_directory, 'data'), '-m', 'fast', 'stop'],
+                           stdout=subprocess.DEVNULL)
+            shutil.rmtree(cls.server_directory, ignore_errors=True)
@@ -0,0 +1,60 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.item_versions import ItemVersions
+from typing import Tuple
+import threading
+import unittest
+import os
+
+
+class ItemVersionsTest(unittest.TestCase):
+    def setUp(self):
+        self.item_versions: ItemVersions = ItemVersions(slots=1024)
+
+    def test_bump_item_version(self):
+        item_version: Tuple[int, int] = self.item_versions.retrieve_item_version(item_uuid='item_1')
+        items_version: Tuple[int, int] = self.item_versions.retrieve_items_version()
+
+        bumped_item_version: Tuple[int, int] = self.item_versions.bump_item_version(item_uuid='item_1')
+        self.assertEqual(self.item_versions.retrieve_item_version(item_uuid='item_1'), bumped_item_version)
+        self.assertTrue(ItemVersions.check_if_next_item_version(
+            item_version=item_version, next_item_version=bumped_item_version))
+        self.assertNotEqual(self.item_versions.retrieve_items_version(), items_version)
+
+        item_version = self.item_versions.retrieve_item_version(item_uuid='item_1')
+        self.item_versions.bump_all_versions()
+        self.assertNotEqual(self.item_versions.retrieve_item_version(item_uuid='item_1'), item_version)
+
+    def test_versions_are_shared_with_forked_processes(self):
+        item_version: Tuple[int, int] = self.item_versions.retrieve_item_version(item_uuid='item_1')
+        child_pid: int = os.fork()
+        if not child_pid:
+            self.item_versions.bump_item_version(item_uuid='item_1')
+            os._exit(0)
+
+        os.waitpid(child_pid, 0)
+        self.assertNotEqual(self.item_versions.retrieve_item_version(item_uuid='item_1'), item_version)
+
+    def test_retrieve_versions_while_bumping(self):
+        # Hold the lock shared by every process, as a worker bumping a version would.
+        locked: threading.Event = threading.Event()
+        unlocked: threading.Event = threading.Event()
+
+        def hold_lock():
+            with self.item_versions._ItemVersions__versions.get_lock():
+                locked.set()
+                unlocked.wait(timeout=5)
+
+        lock_holder_thread: threading.Thread = threading.Thread(target=hold_lock)
+        lock_holder_thread.start()
+        self.assertTrue(locked.wait(timeout=5))
+        try:
+            retrieve_thread: threading.Thread = threading.Thread(target=lambda: (
+                self.item_versions.retrieve_item_version(item_uuid='item_1'),
+                self.item_versions.retrieve_items_version()))
+            retrieve_thread.start()
+            retrieve_thread.join(timeout=1)
+            self.assertFalse(retrieve_thread.is_alive())
+        finally:
+            unlocked.set()
+            lock_holder_thread.join()
@@ -0,0 +1,100 @@
+__author__ = "Frank Kwizera"
+
+from src.storage.query_instrumentation import QueryInstrumentation, query_instrumentation
+from src.storage.database_client import ItemDatabaseClient
+from src.storage.database_tables import Item
+from src.storage.database_provider import db_provider
+from src.server.item_management_server import ItemManagementServer
+from src.shared.server_routes import ItemManagementServerRoutes
+from flask.wrappers import Response
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
+from flask.testing import FlaskClient
+from flask import Flask
+from src.get_app import get_app
+from typing import Dict
+import unittest
+import datetime
+import uuid
+
+db: SQLAlchemy = db_provider.db
+
+
+class QueryInstrumentationTest(unittest.TestCase):
+    @classmethod
+    def setup_class(cls):
+        cls.app: Flask = get_app()
+        cls.client: FlaskClient = cls.app.test_client()
+        cls.app.app_context().push()
+        # Item routes may already be mapped by the item management server tests.
+        if 'retrieve_all_items' not in cls.app.view_functions:
+            ItemManagementServer()
+
+    def setUp(self):
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        self.item_database_client: ItemDatabaseClient = ItemDatabaseClient()
+        self.item: Item = self.item_database_client.create_and_save_new_item(
+            item_name='Item 1', item_description='Item 1 description', item_base_price_in_usd=250,
+            item_owner_uuid=str(uuid.uuid4()),
+            bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(days=1))
+        query_instrumentation.reset()
+
+    def tearDown(self):
+        self.app.debug = False
+        query_instrumentation.slow_query_threshold_in_seconds = self.app.config['SLOW_QUERY_THRESHOLD_IN_MS'] / 1000
+        query_instrumentation.methods_stats_enabled = self.app.config['QUERY_METHODS_STATS_ENABLED']
+
+    def test_statements_are_attributed_to_database_client_methods(self):
+        self.item_database_client.retrieve_item_details(item_uuid=self.item.item_uuid)
+        self.item_database_client.retrieve_item_details(item_uuid=self.item.item_uuid)
+
+        methods_stats: Dict[str, Dict[str, float]] = query_instrumentation.retrieve_methods_stats()
+        # Item and bids are loaded by two statements.
+        self.assertEqual(methods_stats['ItemDatabaseClient.retrieve_item_details']['statements'], 4)
+        self.assertGreater(methods_stats['ItemDatabaseClient.retrieve_item_details']['time_in_seconds'], 0)
+
+        db.session.query(Item).count()
+        self.assertEqual(query_instrumentation.retrieve_methods_stats()['unattributed']['statements'], 1)
+
+    def test_slow_queries_are_logged(self):
+        query_instrumentation.slow_query_threshold_in_seconds = 0
+        with self.assertLogs('src.storage.query_instrumentation', level='WARNING') as captured_logs:
+            self.item_database_client.retrieve_item_by_item_uuid(item_uuid=self.item.item_uuid)
+        self.assertIn('ItemDatabaseClient.retrieve_item_by_item_uuid called from', captured_logs.output[0])
+        self.assertIn('query_instrumentation_test.py', captured_logs.output[0])
+        self.assertIn(self.item.item_uuid, captured_logs.output[0])
+
+    def test_only_slow_statements_are_attributed_without_methods_stats(self):
+        query_instrumentation.methods_stats_enabled = False
+        self.item_database_client.retrieve_item_details(item_uuid=self.item.item_uuid)
+        self.assertEqual(query_instrumentation.retrieve_methods_stats(), {})
+
+        query_instrumentation.slow_query_threshold_in_seconds = 0
+        with self.assertLogs('src.storage.query_instrumentation', level='WARNING') as captured_logs:
+            self.item_database_client.retrieve_item_by_item_uuid(item_uuid=self.item.item_uuid)
+        self.assertIn('ItemDatabaseClient.retrieve_item_by_item_uuid called from', captured_logs.output[0])
+
+    def test_failed_statements_leave_no_start_time_behind(self):
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    connection.execute('SELECT * FROM missing_table')
+            self.assertIsInstance(connection.info['query_started_at'], float)
+
+    def test_query_count_header_in_debug_mode(self):
+        response: Response = self.client.get(ItemManagementServerRoutes.RETRIEVE_ALL_ITEMS)
+        self.assertNotIn(QueryInstrumentation.QUERY_COUNT_HEADER, response.headers)
+
+        self.app.debug = True
+        response = self.client.get(ItemManagementServerRoutes.RETRIEVE_ITEM_DETAILS + self.item.item_uuid)
+        self.assertEqual(response.status_code, 200)
+        query_count: int = int(response.headers[QueryInstrumentation.QUERY_COUNT_HEADER])
+        self.assertGreater(query_count, 0)
+        self.assertIn(QueryInstrumentation.QUERY_TIME_HEADER, response.headers)
+
+        endpoints_stats: Dict[str, Dict[str, float]] = query_instrumentation.retrieve_endpoints_stats()
+        self.assertEqual(endpoints_stats['retrieve_all_items']['requests'], 1)
+        self.assertEqual(endpoints_stats['retrieve_item_details']['requests'], 1)
+        self.assertEqual(endpoints_stats['retrieve_item_details']['statements'], query_count)
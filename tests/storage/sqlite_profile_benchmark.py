@@ -0,0 +1,145 @@
+"""
+Benchmarks bid inserts against the SQLite connection profile of ``DatabaseProvider.apply_connection_profile``
+(write ahead log, ``synchronous=NORMAL``, busy timeout, larger cache and a pool of connections) and against
+the former defaults (rollback journal, ``synchronous=FULL``, no busy timeout, a new connection per checkout).
+N threads place increasing bids on their own item through ``BidDatabaseClient.create_item_bids_if_higher``;
+the benchmark reports the bids inserted per second and the bids lost to "database is locked" errors.
+Usage:
+    python -m tests.storage.sqlite_profile_benchmark
+"""
+
+__author__ = "Frank Kwizera"
+
+from src.storage.database_client import BidDatabaseClient, ItemDatabaseClient
+from src.storage.auction_state_cache import AuctionStateCache
+from src.storage.database_provider import db_provider, DatabaseProvider
+from src.shared.constants import Directories
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
+from flask import Flask
+from typing import Dict, List, Tuple
+import threading
+import datetime
+import time
+import uuid
+import os
+
+db: SQLAlchemy = db_provider.db
+
+THREADS_COUNTS: Tuple[int] = (1, 4, 16)
+BIDS_PER_THREAD: int = 100
+
+
+def create_benchmark_app(profile_name: str, tuned: bool) -> Flask:
+    """
+    Creates an app on a new database file, with either the tuned connection profile or the former defaults.
+    Inputs:
+        - profile_name: Name of the database file.
+        - tuned: Whether to apply ``DatabaseProvider.apply_connection_profile``.
+    Returns:
+        - Flask app, its tables created.
+    """
+    database_path: str = os.path.join(Directories.database_root(), f'{profile_name}_profile_benchmark.sqlite')
+    # The journal mode is persistent: start from a new file so that a previous run does not leak into this one.
+    for path in (database_path, database_path + '-wal', database_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+    app: Flask = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if tuned:
+        DatabaseProvider.apply_connection_profile(app=app)
+    else:
+        app.config['SQLITE_PRAGMAS'] = {}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def measure(app: Flask, threads_count: int) -> Dict[str, float]:
+    """
+    Makes ``threads_count`` threads place ``BIDS_PER_THREAD`` increasing bids each on their own item.
+    Returns:
+        - Insert throughput, inserted bids count and bids count lost to locking errors.
+    """
+    with app.app_context():
+        item_database_client: ItemDatabaseClient = ItemDatabaseClient(state_cache=AuctionStateCache())
+        items_uuids: List[str] = [
+            item_database_client.create_and_save_new_item(
+                item_name='Benchmark item', item_description='Benchmark item', item_base_price_in_usd=1,
+                item_owner_uuid=str(uuid.uuid4()),
+                bid_expiration_timestamp=datetime.datetime.utcnow() + datetime.timedelta(hours=1)).item_uuid
+            for _ in range(threads_count)]
+        db.session.remove()
+
+    bid_database_client: BidDatabaseClient = BidDatabaseClient(state_cache=AuctionStateCache())
+    start_barrier: threading.Barrier = threading.Barrier(threads_count)
+    inserted_bids_counts: List[int] = [0] * threads_count
+    locked_bids_counts: List[int] = [0] * threads_count
+
+    def place_bids(thread_index: int):
+        with app.app_context():
+            start_barrier.wait()
+            for bid_index in range(BIDS_PER_THREAD):
+                try:
+                    inserted_bids_counts[thread_index] += len(bid_database_client.create_item_bids_if_higher(
+                        bid_item_uuid=items_uuids[thread_index], bids=[(str(uuid.uuid4()), 2 + bid_index)]))
+                except OperationalError as error:
+                    if 'database is locked' not in str(error):
+                        raise
+                    db.session.rollback()
+                    locked_bids_counts[thread_index] += 1
+            db.session.remove()
+
+    bidders_threads: List[threading.Thread] = [
+        threading.Thread(target=place_bids, args=(thread_index,)) for thread_index in range(threads_count)]
+    started_at: float = time.perf_counter()
+    for bidder_thread in bidders_threads:
+        bidder_thread.start()
+    for bidder_thread in bidders_threads:
+        bidder_thread.join()
+    elapsed_in_seconds: float = time.perf_counter() - started_at
+
+    return {
+        'bids_per_second': sum(inserted_bids_counts) / elapsed_in_seconds,
+        'inserted_bids': sum(inserted_bids_counts),
+        'locked_bids': sum(locked_bids_counts)
+    }
+
+
+def run_benchmark() -> List[Dict[str, float]]:
+    """
+    Runs the benchmark for every size in ``THREADS_COUNTS`` and prints a summary table.
+    Returns:
+        - One result dictionary per size.
+    """
+    default_app: Flask = create_benchmark_app(profile_name='default', tuned=False)
+    tuned_app: Flask = create_benchmark_app(profile_name='tuned', tuned=True)
+
+    results: List[Dict[str, float]] = []
+    print(f"{'threads':>7} | {'default bids/s':>14} | {'locked bids':>11} | "
+          f"{'tuned bids/s':>12} | {'locked bids':>11}")
+    for threads_count in THREADS_COUNTS:
+        default: Dict[str, float] = measure(app=default_app, threads_count=threads_count)
+        tuned: Dict[str, float] = measure(app=tuned_app, threads_count=threads_count)
+
+        results.append({
+            'threads_count': threads_count,
+            'default_bids_per_second': default['bids_per_second'],
+            'default_locked_bids': default['locked_bids'],
+            'tuned_bids_per_second': tuned['bids_per_second'],
+            'tuned_locked_bids': tuned['locked_bids']
+        })
+        print(f"{threads_count:>7} | {default['bids_per_second']:>14.0f} | {default['locked_bids']:>11} | "
+              f"{tuned['bids_per_second']:>12.0f} | {tuned['locked_bids']:>11}")
+
+    for app in (default_app, tuned_app):
+        with app.app_context():
+            db.get_engine().dispose()
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmark()